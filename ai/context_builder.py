@@ -0,0 +1,154 @@
+import math
+import re
+from typing import Dict, List, Optional, Sequence, Set, Union
+
+from utils.bm25 import BM25Index, CJK_RANGES
+
+CJK_CHAR = re.compile(r"[%s]" % CJK_RANGES)
+# 省略的段落用一行占位符表示
+GAP_MARKER = "..."
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算文本的 token 数：中日韩文字按每字 1 个，其余字符按每 4 个 1 个
+
+    Args:
+        text: 文本
+
+    Returns:
+        估算的 token 数
+    """
+    cjk = len(CJK_CHAR.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+class DocumentContext:
+    """挑选出的提示词上下文"""
+
+    def __init__(self, text: str, indices: List[int], token_count: int, truncated: bool):
+        """初始化
+
+        Args:
+            text: 渲染后的上下文，每行为“段落序号: 段落文本”
+            indices: 入选的段落序号（升序）
+            token_count: 估算的 token 数
+            truncated: 是否省略了部分段落或截断了段落文本
+        """
+        self.text = text
+        self.indices = indices
+        self.token_count = token_count
+        self.truncated = truncated
+
+
+class ContextBuilder:
+    """在 token 预算内为指令挑选文档上下文
+
+    文档整体放得下时原样按顺序给出全部段落；放不下时，先按与指令的 BM25 相关度挑选段落，
+    剩余预算依次从文档开头和结尾补充（便于模型理解“在末尾添加”“修改标题”之类的位置），
+    最后按原文顺序输出，被省略的部分用占位行表示。
+    """
+
+    # 相关段落的得分不低于最高分的该比例才优先入选
+    MIN_RELATIVE_SCORE = 0.3
+
+    def __init__(self, token_budget: int = 2000, max_paragraph_tokens: Optional[int] = None):
+        """初始化
+
+        Args:
+            token_budget: 上下文的 token 预算
+            max_paragraph_tokens: 单个段落最多占用的 token 数，超出部分截断；默认为预算的四分之一
+        """
+        self.token_budget = max(1, int(token_budget))
+        self.max_paragraph_tokens = max_paragraph_tokens or max(1, self.token_budget // 4)
+
+    def build(self, paragraphs: Sequence[Union[str, Dict]], instruction: str) -> DocumentContext:
+        """挑选上下文
+
+        Args:
+            paragraphs: 段落文本列表，或包含 index 和 text 的字典列表
+            instruction: 用户指令
+
+        Returns:
+            上下文
+        """
+        if paragraphs and isinstance(paragraphs[0], dict):
+            indices = [para['index'] for para in paragraphs]
+            texts = [para['text'] for para in paragraphs]
+        else:
+            indices = list(range(len(paragraphs)))
+            texts = list(paragraphs)
+
+        lines = [f"{index}: {text}" for index, text in zip(indices, texts)]
+        costs = [estimate_tokens(line) + 1 for line in lines]
+        if sum(costs) <= self.token_budget:
+            return DocumentContext("\n".join(lines), indices, sum(costs), truncated=False)
+
+        selected: Set[int] = set()
+        truncated_lines: Dict[int, str] = {}
+        # 每个入选段落前后最多新增一个占位行，按最坏情况预留
+        gap_cost = estimate_tokens(GAP_MARKER) + 1
+        remaining = self.token_budget - gap_cost
+
+        def take(position: int) -> bool:
+            nonlocal remaining
+            if position in selected:
+                return True
+            cost = costs[position]
+            line = None
+            if cost > self.max_paragraph_tokens:
+                line = self._truncate(lines[position], self.max_paragraph_tokens)
+                cost = estimate_tokens(line) + 1
+            cost += gap_cost
+            if cost > remaining:
+                return False
+            if line is not None:
+                truncated_lines[position] = line
+            selected.add(position)
+            remaining -= cost
+            return True
+
+        # 先取与指令相关的段落；只命中个别常见字的段落得分很低，不占用预算
+        ranked = BM25Index(texts).search(instruction, top_k=len(texts))
+        for position, score in ranked:
+            if score < ranked[0][1] * self.MIN_RELATIVE_SCORE:
+                break
+            take(position)
+
+        # 再从开头和结尾交替补充
+        head, tail = 0, len(texts) - 1
+        while head <= tail and remaining > 0:
+            head_taken = take(head)
+            tail_taken = take(tail) if tail != head else head_taken
+            if not head_taken and not tail_taken:
+                break
+            head += 1
+            tail -= 1
+
+        output = []
+        previous = -1
+        for position in sorted(selected):
+            if position != previous + 1:
+                output.append(GAP_MARKER)
+            output.append(truncated_lines.get(position, lines[position]))
+            previous = position
+        if previous != len(texts) - 1:
+            output.append(GAP_MARKER)
+
+        text = "\n".join(output)
+        return DocumentContext(
+            text,
+            [indices[position] for position in sorted(selected)],
+            sum(estimate_tokens(line) + 1 for line in output),
+            truncated=True
+        )
+
+    def _truncate(self, line: str, max_tokens: int) -> str:
+        """把一行截断到 max_tokens 以内"""
+        low, high = 0, len(line)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if estimate_tokens(line[:middle]) + 2 <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return line[:low] + "…"
@@ -1,26 +1,693 @@
-import openai
+import asyncio
+import json
+import queue
+import random
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
 from config import load_config
 
-def get_openai_client():
-    config = load_config()
-    openai.api_key = config["openai_api_key"]
-    return openai
-
-def get_embedding(text):
-    openai_client = get_openai_client()
-    config = load_config()
-    response = openai_client.Embedding.create(
-        input=text,
-        model=config["embedding_model"]
-    )
-    return response['data'][0]['embedding']
-
-def ask_gpt(context, question):
-    openai_client = get_openai_client()
-    config = load_config()
+
+class LLMError(Exception):
+    """大模型调用失败"""
+
+
+class LLMTimeoutError(LLMError):
+    """大模型调用超过总时间上限，请求已取消"""
+
+
+class AsyncLLMClient:
+    """OpenAI 兼容接口的异步客户端
+
+    进程内共享一个 keep-alive 连接池，通过信号量限制并发请求数，
+    对网络错误、429 和 5xx 响应按带抖动的指数退避重试，并为每次请求设置超时。
+
+    客户端在独立的后台事件循环线程中运行，因此既可以在任意事件循环中 await
+    异步方法，也可以在普通线程中调用同步方法，两者共用同一个连接池。
+    """
+
+    RETRY_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        api_key: str = "",
+        base_url: str = "https://api.openai.com/v1",
+        chat_model: str = "gpt-3.5-turbo",
+        embedding_model: str = "text-embedding-ada-002",
+        timeout: float = 60.0,
+        max_retries: int = 3,
+        max_concurrency: int = 8,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """初始化客户端
+
+        Args:
+            api_key: 默认 API Key
+            base_url: 接口地址
+            chat_model: 默认对话模型
+            embedding_model: 默认向量模型
+            timeout: 单次请求超时（秒）
+            max_retries: 最大重试次数
+            max_concurrency: 最大并发请求数
+            max_connections: 连接池最大连接数
+            max_keepalive_connections: 保持的空闲连接数
+            backoff_base: 退避基数（秒）
+            backoff_max: 单次退避上限（秒）
+            transport: 自定义传输层（测试用）
+        """
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.chat_model = chat_model
+        self.embedding_model = embedding_model
+        self.timeout = timeout
+        self.max_retries = max(0, int(max_retries))
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        )
+        self._transport = transport
+        self._http: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="llm-client-loop", daemon=True
+        )
+        self._thread.start()
+        self._closed = False
+
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._retries = 0
+        self._failures = 0
+        self._timeouts = 0
+        # 对话补全的 token 用量累计
+        self._prompt_tokens = 0
+        self._cached_tokens = 0
+        self._completion_tokens = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "AsyncLLMClient":
+        """根据配置创建客户端
+
+        Args:
+            config: 配置字典
+
+        Returns:
+            客户端实例
+        """
+        return cls(
+            api_key=config.get("openai_api_key", ""),
+            base_url=config.get("openai_base_url", "https://api.openai.com/v1"),
+            chat_model=config.get("chat_model", "gpt-3.5-turbo"),
+            embedding_model=config.get("embedding_model", "text-embedding-ada-002"),
+            timeout=config.get("llm_timeout", 60),
+            max_retries=config.get("llm_max_retries", 3),
+            max_concurrency=config.get("llm_max_concurrency", 8),
+            max_connections=config.get("llm_max_connections", 20),
+            max_keepalive_connections=config.get("llm_max_keepalive_connections", 10)
+        )
+
+    async def achat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+        max_tokens: Optional[int] = None,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        total_timeout: Optional[float] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """对话补全（异步）
+
+        Args:
+            messages: 消息列表
+            model: 模型名称，默认使用 chat_model
+            temperature: 温度
+            max_tokens: 最大生成 token 数
+            api_key: 覆盖默认 API Key
+            timeout: 覆盖默认超时（秒），作用于连接、读写等单个阶段
+            total_timeout: 整个调用（含重试和退避）的时间上限（秒），超过时取消请求并抛出 LLMTimeoutError
+            **kwargs: 其他请求参数
+
+        Returns:
+            接口返回的 JSON
+        """
+        payload = {
+            "model": model or self.chat_model,
+            "messages": messages,
+            "temperature": temperature,
+            **kwargs
+        }
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+        response = await self._dispatch(
+            self._with_total_timeout(self._post("/chat/completions", payload, api_key, timeout), total_timeout)
+        )
+        self._record_usage(extract_usage(response))
+        return response
+
+    async def astream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+        max_tokens: Optional[int] = None,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        total_timeout: Optional[float] = None,
+        on_usage: Optional[Callable[[Dict[str, int]], None]] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """流式对话补全（异步），逐段产出生成的文本
+
+        只在收到响应之前重试；开始产出文本后出错直接抛出 LLMError。
+        total_timeout 限制从发起请求到读完响应的总时间，超过时取消请求并抛出 LLMTimeoutError。
+
+        Args:
+            on_usage: 收到 token 用量时的回调（在客户端事件循环线程中调用）
+            其余参数同 achat_completion
+
+        Yields:
+            文本片段
+        """
+        payload = {
+            "model": model or self.chat_model,
+            "messages": messages,
+            "temperature": temperature,
+            "stream": True,
+            # 在最后一个事件中返回 token 用量
+            "stream_options": {"include_usage": True},
+            **kwargs
+        }
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+
+        # 在客户端事件循环中读取，经队列转交给调用方事件循环
+        running_loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        future = self._start_stream(
+            payload, api_key, timeout,
+            lambda item: running_loop.call_soon_threadsafe(chunks.put_nowait, item),
+            on_usage, total_timeout
+        )
+        try:
+            while True:
+                item = await chunks.get()
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            future.cancel()
+
+    async def aembedding(self, text: str, model: Optional[str] = None,
+                         api_key: Optional[str] = None) -> List[float]:
+        """文本向量（异步）
+
+        Args:
+            text: 文本
+            model: 模型名称，默认使用 embedding_model
+            api_key: 覆盖默认 API Key
+
+        Returns:
+            向量
+        """
+        payload = {"input": text, "model": model or self.embedding_model}
+        data = await self._dispatch(self._post("/embeddings", payload, api_key, None))
+        return data["data"][0]["embedding"]
+
+    async def aembeddings(self, texts: List[str], model: Optional[str] = None,
+                          api_key: Optional[str] = None) -> List[List[float]]:
+        """批量文本向量（异步，一次请求）
+
+        Args:
+            texts: 文本列表
+            model: 模型名称，默认使用 embedding_model
+            api_key: 覆盖默认 API Key
+
+        Returns:
+            与 texts 顺序一致的向量列表
+        """
+        if not texts:
+            return []
+        payload = {"input": list(texts), "model": model or self.embedding_model}
+        data = await self._dispatch(self._post("/embeddings", payload, api_key, None))
+        items = sorted(data["data"], key=lambda item: item.get("index", 0))
+        return [item["embedding"] for item in items]
+
+    def chat_completion(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
+        """对话补全（同步，参数同 achat_completion）"""
+        return self._run_sync(self.achat_completion(messages, **kwargs))
+
+    def stream_chat_completion(self, messages: List[Dict[str, str]], model: Optional[str] = None,
+                               temperature: float = 0.3, max_tokens: Optional[int] = None,
+                               api_key: Optional[str] = None, timeout: Optional[float] = None,
+                               total_timeout: Optional[float] = None,
+                               on_usage: Optional[Callable[[Dict[str, int]], None]] = None,
+                               **kwargs) -> Iterator[str]:
+        """流式对话补全（同步，参数同 astream_chat_completion），逐段产出生成的文本"""
+        if self._closed:
+            raise LLMError("LLM 客户端已关闭")
+        payload = {
+            "model": model or self.chat_model,
+            "messages": messages,
+            "temperature": temperature,
+            "stream": True,
+            # 在最后一个事件中返回 token 用量
+            "stream_options": {"include_usage": True},
+            **kwargs
+        }
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+
+        chunks: "queue.Queue" = queue.Queue()
+        future = self._start_stream(payload, api_key, timeout, chunks.put, on_usage, total_timeout)
+        try:
+            while True:
+                item = chunks.get()
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # 调用方提前停止读取时取消请求
+            future.cancel()
+
+    def embedding(self, text: str, **kwargs) -> List[float]:
+        """文本向量（同步，参数同 aembedding）"""
+        return self._run_sync(self.aembedding(text, **kwargs))
+
+    def embeddings(self, texts: List[str], **kwargs) -> List[List[float]]:
+        """批量文本向量（同步，参数同 aembeddings）"""
+        return self._run_sync(self.aembeddings(texts, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        """获取统计信息
+
+        Returns:
+            统计信息字典
+        """
+        with self._stats_lock:
+            return {
+                "requests": self._requests,
+                "retries": self._retries,
+                "failures": self._failures,
+                "timeouts": self._timeouts,
+                "max_concurrency": self.max_concurrency,
+                "prompt_tokens": self._prompt_tokens,
+                "cached_tokens": self._cached_tokens,
+                "completion_tokens": self._completion_tokens,
+                "cached_token_rate": (
+                    self._cached_tokens / self._prompt_tokens if self._prompt_tokens else 0.0
+                )
+            }
+
+    def close(self):
+        """关闭连接池并停止后台事件循环"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._http is not None:
+            asyncio.run_coroutine_threadsafe(self._http.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _dispatch(self, coro):
+        """在客户端事件循环中执行协程，并在调用方事件循环中等待结果"""
+        if self._closed:
+            coro.close()
+            raise LLMError("LLM 客户端已关闭")
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    def _run_sync(self, coro):
+        """在客户端事件循环中执行协程并阻塞等待结果"""
+        if self._closed:
+            coro.close()
+            raise LLMError("LLM 客户端已关闭")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """获取连接池（在客户端事件循环中首次使用时创建）"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=self._limits,
+                timeout=self.timeout,
+                transport=self._transport
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._http
+
+    async def _post(self, path: str, payload: Dict[str, Any], api_key: Optional[str],
+                    timeout: Optional[float]) -> Dict[str, Any]:
+        """发送请求，失败时按带抖动的指数退避重试"""
+        http = self._get_http()
+        headers = {"Authorization": f"Bearer {api_key or self.api_key}"}
+        request_timeout = timeout if timeout is not None else self.timeout
+
+        last_error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                with self._stats_lock:
+                    self._retries += 1
+                await asyncio.sleep(self._backoff(attempt, last_error))
+
+            with self._stats_lock:
+                self._requests += 1
+            try:
+                async with self._semaphore:
+                    response = await http.post(path, json=payload, headers=headers, timeout=request_timeout)
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                last_error = e
+                continue
+
+            if response.status_code in self.RETRY_STATUS_CODES:
+                last_error = _StatusError(response)
+                continue
+            if response.status_code >= 400:
+                with self._stats_lock:
+                    self._failures += 1
+                raise LLMError(f"LLM 请求失败: HTTP {response.status_code}: {response.text[:500]}")
+            return response.json()
+
+        with self._stats_lock:
+            self._failures += 1
+        raise LLMError(f"LLM 请求重试 {self.max_retries} 次后仍失败: {last_error}")
+
+    def _record_usage(self, usage: Optional[Dict[str, int]]):
+        """累计 token 用量"""
+        if not usage:
+            return
+        with self._stats_lock:
+            self._prompt_tokens += usage["prompt_tokens"]
+            self._cached_tokens += usage["cached_tokens"]
+            self._completion_tokens += usage["completion_tokens"]
+
+    def _start_stream(self, payload: Dict[str, Any], api_key: Optional[str], timeout: Optional[float],
+                      put: Callable[[Any], None],
+                      on_usage: Optional[Callable[[Dict[str, int]], None]] = None,
+                      total_timeout: Optional[float] = None):
+        """在客户端事件循环中读取流式响应，把文本片段、异常或结束标记交给 put"""
+        if self._closed:
+            raise LLMError("LLM 客户端已关闭")
+
+        async def read():
+            async for delta in self._stream("/chat/completions", payload, api_key, timeout, on_usage):
+                put(delta)
+
+        async def pump():
+            try:
+                await self._with_total_timeout(read(), total_timeout)
+                put(_STREAM_END)
+            except asyncio.CancelledError:
+                put(_STREAM_END)
+                raise
+            except Exception as e:
+                put(e)
+
+        return asyncio.run_coroutine_threadsafe(pump(), self._loop)
+
+    async def _with_total_timeout(self, coro, total_timeout: Optional[float]):
+        """在总时间上限内等待协程，超时则取消并抛出 LLMTimeoutError"""
+        if total_timeout is None:
+            return await coro
+        try:
+            return await asyncio.wait_for(coro, max(0.0, total_timeout))
+        except asyncio.TimeoutError:
+            with self._stats_lock:
+                self._failures += 1
+                self._timeouts += 1
+            raise LLMTimeoutError(f"LLM 请求超过 {total_timeout:.2f} 秒未完成，已取消")
+
+    async def _stream(self, path: str, payload: Dict[str, Any], api_key: Optional[str],
+                      timeout: Optional[float],
+                      on_usage: Optional[Callable[[Dict[str, int]], None]] = None) -> AsyncIterator[str]:
+        """发送流式请求并解析 SSE 事件，收到响应前失败时按退避策略重试"""
+        http = self._get_http()
+        headers = {"Authorization": f"Bearer {api_key or self.api_key}"}
+        request_timeout = timeout if timeout is not None else self.timeout
+
+        last_error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                with self._stats_lock:
+                    self._retries += 1
+                await asyncio.sleep(self._backoff(attempt, last_error))
+
+            with self._stats_lock:
+                self._requests += 1
+            started = False
+            async with self._semaphore:
+                try:
+                    async with http.stream("POST", path, json=payload, headers=headers,
+                                           timeout=request_timeout) as response:
+                        if response.status_code in self.RETRY_STATUS_CODES:
+                            await response.aread()
+                            last_error = _StatusError(response)
+                            continue
+                        if response.status_code >= 400:
+                            body = (await response.aread()).decode("utf-8", "replace")
+                            with self._stats_lock:
+                                self._failures += 1
+                            raise LLMError(f"LLM 请求失败: HTTP {response.status_code}: {body[:500]}")
+
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[5:].strip()
+                            if data == "[DONE]":
+                                return
+                            delta, usage = _parse_stream_event(data)
+                            if usage:
+                                self._record_usage(usage)
+                                if on_usage:
+                                    on_usage(usage)
+                            if delta:
+                                started = True
+                                yield delta
+                        return
+                except (httpx.TransportError, httpx.TimeoutException) as e:
+                    # 已经开始产出文本时不能重试，否则调用方会收到重复内容
+                    if started:
+                        with self._stats_lock:
+                            self._failures += 1
+                        raise LLMError(f"LLM 流式响应中断: {e}")
+                    last_error = e
+                    continue
+
+        with self._stats_lock:
+            self._failures += 1
+        raise LLMError(f"LLM 请求重试 {self.max_retries} 次后仍失败: {last_error}")
+
+    def _backoff(self, attempt: int, last_error: Optional[Exception]) -> float:
+        """计算退避时间：优先遵循 Retry-After，否则为带全抖动的指数退避"""
+        if isinstance(last_error, _StatusError) and last_error.retry_after is not None:
+            return min(last_error.retry_after, self.backoff_max)
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+class _StatusError(Exception):
+    """可重试的 HTTP 状态错误"""
+
+    def __init__(self, response: httpx.Response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.status_code = response.status_code
+        try:
+            self.retry_after = float(response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            self.retry_after = None
+
+
+# 流式响应结束标记
+_STREAM_END = object()
+
+
+def _parse_stream_event(data: str) -> Tuple[str, Optional[Dict[str, int]]]:
+    """解析一条 SSE 事件数据
+
+    Returns:
+        (新增文本, token 用量)，无法解析时为 ("", None)
+    """
+    try:
+        event = json.loads(data)
+        choices = event.get("choices") or []
+    except (ValueError, AttributeError):
+        return "", None
+    delta = (choices[0].get("delta") or {}).get("content") or "" if choices else ""
+    return delta, extract_usage(event)
+
+
+_shared_client: Optional[AsyncLLMClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_llm_client(config: Optional[Dict[str, Any]] = None) -> AsyncLLMClient:
+    """获取进程内共享的 LLM 客户端（首次调用时按配置创建）
+
+    Args:
+        config: 配置字典，为 None 时读取配置文件
+
+    Returns:
+        共享客户端
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = AsyncLLMClient.from_config(config or load_config())
+    return _shared_client
+
+
+def set_llm_client(client: Optional[AsyncLLMClient]):
+    """替换进程内共享的 LLM 客户端（用于注入自定义客户端或测试）
+
+    Args:
+        client: 新客户端，为 None 时下次调用 get_llm_client 重新创建
+    """
+    global _shared_client
+    with _shared_client_lock:
+        _shared_client = client
+
+
+def extract_message_content(response: Dict[str, Any]) -> str:
+    """从对话补全响应中取出文本内容"""
+    return response["choices"][0]["message"]["content"] or ""
+
+
+def extract_usage(response: Dict[str, Any]) -> Optional[Dict[str, int]]:
+    """从响应中取出 token 用量
+
+    命中提示词前缀缓存的 token 数取自 usage.prompt_tokens_details.cached_tokens，
+    兼容接口使用 prompt_cache_hit_tokens 时也能识别。
+
+    Returns:
+        包含 prompt_tokens、cached_tokens、completion_tokens 的字典，响应中没有用量时为 None
+    """
+    usage = response.get("usage") if isinstance(response, dict) else None
+    if not usage:
+        return None
+    details = usage.get("prompt_tokens_details") or {}
+    cached = details.get("cached_tokens")
+    if cached is None:
+        cached = usage.get("prompt_cache_hit_tokens", 0)
+    return {
+        "prompt_tokens": int(usage.get("prompt_tokens") or 0),
+        "cached_tokens": int(cached or 0),
+        "completion_tokens": int(usage.get("completion_tokens") or 0)
+    }
+
+
+class OpenAIAPI:
+    """面向指令解析的 OpenAI 接口封装，底层使用共享的 AsyncLLMClient"""
+
+    def __init__(self, api_key: str = "", model: str = "gpt-3.5-turbo",
+                 client: Optional[AsyncLLMClient] = None):
+        """初始化
+
+        Args:
+            api_key: API Key，为空时使用客户端默认值
+            model: 模型名称
+            client: LLM 客户端，为 None 时使用进程内共享客户端
+        """
+        self.api_key = api_key
+        self.model = model
+        self.client = client or get_llm_client()
+
+    def chat_completion(self, messages: List[Dict[str, str]], temperature: float = 0.3,
+                        max_tokens: Optional[int] = None,
+                        on_usage: Optional[Callable[[Dict[str, int]], None]] = None, **kwargs) -> str:
+        """对话补全（同步）
+
+        Args:
+            messages: 消息列表
+            temperature: 温度
+            max_tokens: 最大生成 token 数
+            on_usage: 本次请求的 token 用量回调（含命中提示词缓存的 token 数）
+            **kwargs: 其他请求参数
+
+        Returns:
+            模型返回的文本
+        """
+        response = self.client.chat_completion(
+            messages,
+            model=kwargs.pop("model", None) or self.model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            api_key=self.api_key or None,
+            **kwargs
+        )
+        usage = extract_usage(response)
+        if on_usage and usage:
+            on_usage(usage)
+        return extract_message_content(response)
+
+    async def achat_completion(self, messages: List[Dict[str, str]], temperature: float = 0.3,
+                               max_tokens: Optional[int] = None,
+                               on_usage: Optional[Callable[[Dict[str, int]], None]] = None, **kwargs) -> str:
+        """对话补全（异步，参数同 chat_completion）"""
+        response = await self.client.achat_completion(
+            messages,
+            model=kwargs.pop("model", None) or self.model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            api_key=self.api_key or None,
+            **kwargs
+        )
+        usage = extract_usage(response)
+        if on_usage and usage:
+            on_usage(usage)
+        return extract_message_content(response)
+
+    def stream_chat_completion(self, messages: List[Dict[str, str]], temperature: float = 0.3,
+                               max_tokens: Optional[int] = None, **kwargs) -> Iterator[str]:
+        """流式对话补全（同步，参数同 chat_completion）
+
+        Yields:
+            模型逐段生成的文本
+        """
+        return self.client.stream_chat_completion(
+            messages,
+            model=kwargs.pop("model", None) or self.model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            api_key=self.api_key or None,
+            **kwargs
+        )
+
+
+def get_embedding(text, client: Optional[AsyncLLMClient] = None):
+    client = client or get_llm_client()
+    return client.embedding(text)
+
+
+def get_embeddings(texts, client: Optional[AsyncLLMClient] = None):
+    client = client or get_llm_client()
+    return client.embeddings(texts)
+
+
+def ask_gpt(context, question, client: Optional[AsyncLLMClient] = None):
+    client = client or get_llm_client()
     prompt = f"请参考以下资料回答问题：\n{context}\n\n问题：{question}"
-    response = openai_client.ChatCompletion.create(
-        model=config["chat_model"],
-        messages=[{"role": "user", "content": prompt}]
-    )
-    return response['choices'][0]['message']['content']
\ No newline at end of file
+    response = client.chat_completion([{"role": "user", "content": prompt}], temperature=1.0)
+    return extract_message_content(response)
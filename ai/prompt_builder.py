@@ -0,0 +1,88 @@
+"""
+提示词组装
+
+按“静态 system 消息在前、按请求变化的内容在后”的顺序组装对话消息，
+使每次请求的提示词前缀完全相同，服务端的提示词前缀缓存才能命中。
+静态模板只渲染一次，之后直接复用渲染结果。
+"""
+
+import threading
+from typing import Dict, List
+
+from ai.prompt_templates import (
+    COMPACT_INSTRUCTION_PARSE_SYSTEM_PROMPT,
+    INSTRUCTION_PARSE_SYSTEM_PROMPT,
+    INSTRUCTION_PARSE_USER_PROMPT,
+)
+
+# 输出格式 -> 指令解析的静态提示词
+INSTRUCTION_SYSTEM_PROMPTS = {
+    "dsl": COMPACT_INSTRUCTION_PARSE_SYSTEM_PROMPT,
+    "json": INSTRUCTION_PARSE_SYSTEM_PROMPT,
+}
+
+
+class PromptBuilder:
+    """对话消息组装器"""
+
+    def __init__(self):
+        # 模板 -> 渲染后的 system 消息内容
+        self._rendered: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def system_message(self, template: str) -> Dict[str, str]:
+        """渲染静态模板为 system 消息（按模板缓存）
+
+        Args:
+            template: 不含占位符的模板（{{ 和 }} 转义为花括号）
+
+        Returns:
+            system 消息
+        """
+        content = self._rendered.get(template)
+        if content is None:
+            content = template.format()
+            with self._lock:
+                self._rendered[template] = content
+        return {"role": "system", "content": content}
+
+    def messages(self, system_template: str, user_template: str, **variables) -> List[Dict[str, str]]:
+        """组装 system + user 两条消息
+
+        Args:
+            system_template: 静态模板
+            user_template: 按请求变化的模板
+            **variables: user_template 的占位符取值
+
+        Returns:
+            消息列表
+        """
+        return [
+            self.system_message(system_template),
+            {"role": "user", "content": user_template.format(**variables)}
+        ]
+
+    def instruction_messages(self, instruction: str, document_content: str,
+                             output_format: str = "dsl") -> List[Dict[str, str]]:
+        """指令解析的消息
+
+        文档内容放在指令之前：同一文档上的连续指令，文档内容相同时前缀缓存可以覆盖到文档部分。
+
+        Args:
+            instruction: 用户指令
+            document_content: 挑选后的文档上下文
+            output_format: 要求模型输出的格式，dsl 或 json
+
+        Returns:
+            消息列表
+        """
+        return self.messages(
+            INSTRUCTION_SYSTEM_PROMPTS[output_format],
+            INSTRUCTION_PARSE_USER_PROMPT,
+            instruction=instruction,
+            document_content=document_content
+        )
+
+
+# 进程内共享的组装器
+default_prompt_builder = PromptBuilder()
@@ -2,10 +2,11 @@
 AI 提示词模板
 """
 
-INSTRUCTION_PARSE_PROMPT = """你是一个专业的 Word 文档编辑助手。请将用户的自然语言指令转换为具体的文档操作。
+# 指令解析的提示词分为静态的 system 消息和按请求变化的 user 消息：
+# 静态部分固定放在最前面，服务端的提示词前缀缓存才能命中
 
-用户指令: {instruction}
-当前文档内容: {document_content}
+INSTRUCTION_PARSE_SYSTEM_PROMPT = """你是一个专业的 Word 文档编辑助手。请将用户的自然语言指令转换为具体的文档操作。
+文档内容中每行为“段落序号: 段落文本”，省略的段落用 ... 表示。
 
 请根据指令生成相应的操作，返回 JSON 格式的操作列表。每个操作应包含以下字段：
 - operation_type: 操作类型 (add_text, delete_text, modify_text, add_table, modify_table, delete_table, set_style, set_font, add_heading, add_list, insert_image)
@@ -62,6 +63,47 @@ INSTRUCTION_PARSE_PROMPT = """你是一个专业的 Word 文档编辑助手。
 ```
 """
 
+COMPACT_INSTRUCTION_PARSE_SYSTEM_PROMPT = """你是一个专业的 Word 文档编辑助手。请将用户的自然语言指令转换为具体的文档操作。
+文档内容中每行为“段落序号: 段落文本”，省略的段落用 ... 表示。
+
+每行输出一个操作，字段用 | 分隔，未指定的字段留空：
+T|内容|位置        添加文本；位置留空为末尾，^ 为开头，数字 N 为第 N 段之后
+H|级别|内容        添加标题
+D|文本             删除文本
+M|原文本|新文本    修改文本
+L|1|项1|项2        添加列表；1 为有序，0 为无序
+B|行数|列数|表头1|表头2  添加表格，其后每个 R 行为一行数据
+R|单元格1|单元格2  表格数据行
+S|biu|字号|字体|#颜色    上一个操作的样式；b 粗体、i 斜体、u 下划线，只写需要的
+
+字段中的 | 写作 \\|，换行写作 \\n。只输出操作行，不要输出任何说明。
+
+示例：
+H|1|项目周报
+T|本周完成了接口联调。
+S|b|12||#FF0000
+B|2|2|姓名|进度
+R|张三|80%
+R|李四|60%
+"""
+
+INSTRUCTION_PARSE_USER_PROMPT = """当前文档内容:
+{document_content}
+
+用户指令: {instruction}"""
+
+MODIFICATION_RULE_SYSTEM_PROMPT = """用户会给出文档结构（每行为“段落序号: 段落文本”）和修改指令。
+请只返回查找规则（如关键词/正则）和新内容，格式为：
+{{
+  "rule": {{"type": "keyword", "value": "待办"}},
+  "new_text": "已完成"
+}}
+不要输出任何解释。"""
+
+MODIFICATION_RULE_USER_PROMPT = """文档结构如下：
+{document_structure}
+用户指令：“{instruction}”"""
+
 STYLE_RECOMMENDATION_PROMPT = """你是一个专业的文档格式设计师。请根据以下文档内容和用户需求，推荐合适的样式设置。
 
 文档内容: {document_content}
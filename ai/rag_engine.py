@@ -1,12 +1,12 @@
 from .embedding_db import EmbeddingDB
-from .openai_api import get_embedding, ask_gpt
+from .openai_api import get_embedding, get_embeddings, ask_gpt
 
 class RAGEngine:
     def __init__(self, db_path):
         self.db = EmbeddingDB(db_path)
 
     def add_document(self, doc_id, text_blocks, metadata):
-        embeddings = [get_embedding(block) for block in text_blocks]
+        embeddings = get_embeddings(text_blocks)
         ids = [f"{doc_id}_{i}" for i in range(len(text_blocks))]
         metadatas = [metadata for _ in text_blocks]
         self.db.add_documents(text_blocks, embeddings, metadatas, ids)
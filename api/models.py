@@ -37,6 +37,7 @@ class TableData(BaseModel):
     cols: int = Field(description="列数")
     headers: Optional[List[str]] = Field(default=None, description="表头")
     data: Optional[List[List[str]]] = Field(default=None, description="表格数据")
+    column_widths: Optional[List[float]] = Field(default=None, description="列宽（厘米），未指定的列平分剩余宽度")
 
 class WordOperation(BaseModel):
     """Word操作模型"""
@@ -52,6 +53,7 @@ class ProcessRequest(BaseModel):
     instruction: str = Field(description="自然语言指令")
     document_path: Optional[str] = Field(default=None, description="文档路径")
     operations: Optional[List[WordOperation]] = Field(default=None, description="具体操作列表")
+    timeout_ms: Optional[int] = Field(default=None, gt=0, description="处理时限（毫秒），超过时取消模型调用并使用本地解析结果；不超过服务端默认时限")
 
 class ProcessResponse(BaseModel):
     """处理响应模型"""
@@ -60,6 +62,9 @@ class ProcessResponse(BaseModel):
     document_path: Optional[str] = Field(default=None, description="处理后的文档路径")
     operations_performed: Optional[List[WordOperation]] = Field(default=None, description="执行的操作")
     preview_text: Optional[str] = Field(default=None, description="预览文本")
+    next_cursor: Optional[str] = Field(default=None, description="预览下一页游标，没有更多段落时为空")
+    execution_plan: Optional[Dict[str, Any]] = Field(default=None, description="执行计划（调试模式下返回）")
+    deadline_exceeded: bool = Field(default=False, description="模型调用是否因超过处理时限被取消（结果来自本地解析或为部分结果）")
 
 class CreateDocumentRequest(BaseModel):
     """创建文档请求模型"""
@@ -71,4 +76,33 @@ class ExportRequest(BaseModel):
     """导出请求模型"""
     document_path: str = Field(description="源文档路径")
     export_format: DocumentFormat = Field(description="导出格式")
-    output_path: Optional[str] = Field(default=None, description="输出路径")
\ No newline at end of file
+    output_path: Optional[str] = Field(default=None, description="输出路径")
+
+class BatchJob(BaseModel):
+    """批处理任务模型"""
+    document_path: Optional[str] = Field(default=None, description="文档路径，为空时创建新文档")
+    instructions: List[str] = Field(default_factory=list, description="按顺序执行的自然语言指令")
+    operations: Optional[List[WordOperation]] = Field(default=None, description="在指令之后执行的具体操作列表")
+
+class BatchRequest(BaseModel):
+    """批处理请求模型"""
+    jobs: List[BatchJob] = Field(description="任务列表")
+    stream: bool = Field(default=False, description="是否以 NDJSON 流的形式逐个返回任务结果")
+
+class BatchJobResult(BaseModel):
+    """批处理任务结果模型"""
+    job_index: int = Field(description="任务在请求中的序号")
+    success: bool = Field(description="是否成功")
+    message: str = Field(description="结果消息")
+    source_path: Optional[str] = Field(default=None, description="源文档路径")
+    document_path: Optional[str] = Field(default=None, description="处理后的文档路径")
+    operations_performed: int = Field(default=0, description="成功执行的操作数")
+    failed_instructions: List[str] = Field(default_factory=list, description="未能解析或执行的指令")
+    failed_operations: int = Field(default=0, description="未能执行的具体操作数")
+    elapsed_ms: float = Field(default=0.0, description="任务耗时（毫秒）")
+
+class BatchResponse(BaseModel):
+    """批处理响应模型"""
+    success: bool = Field(description="是否全部成功")
+    message: str = Field(description="响应消息")
+    results: List[BatchJobResult] = Field(default_factory=list, description="各任务结果")
@@ -1,19 +1,23 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile, BackgroundTasks
-from fastapi.responses import FileResponse
-from typing import List, Optional
+from fastapi import FastAPI, HTTPException, File, UploadFile, BackgroundTasks, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import List, Optional, Callable, Any
+import asyncio
+import json
 import os
 import shutil
 import tempfile
 from pathlib import Path
 
 from word_agent.agent_engine import WordAgent
+from word_agent.executor import DocumentExecutor
 from api.models import (
     ProcessRequest, ProcessResponse, 
     CreateDocumentRequest, ExportRequest,
-    DocumentFormat
+    DocumentFormat, BatchRequest, BatchResponse
 )
 from config import load_config
 from utils.logger import setup_logger
+from utils.pagination import resolve_page
 
 # 创建 FastAPI 应用
 app = FastAPI(
@@ -24,15 +28,17 @@ app = FastAPI(
 
 # 全局变量
 word_agent: Optional[WordAgent] = None
+document_executor: Optional[DocumentExecutor] = None
 logger = setup_logger()
 
 @app.on_event("startup")
 async def startup_event():
     """应用启动事件"""
-    global word_agent
+    global word_agent, document_executor
     try:
         config = load_config()
         word_agent = WordAgent(config)
+        document_executor = DocumentExecutor(max_workers=config.get('worker_pool_size', 8))
         logger.info("Word Agent 服务启动成功")
     except Exception as e:
         logger.error(f"Word Agent 服务启动失败: {e}")
@@ -41,8 +47,11 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """应用关闭事件"""
-    global word_agent
+    global word_agent, document_executor
+    if document_executor:
+        document_executor.shutdown(wait=True)
     if word_agent:
+        word_agent.shutdown()
         word_agent.clear_cache()
         logger.info("Word Agent 服务关闭")
 
@@ -59,6 +68,9 @@ async def root():
 async def process_document(request: ProcessRequest):
     """处理文档编辑指令
     
+    收到请求时开始计算处理时限（timeout_ms 与配置的 request_timeout 中较小的一个），
+    在文档锁上排队的时间也计入其中。
+    
     Args:
         request: 处理请求
         
@@ -69,7 +81,10 @@ async def process_document(request: ProcessRequest):
         if not word_agent:
             raise HTTPException(status_code=500, detail="Word Agent 未初始化")
         
-        response = word_agent.process_instruction(request)
+        deadline = word_agent.request_deadline(request)
+        response = await document_executor.run(
+            request.document_path, word_agent.process_instruction, request, deadline=deadline
+        )
         
         if not response.success:
             raise HTTPException(status_code=400, detail=response.message)
@@ -82,6 +97,129 @@ async def process_document(request: ProcessRequest):
         logger.error(f"处理文档失败: {e}")
         raise HTTPException(status_code=500, detail=f"处理失败: {str(e)}")
 
+def _format_sse(event: str, data: Any) -> str:
+    """格式化一条 Server-Sent Events 消息"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def _progress_events(document_path: Optional[str], func: Callable[..., ProcessResponse], request,
+                           **kwargs):
+    """在线程池中执行带进度回调的任务，并把进度转换为 SSE 事件流
+    
+    Args:
+        document_path: 任务涉及的文档路径（用于文档锁）
+        func: 接受 (request, progress) 的阻塞函数
+        request: 请求对象
+        **kwargs: 传给 func 的其他关键字参数
+        
+    Yields:
+        SSE 消息文本，最后一条为 result 或 error 事件
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    def progress(stage: str, data: dict):
+        loop.call_soon_threadsafe(queue.put_nowait, (stage, data))
+    
+    task = asyncio.ensure_future(document_executor.run(document_path, func, request, progress, **kwargs))
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+    
+    while True:
+        item = await queue.get()
+        if item is None:
+            break
+        yield _format_sse(*item)
+    
+    try:
+        response = task.result()
+        yield _format_sse("result", response.model_dump(mode="json"))
+    except Exception as e:
+        logger.error(f"流式处理失败: {e}")
+        yield _format_sse("error", {"message": f"处理失败: {str(e)}"})
+
+def _sse_response(events) -> StreamingResponse:
+    """构造 SSE 响应，禁用代理缓冲以便事件即时送达"""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/word/process/stream")
+async def process_document_stream(request: ProcessRequest):
+    """处理文档编辑指令，以 SSE 推送各阶段进度
+    
+    事件依次为 started、parsing、llm_complete、plan、operation（每个操作一次）、saved，
+    最后是携带完整处理响应的 result 事件；每个事件都包含 elapsed_ms 与 stage_ms 耗时。
+    处理时限与 /api/word/process 相同，从收到请求时开始计算。
+    
+    Args:
+        request: 处理请求
+        
+    Returns:
+        text/event-stream 响应
+    """
+    if not word_agent:
+        raise HTTPException(status_code=500, detail="Word Agent 未初始化")
+    
+    deadline = word_agent.request_deadline(request)
+    return _sse_response(
+        _progress_events(request.document_path, word_agent.process_instruction, request, deadline=deadline)
+    )
+
+@app.post("/api/word/create/stream")
+async def create_document_stream(request: CreateDocumentRequest):
+    """创建新文档，以 SSE 推送各阶段进度
+    
+    Args:
+        request: 创建文档请求
+        
+    Returns:
+        text/event-stream 响应
+    """
+    if not word_agent:
+        raise HTTPException(status_code=500, detail="Word Agent 未初始化")
+    
+    return _sse_response(_progress_events(None, word_agent.create_document, request))
+
+@app.post("/api/word/batch", response_model=BatchResponse)
+async def process_batch(request: BatchRequest):
+    """批量处理多个文档的编辑指令
+    
+    Args:
+        request: 批处理请求
+        
+    Returns:
+        批处理响应；stream 为 true 时按完成顺序返回 NDJSON 流，每行一个任务结果
+    """
+    try:
+        if not word_agent:
+            raise HTTPException(status_code=500, detail="Word Agent 未初始化")
+        
+        if not request.jobs:
+            raise HTTPException(status_code=400, detail="任务列表为空")
+        
+        if request.stream:
+            def result_lines():
+                for result in word_agent.iter_batch(request.jobs):
+                    yield result.model_dump_json() + "\n"
+            
+            return StreamingResponse(result_lines(), media_type="application/x-ndjson")
+        
+        results = await document_executor.run(None, word_agent.process_batch, request.jobs)
+        succeeded = sum(1 for result in results if result.success)
+        
+        return BatchResponse(
+            success=succeeded == len(results),
+            message=f"成功完成 {succeeded}/{len(results)} 个任务",
+            results=results
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"批处理失败: {e}")
+        raise HTTPException(status_code=500, detail=f"批处理失败: {str(e)}")
+
 @app.post("/api/word/create", response_model=ProcessResponse)
 async def create_document(request: CreateDocumentRequest):
     """创建新文档
@@ -96,7 +234,7 @@ async def create_document(request: CreateDocumentRequest):
         if not word_agent:
             raise HTTPException(status_code=500, detail="Word Agent 未初始化")
         
-        response = word_agent.create_document(request)
+        response = await document_executor.run(None, word_agent.create_document, request)
         
         if not response.success:
             raise HTTPException(status_code=400, detail=response.message)
@@ -110,11 +248,19 @@ async def create_document(request: CreateDocumentRequest):
         raise HTTPException(status_code=500, detail=f"创建失败: {str(e)}")
 
 @app.get("/api/word/preview", response_model=ProcessResponse)
-async def get_document_preview(document_path: str):
+async def get_document_preview(
+    document_path: str,
+    offset: int = Query(0, ge=0, description="起始段落序号"),
+    limit: Optional[int] = Query(None, ge=1, description="最多返回的段落数，不传时返回全文"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor，优先于 offset")
+):
     """获取文档预览
     
     Args:
         document_path: 文档路径
+        offset: 起始段落序号
+        limit: 最多返回的段落数
+        cursor: 分页游标
         
     Returns:
         处理响应
@@ -123,7 +269,14 @@ async def get_document_preview(document_path: str):
         if not word_agent:
             raise HTTPException(status_code=500, detail="Word Agent 未初始化")
         
-        response = word_agent.get_document_preview(document_path)
+        try:
+            start, page_size = resolve_page(offset, limit, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        response = await document_executor.run(
+            document_path, word_agent.get_document_preview, document_path, start, page_size
+        )
         
         if not response.success:
             raise HTTPException(status_code=400, detail=response.message)
@@ -150,7 +303,9 @@ async def export_document(request: ExportRequest):
         if not word_agent:
             raise HTTPException(status_code=500, detail="Word Agent 未初始化")
         
-        response = word_agent.export_document(request)
+        response = await document_executor.run(
+            request.document_path, word_agent.export_document, request
+        )
         
         if not response.success:
             raise HTTPException(status_code=400, detail=response.message)
@@ -177,6 +332,11 @@ async def download_document(filename: str):
         if not word_agent:
             raise HTTPException(status_code=500, detail="Word Agent 未初始化")
         
+        # 先落盘该文件尚未保存的延迟修改
+        await document_executor.run(
+            None, word_agent.flush, os.path.join(word_agent.workspace, filename)
+        )
+        
         # 检查文件是否在工作区中
         workspace_files = word_agent.get_workspace_files()
         file_path = None
@@ -222,8 +382,7 @@ async def upload_document(file: UploadFile = File(...)):
         # 保存文件到工作区
         upload_path = os.path.join(word_agent.workspace, file.filename)
         
-        with open(upload_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await document_executor.run(upload_path, _copy_upload, file, upload_path)
         
         return {
             "success": True,
@@ -238,6 +397,16 @@ async def upload_document(file: UploadFile = File(...)):
         logger.error(f"上传文档失败: {e}")
         raise HTTPException(status_code=500, detail=f"上传失败: {str(e)}")
 
+def _copy_upload(file: UploadFile, upload_path: str):
+    """将上传文件写入工作区（在工作线程中执行）
+    
+    Args:
+        file: 上传的文件
+        upload_path: 目标路径
+    """
+    with open(upload_path, "wb") as buffer:
+        shutil.copyfileobj(file.file, buffer)
+
 @app.get("/api/word/files")
 async def list_workspace_files():
     """获取工作区文件列表
@@ -292,7 +461,7 @@ async def delete_document(filename: str):
         if not os.path.exists(file_path):
             raise HTTPException(status_code=404, detail="文件不存在")
         
-        os.remove(file_path)
+        await document_executor.run(file_path, os.remove, file_path)
         
         return {
             "success": True,
@@ -316,7 +485,7 @@ async def clear_cache():
         if not word_agent:
             raise HTTPException(status_code=500, detail="Word Agent 未初始化")
         
-        word_agent.clear_cache()
+        await document_executor.run(None, word_agent.clear_cache)
         
         return {
             "success": True,
@@ -327,6 +496,65 @@ async def clear_cache():
         logger.error(f"清理缓存失败: {e}")
         raise HTTPException(status_code=500, detail=f"清理缓存失败: {str(e)}")
 
+@app.post("/api/word/flush")
+async def flush_documents(document_path: Optional[str] = None):
+    """立即保存延迟保存模式下尚未落盘的修改
+    
+    Args:
+        document_path: 只保存该文档，为空时保存全部
+        
+    Returns:
+        保存结果
+    """
+    try:
+        if not word_agent:
+            raise HTTPException(status_code=500, detail="Word Agent 未初始化")
+        
+        saved = await document_executor.run(document_path, word_agent.flush, document_path)
+        
+        return {
+            "success": True,
+            "message": "保存完成",
+            "saved": saved
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"保存文档失败: {e}")
+        raise HTTPException(status_code=500, detail=f"保存失败: {str(e)}")
+
+@app.delete("/api/word/parse-cache")
+async def invalidate_parse_cache(instruction: Optional[str] = None, model: Optional[str] = None):
+    """失效指令解析缓存
+    
+    Args:
+        instruction: 只失效该指令的缓存，为空时不限
+        model: 只失效该模型的缓存，为空时不限
+        
+    Returns:
+        失效结果
+    """
+    try:
+        if not word_agent:
+            raise HTTPException(status_code=500, detail="Word Agent 未初始化")
+        
+        removed = await document_executor.run(
+            None, word_agent.invalidate_parse_cache, instruction, model
+        )
+        
+        return {
+            "success": True,
+            "message": "解析缓存已失效",
+            "removed": removed
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"失效解析缓存失败: {e}")
+        raise HTTPException(status_code=500, detail=f"失效解析缓存失败: {str(e)}")
+
 @app.get("/api/health")
 async def health_check():
     """健康检查
@@ -345,7 +573,14 @@ async def health_check():
             "status": "healthy",
             "message": "服务正常运行",
             "workspace": word_agent.workspace,
-            "cache_size": len(word_agent.document_cache)
+            "cache_size": len(word_agent.document_cache),
+            "cache": word_agent.get_cache_stats(),
+            "executor": document_executor.stats() if document_executor else None,
+            "parse_cache": word_agent.parse_cache.stats() if word_agent.parse_cache else None,
+            "parser": word_agent.command_parser.get_stats(),
+            "write_behind": word_agent.write_behind.stats() if word_agent.write_behind else None,
+            "model_router": word_agent.model_router.stats() if word_agent.model_router else None,
+            "llm_client": word_agent.llm_client.stats()
         }
         
     except Exception as e:
@@ -1,20 +1,26 @@
-from backend.word_utils import parse_docx_structure, edit_text
-from backend.index_finder import find_indices
-from backend.llm_client import get_modification_rule
+from backend.word_utils import parse_docx_structure, edit_text_batch
+from backend.index_finder import find_indices, get_paragraph_index
+from backend import llm_client
+from ai.openai_api import AsyncLLMClient
+from typing import Optional
 import os
 
-def agent_nl_modify(docx_path: str, user_instruction: str, openai_api_key: str) -> str:
+def agent_nl_modify(docx_path: str, user_instruction: str, openai_api_key: str,
+                    client: Optional[AsyncLLMClient] = None) -> str:
     structure = parse_docx_structure(docx_path)
     paragraphs = structure['paragraphs']
-    rule, new_text = get_modification_rule(paragraphs, user_instruction, openai_api_key)
-    indices = find_indices(paragraphs, rule)
+    rule, new_text = llm_client.get_modification_rule(paragraphs, user_instruction, openai_api_key, client=client)
+    # 同一文件版本被多次修改时复用段落索引
+    stat = os.stat(docx_path)
+    version = (os.path.abspath(docx_path), stat.st_mtime_ns, stat.st_size)
+    indices = find_indices(paragraphs, rule, index=get_paragraph_index(paragraphs, version))
     if not indices:
         raise ValueError("未找到需要修改的段落")
-    # 为保证幂等性，生成新文件
+    # 为保证幂等性，生成新文件；所有命中段落一次加载、一次保存
     edited_path = docx_path.replace('.docx', '_agent_edited.docx')
-    # 复制原文件
-    import shutil
-    shutil.copyfile(docx_path, edited_path)
-    for idx in indices:
-        edit_text(edited_path, 'index', str(idx), 'replace', new_text)
+    edits = [
+        {"locate_type": 'index', "locate_value": str(idx), "op_type": 'replace', "content": new_text}
+        for idx in indices
+    ]
+    edit_text_batch(docx_path, edits, save_path=edited_path, return_structure=False)
     return edited_path
\ No newline at end of file
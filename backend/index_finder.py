@@ -1,24 +1,204 @@
 import re
-from typing import List, Dict
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Hashable, Optional, Set
 
-def find_indices(paragraphs: List[Dict], rule: Dict) -> List[int]:
+# 正则中的元字符；字面前缀在遇到它们时结束
+REGEX_META = set(".^$*+?{}[]\\|()")
+# 使前一个字符变为可选的量词
+OPTIONAL_QUANTIFIERS = set("*?{")
+
+
+class ParagraphIndex:
+    """段落检索索引
+
+    以字符 1-gram 和 2-gram 为词项的倒排表，中文关键词不需要分词即可查询。
+    查询时取关键词各 n-gram 倒排表的交集作为候选段落，再逐个确认是否真的包含关键词。
+    索引只读，文档内容变化后需要重新构建。
+    """
+
+    def __init__(self, paragraphs: List[Dict]):
+        """构建索引
+
+        Args:
+            paragraphs: List[dict]，每个dict包含 index 和 text
+        """
+        self.indices = [para['index'] for para in paragraphs]
+        self.texts = [para['text'] for para in paragraphs]
+        # n-gram -> 包含它的段落位置（升序）
+        self._postings: Dict[str, List[int]] = {}
+        for position, text in enumerate(self.texts):
+            grams = set(text)
+            grams.update(text[i:i + 2] for i in range(len(text) - 1))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(position)
+
+    def candidates(self, literal: str) -> Optional[List[int]]:
+        """可能包含 literal 的段落位置
+
+        Args:
+            literal: 要查找的文本
+
+        Returns:
+            段落位置列表（升序）；literal 为空时返回 None，表示无法缩小范围
+        """
+        if not literal:
+            return None
+        if len(literal) == 1:
+            grams = {literal}
+        else:
+            grams = {literal[i:i + 2] for i in range(len(literal) - 1)}
+
+        postings = []
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if not posting:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        result: Set[int] = set(postings[0])
+        for posting in postings[1:]:
+            result.intersection_update(posting)
+            if not result:
+                return []
+        return sorted(result)
+
+    def find_keyword(self, keyword: str) -> List[int]:
+        """包含关键词的段落 index 列表"""
+        positions = self.candidates(keyword)
+        if positions is None:
+            positions = range(len(self.texts))
+        return [self.indices[i] for i in positions if keyword in self.texts[i]]
+
+    def find_regex(self, pattern: str) -> List[int]:
+        """匹配正则的段落 index 列表
+
+        能从正则中提取出必须出现的字面前缀时，只在包含该前缀的段落中匹配，否则逐段匹配。
+        """
+        compiled = compile_pattern(pattern)
+        positions = self.candidates(literal_prefix(pattern))
+        if positions is None:
+            positions = range(len(self.texts))
+        return [self.indices[i] for i in positions if compiled.search(self.texts[i])]
+
+
+class ParagraphIndexCache:
+    """按文档版本缓存段落索引
+
+    版本由调用方给出（如文件路径、修改时间和大小，或上传内容的哈希）。
+    同一版本第一次查询时直接扫描，第二次查询时才构建索引，只查询一次的文档不承担建索引的开销。
+    """
+
+    def __init__(self, max_entries: int = 16):
+        """初始化
+
+        Args:
+            max_entries: 最多缓存的文档版本数
+        """
+        self.max_entries = max(1, int(max_entries))
+        # 版本 -> 索引；值为 None 表示该版本只被查询过一次
+        self._entries: "OrderedDict[Hashable, Optional[ParagraphIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version: Hashable, paragraphs: List[Dict]) -> Optional[ParagraphIndex]:
+        """获取文档版本对应的索引
+
+        Args:
+            version: 文档版本
+            paragraphs: 该版本的段落列表
+
+        Returns:
+            索引；该版本第一次出现时返回 None，调用方应直接扫描
+        """
+        with self._lock:
+            if version not in self._entries:
+                self._remember(version, None)
+                return None
+            self._entries.move_to_end(version)
+            index = self._entries[version]
+        if index is None:
+            index = ParagraphIndex(paragraphs)
+            with self._lock:
+                self._remember(version, index)
+        return index
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, version: Hashable, index: Optional[ParagraphIndex]):
+        self._entries[version] = index
+        self._entries.move_to_end(version)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+@lru_cache(maxsize=256)
+def compile_pattern(pattern: str):
+    """编译正则（带缓存）"""
+    return re.compile(pattern)
+
+
+def literal_prefix(pattern: str) -> str:
+    """提取正则开头必须出现的字面文本
+
+    含有分支（|）的正则不提取；前缀后紧跟可选量词时，去掉被量词修饰的最后一个字符。
+
+    Args:
+        pattern: 正则表达式
+
+    Returns:
+        字面前缀，无法提取时返回空字符串
+    """
+    if "|" in pattern:
+        return ""
+    chars = []
+    i = 1 if pattern.startswith("^") else 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            # \. 之类的转义是字面字符，\d、\w 等字符类则结束前缀
+            if i + 1 < len(pattern) and not pattern[i + 1].isalnum():
+                chars.append(pattern[i + 1])
+                i += 2
+                continue
+            break
+        if char in REGEX_META:
+            if char in OPTIONAL_QUANTIFIERS and chars:
+                chars.pop()
+            break
+        chars.append(char)
+        i += 1
+    return "".join(chars)
+
+
+_index_cache = ParagraphIndexCache()
+
+
+def get_paragraph_index(paragraphs: List[Dict], version: Hashable) -> Optional[ParagraphIndex]:
+    """获取文档版本对应的共享索引（第一次查询该版本时返回 None）"""
+    return _index_cache.get(version, paragraphs)
+
+
+def find_indices(paragraphs: List[Dict], rule: Dict, index: Optional[ParagraphIndex] = None) -> List[int]:
     """
     paragraphs: List[dict]，每个dict包含 index 和 text
     rule: dict，描述查找规则，如
         {'type': 'keyword', 'value': '待办'}
         {'type': 'regex', 'value': 'TODO.*'}
+    index: 由 paragraphs 构建的 ParagraphIndex，为 None 时逐段扫描
     返回：符合条件的 index 列表
     """
-    indices = []
     if rule['type'] == 'keyword':
-        for para in paragraphs:
-            if rule['value'] in para['text']:
-                indices.append(para['index'])
+        if index is not None:
+            return index.find_keyword(rule['value'])
+        return [para['index'] for para in paragraphs if rule['value'] in para['text']]
     elif rule['type'] == 'regex':
-        pattern = re.compile(rule['value'])
-        for para in paragraphs:
-            if pattern.search(para['text']):
-                indices.append(para['index'])
+        if index is not None:
+            return index.find_regex(rule['value'])
+        pattern = compile_pattern(rule['value'])
+        return [para['index'] for para in paragraphs if pattern.search(para['text'])]
     else:
         raise ValueError(f"不支持的查找类型: {rule['type']}")
-    return indices
\ No newline at end of file
@@ -1,16 +1,43 @@
-import openai
 import json
 import re
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 
-def get_modification_rule(paragraphs: List[Dict], user_instruction: str, openai_api_key: str) -> Tuple[Dict, str]:
-    prompt = f"""文档结构如下：\n" + "\n".join([f"{p['index']}: {p['text']}" for p in paragraphs]) + f"\n用户指令：“{user_instruction}”\n请只返回查找规则（如关键词/正则）和新内容，格式为：\n{{\n  \"rule\": {{\"type\": \"keyword\", \"value\": \"待办\"}},\n  \"new_text\": \"已完成\"\n}}\n不要输出任何解释。"
-    response = openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role": "user", "content": prompt}],
-        api_key=openai_api_key
+from ai.context_builder import ContextBuilder
+from ai.openai_api import AsyncLLMClient, get_llm_client, extract_message_content
+from ai.prompt_builder import default_prompt_builder
+from ai.prompt_templates import MODIFICATION_RULE_SYSTEM_PROMPT, MODIFICATION_RULE_USER_PROMPT
+
+# 长文档只把与指令相关的段落（带序号）放进提示词
+default_context_builder = ContextBuilder()
+
+def build_modification_prompt(paragraphs: List[Dict], user_instruction: str,
+                              context_builder: Optional[ContextBuilder] = None) -> str:
+    """按请求变化的提示词部分（文档结构和指令），静态说明在 system 消息中"""
+    builder = context_builder or default_context_builder
+    document_structure = builder.build(paragraphs, user_instruction).text
+    return MODIFICATION_RULE_USER_PROMPT.format(
+        document_structure=document_structure,
+        instruction=user_instruction
+    )
+
+def build_modification_messages(paragraphs: List[Dict], user_instruction: str,
+                                context_builder: Optional[ContextBuilder] = None) -> List[Dict[str, str]]:
+    """静态说明在前的对话消息，便于命中服务端的提示词前缀缓存"""
+    return [
+        default_prompt_builder.system_message(MODIFICATION_RULE_SYSTEM_PROMPT),
+        {"role": "user", "content": build_modification_prompt(paragraphs, user_instruction, context_builder)}
+    ]
+
+def get_modification_rule(paragraphs: List[Dict], user_instruction: str, openai_api_key: str,
+                          client: Optional[AsyncLLMClient] = None,
+                          context_builder: Optional[ContextBuilder] = None) -> Tuple[Dict, str]:
+    messages = build_modification_messages(paragraphs, user_instruction, context_builder)
+    client = client or get_llm_client()
+    response = client.chat_completion(
+        messages,
+        api_key=openai_api_key or None
     )
-    content = response['choices'][0]['message']['content']
+    content = extract_message_content(response)
     # 尝试直接解析
     try:
         result = json.loads(content)
@@ -28,4 +55,4 @@ def get_modification_rule(paragraphs: List[Dict], user_instruction: str, openai_
                 return rule, new_text
             except Exception:
                 pass
-        raise RuntimeError(f"LLM返回内容解析失败: {content}")
\ No newline at end of file
+        raise RuntimeError(f"LLM返回内容解析失败: {content}")
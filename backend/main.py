@@ -1,12 +1,21 @@
-from fastapi import FastAPI, UploadFile, File, Form
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.responses import FileResponse, JSONResponse
-from backend.schemas import EditTextRequest, EditTextResponse, ParseRequest, ParseResponse
-from backend.word_utils import edit_text, parse_docx_structure
+from backend.schemas import EditTextRequest, EditTextResponse, ParseRequest, ParseResponse, LocateResponse
+from utils.bm25 import BM25Index
+from backend.upload_store import ParseResultCache, UploadStore
+from backend.word_utils import edit_text, parse_docx_structure, parse_docx_structure_page
+from utils.pagination import encode_cursor, resolve_page
 import os
 
 app = FastAPI()
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+# 上传目录，可通过环境变量 UPLOAD_DIR 指定
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+# 上传文件按内容哈希存放，相同内容只保存一份；目录在第一次上传时创建
+upload_store = UploadStore(UPLOAD_DIR)
+# 解析结果按（内容哈希, 分页窗口）缓存，重复上传同一文件不再重新解析
+parse_cache = ParseResultCache(max_entries=256)
+# 按内容哈希缓存的 (段落列表, BM25 索引)
+locate_cache = ParseResultCache(max_entries=64)
 
 @app.post("/edit_text", response_model=EditTextResponse)
 def edit_text_api(
@@ -16,10 +25,8 @@ def edit_text_api(
     op_type: str = Form(...),
     content: str = Form(None)
 ):
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-    with open(file_path, "wb") as f:
-        f.write(file.file.read())
-    result = edit_text(file_path, locate_type, locate_value, op_type, content)
+    stored = upload_store.save(file.file, file.filename)
+    result = edit_text(stored.path, locate_type, locate_value, op_type, content)
     if result["success"]:
         return EditTextResponse(
             success=True,
@@ -30,14 +37,60 @@ def edit_text_api(
         return EditTextResponse(success=False, message=result["message"])
 
 @app.post("/parse", response_model=ParseResponse)
-def parse_api(file: UploadFile = File(...)):
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-    with open(file_path, "wb") as f:
-        f.write(file.file.read())
-    structure = parse_docx_structure(file_path)
-    return structure
+def parse_api(
+    file: UploadFile = File(None),
+    upload_id: str = Form(None),
+    offset: int = Form(0),
+    limit: int = Form(None),
+    cursor: str = Form(None)
+):
+    # offset/limit 按块（段落和表格按文档顺序统一计数）分页，cursor 优先；不传 limit 时返回全部
+    # 后续页传入上一页返回的 upload_id 和 next_cursor，不必重新上传文件
+    try:
+        start, page_size = resolve_page(offset, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if file is not None:
+        stored = upload_store.save(file.file, file.filename)
+    elif upload_id:
+        stored = upload_store.get(upload_id)
+        if stored is None:
+            raise HTTPException(status_code=404, detail=f"上传文件不存在: {upload_id}")
+    else:
+        raise HTTPException(status_code=400, detail="需要上传文件或提供 upload_id")
+    cached = parse_cache.get_or_compute(
+        (stored.digest, start, page_size),
+        lambda: parse_docx_structure_page(stored.path, start, page_size)
+    )
+    next_offset = cached["next_offset"]
+    return {
+        "paragraphs": cached["paragraphs"],
+        "tables": cached["tables"],
+        "next_cursor": encode_cursor(next_offset) if next_offset is not None else None,
+        "upload_id": stored.digest
+    }
+
+@app.post("/locate", response_model=LocateResponse)
+def locate_api(
+    file: UploadFile = File(...),
+    query: str = Form(...),
+    top_k: int = Form(5)
+):
+    # 本地 BM25 排序，返回与自然语言描述最相关的候选段落
+    stored = upload_store.save(file.file, file.filename)
+
+    def build():
+        paragraphs = parse_docx_structure(stored.path)['paragraphs']
+        return paragraphs, BM25Index([p['text'] for p in paragraphs])
+
+    paragraphs, index = locate_cache.get_or_compute(stored.digest, build)
+    candidates = [
+        {"index": paragraphs[position]['index'], "score": round(score, 4), "text": paragraphs[position]['text']}
+        for position, score in index.search(query, max(1, min(top_k, 50)))
+    ]
+    return {"candidates": candidates}
 
 @app.get("/download/{filename}")
 def download_file(filename: str):
-    file_path = os.path.join(UPLOAD_DIR, filename)
+    file_path = os.path.join(upload_store.root, filename)
     return FileResponse(file_path, media_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document', filename=filename)
\ No newline at end of file
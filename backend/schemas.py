@@ -34,4 +34,14 @@ class Table(BaseModel):
 
 class ParseResponse(BaseModel):
     paragraphs: List[Paragraph]
-    tables: List[Table]
\ No newline at end of file
+    tables: List[Table]
+    next_cursor: Optional[str] = Field(None, description="下一页游标，没有更多内容时为空")
+    upload_id: Optional[str] = Field(None, description="上传 ID，后续页与 next_cursor 一起传入即可不再上传文件")
+
+class LocateCandidate(BaseModel):
+    index: int
+    score: float
+    text: str
+
+class LocateResponse(BaseModel):
+    candidates: List[LocateCandidate]
\ No newline at end of file
@@ -8,7 +8,7 @@ from backend.word_utils import parse_docx_structure
 class DummyLLM:
     """Mock LLM，始终返回关键词查找规则和新内容。"""
     @staticmethod
-    def get_modification_rule(paragraphs, user_instruction, openai_api_key):
+    def get_modification_rule(paragraphs, user_instruction, openai_api_key, client=None):
         return {"type": "keyword", "value": "待办"}, "已完成"
 
 @pytest.fixture(autouse=True)
@@ -33,4 +33,34 @@ def test_agent_nl_modify(temp_docx):
     for para in structure['paragraphs']:
         if '待办' in para['text']:
             # 应该都被替换成“已完成”
-            assert para['text'] == '已完成'
\ No newline at end of file
+            assert para['text'] == '已完成'
+
+def test_edit_text_batch(temp_docx):
+    from backend.word_utils import edit_text_batch
+    edits = [
+        {"locate_type": "index", "locate_value": "0", "op_type": "replace", "content": "新标题"},
+        {"locate_type": "nl", "locate_value": "待办", "op_type": "delete", "content": None},
+        {"locate_type": "regex", "locate_value": "^不存在$", "op_type": "replace", "content": "x"},
+    ]
+    result = edit_text_batch(temp_docx, edits)
+    assert not result["success"]
+    assert [e["edit"] for e in result["errors"]] == [2]
+    assert result["structure"] == parse_docx_structure(result["download_url"])
+    assert result["changed"][0] == {"index": 0, "text": "新标题"}
+    assert len(result["changed"]) == 2
+
+def test_edit_text_batch_reports_bad_locators(temp_docx):
+    from backend.word_utils import edit_text_batch
+    edits = [
+        {"locate_type": "xpath", "locate_value": "//p", "op_type": "replace", "content": "x"},
+        {"locate_type": "index", "locate_value": "第一段", "op_type": "replace", "content": "x"},
+        {"locate_type": "regex", "locate_value": "(", "op_type": "replace", "content": "x"},
+        {"locate_type": "index", "locate_value": "-1", "op_type": "replace", "content": "x"},
+        {"locate_type": "index", "locate_value": "0", "op_type": "replace", "content": "新标题"},
+    ]
+    result = edit_text_batch(temp_docx, edits)
+    # 每个失败的编辑单独记录，后面的编辑照常执行
+    assert [e["edit"] for e in result["errors"]] == [0, 1, 2, 3]
+    assert "未知定位方式" in result["errors"][0]["message"]
+    assert result["changed"] == [{"index": 0, "text": "新标题"}]
+    assert parse_docx_structure(result["download_url"])["paragraphs"][0]["text"] == "新标题"
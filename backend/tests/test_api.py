@@ -1,10 +1,21 @@
+import io
 import os
 import pytest
+from docx import Document
 from fastapi.testclient import TestClient
+from backend import main
 from backend.main import app
+from backend.upload_store import UploadStore
 
 client = TestClient(app)
 
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    # 上传文件和编辑结果写入临时目录，不留在仓库中
+    store = UploadStore(str(tmp_path / "uploads"))
+    monkeypatch.setattr(main, "upload_store", store)
+    return store
+
 def test_edit_text():
     test_file = os.path.join(os.path.dirname(__file__), '../test.docx')
     with open(test_file, 'rb') as f:
@@ -24,6 +35,26 @@ def test_edit_text():
     assert "download_url" in data
     assert "structure" in data
 
+def test_edit_text_same_upload_keeps_each_result():
+    test_file = os.path.join(os.path.dirname(__file__), '../test.docx')
+    results = []
+    for content in ("第一次编辑", "第二次编辑"):
+        with open(test_file, 'rb') as f:
+            response = client.post(
+                "/edit_text",
+                files={"file": ("test.docx", f, "application/vnd.openxmlformats-officedocument.wordprocessingml.document")},
+                data={"locate_type": "index", "locate_value": "0", "op_type": "replace", "content": content}
+            )
+        assert response.status_code == 200 and response.json()["success"]
+        results.append(response.json())
+    # 相同内容共用一份上传文件，但两次编辑的结果互不覆盖
+    assert results[0]["download_url"] != results[1]["download_url"]
+    for result, content in zip(results, ("第一次编辑", "第二次编辑")):
+        assert result["structure"]["paragraphs"][0]["text"] == content
+        downloaded = client.get(result["download_url"])
+        assert downloaded.status_code == 200
+        assert Document(io.BytesIO(downloaded.content)).paragraphs[0].text == content
+
 def test_parse():
     test_file = os.path.join(os.path.dirname(__file__), '../test.docx')
     with open(test_file, 'rb') as f:
@@ -34,4 +65,94 @@ def test_parse():
     assert response.status_code == 200
     data = response.json()
     assert "paragraphs" in data
-    assert "tables" in data
\ No newline at end of file
+    assert "tables" in data
+
+def test_parse_paginated():
+    test_file = os.path.join(os.path.dirname(__file__), '../test.docx')
+
+    def fetch(**data):
+        with open(test_file, 'rb') as f:
+            response = client.post(
+                "/parse",
+                files={"file": ("test.docx", f, "application/vnd.openxmlformats-officedocument.wordprocessingml.document")},
+                data=data
+            )
+        assert response.status_code == 200
+        return response.json()
+
+    full = fetch()
+    assert full["next_cursor"] is None
+    paragraphs, tables = [], []
+    page = fetch(limit="2")
+    while True:
+        paragraphs += page["paragraphs"]
+        tables += page["tables"]
+        if not page["next_cursor"]:
+            break
+        page = fetch(limit="2", cursor=page["next_cursor"])
+    assert paragraphs == full["paragraphs"]
+    assert tables == full["tables"]
+
+def test_parse_reuses_identical_upload():
+    from backend.main import parse_cache, upload_store
+    test_file = os.path.join(os.path.dirname(__file__), '../test.docx')
+    hits = parse_cache.stats()["hits"]
+    dedup_hits = upload_store.stats()["dedup_hits"]
+    results = []
+    for name in ("a.docx", "b.docx"):
+        with open(test_file, 'rb') as f:
+            response = client.post(
+                "/parse",
+                files={"file": (name, f, "application/vnd.openxmlformats-officedocument.wordprocessingml.document")},
+                data={"limit": "7"}
+            )
+        assert response.status_code == 200
+        results.append(response.json())
+    assert results[0] == results[1]
+    assert parse_cache.stats()["hits"] == hits + 1
+    assert upload_store.stats()["dedup_hits"] >= dedup_hits + 1
+
+def test_parse_pages_by_upload_id():
+    from backend.main import upload_store
+    test_file = os.path.join(os.path.dirname(__file__), '../test.docx')
+    with open(test_file, 'rb') as f:
+        full = client.post(
+            "/parse",
+            files={"file": ("test.docx", f, "application/vnd.openxmlformats-officedocument.wordprocessingml.document")}
+        ).json()
+    with open(test_file, 'rb') as f:
+        page = client.post(
+            "/parse",
+            files={"file": ("test.docx", f, "application/vnd.openxmlformats-officedocument.wordprocessingml.document")},
+            data={"limit": "2"}
+        ).json()
+    upload_id = page["upload_id"]
+    assert upload_id == full["upload_id"]
+
+    # 后续页只传 upload_id 和游标，不再上传
+    uploads = upload_store.stats()["uploads"]
+    paragraphs, tables = [], []
+    while True:
+        paragraphs += page["paragraphs"]
+        tables += page["tables"]
+        if not page["next_cursor"]:
+            break
+        response = client.post("/parse", data={"upload_id": upload_id, "limit": "2", "cursor": page["next_cursor"]})
+        assert response.status_code == 200
+        page = response.json()
+    assert paragraphs == full["paragraphs"]
+    assert tables == full["tables"]
+    assert upload_store.stats()["uploads"] == uploads
+
+    assert client.post("/parse", data={"upload_id": "0" * 64}).status_code == 404
+    assert client.post("/parse", data={"upload_id": "../main"}).status_code == 404
+    assert client.post("/parse", data={"limit": "2"}).status_code == 400
+
+def test_upload_store_creates_directory_on_first_save(tmp_path):
+    root = tmp_path / "store"
+    store = UploadStore(str(root))
+    assert not root.exists()
+    assert store.get("0" * 64) is None
+    stored = store.save(io.BytesIO(b"docx bytes"), "a.DOCX")
+    assert os.path.dirname(stored.path) == str(root) and stored.path.endswith(".docx")
+    assert store.get(stored.digest).path == stored.path
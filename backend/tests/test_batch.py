@@ -0,0 +1,71 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from api import word_api
+from docx import Document
+from api.models import BatchJob, ProcessRequest, WordOperation, OperationType
+from word_agent.agent_engine import WordAgent
+from word_agent.batch import group_batch_jobs
+
+
+def _add_text(content):
+    return WordOperation(operation_type=OperationType.ADD_TEXT, content=content)
+
+
+def test_group_batch_jobs():
+    jobs = [
+        BatchJob(document_path="a.docx", instructions=["1"]),
+        BatchJob(instructions=["2"]),
+        BatchJob(document_path="b.docx", instructions=["3"]),
+        BatchJob(document_path="a.docx", instructions=["4"]),
+        BatchJob(instructions=["5"]),
+    ]
+    groups = group_batch_jobs(jobs)
+    assert [[index for index, _ in group] for group in groups] == [[0, 3], [1], [2], [4]]
+    assert group_batch_jobs([]) == []
+
+
+@pytest.fixture
+def agent(tmp_path):
+    agent = WordAgent({
+        "workspace": str(tmp_path),
+        "parse_cache_enabled": False,
+        "batch_workers": 2,
+        "log_path": str(tmp_path / "app.log")
+    })
+    yield agent
+    agent.shutdown()
+
+
+def test_batch_ndjson_stream(agent, monkeypatch):
+    monkeypatch.setattr(word_api, "word_agent", agent)
+    jobs = [
+        {"instructions": ["", "  "], "operations": [_add_text(f"第{i}段").model_dump(mode="json")]}
+        for i in range(3)
+    ]
+    client = TestClient(word_api.app)
+    response = client.post("/api/word/batch", json={"jobs": jobs, "stream": True})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = [json.loads(line) for line in response.text.splitlines()]
+    # 按完成顺序返回，每个任务一行
+    assert sorted(result["job_index"] for result in results) == [0, 1, 2]
+    for result in results:
+        # 空指令被跳过，不计入失败
+        assert result["success"] and result["failed_instructions"] == []
+        assert result["operations_performed"] == 1
+
+    ordered = agent.process_batch([BatchJob(**job) for job in jobs])
+    assert [result.job_index for result in ordered] == [0, 1, 2]
+
+
+def test_batch_does_not_count_document_cache_lookups(agent, tmp_path):
+    path = str(tmp_path / "cached.docx")
+    Document().save(path)
+    agent.process_instruction(ProcessRequest(instruction="", document_path=path, operations=[_add_text("缓存")]))
+    stats = agent.get_cache_stats()
+
+    results = agent.process_batch([BatchJob(document_path=path, operations=[_add_text("批处理")])])
+    assert results[0].success
+    after = agent.get_cache_stats()
+    assert (after["hits"], after["misses"]) == (stats["hits"], stats["misses"])
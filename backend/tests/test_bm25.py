@@ -0,0 +1,29 @@
+from utils.bm25 import BM25Index, rank_paragraphs, tokenize
+
+
+PARAGRAPHS = [
+    {"index": 0, "text": "项目周报"},
+    {"index": 1, "text": "本周完成了接口联调和数据库迁移"},
+    {"index": 2, "text": "下周计划：预算审核与人员招聘"},
+    {"index": 3, "text": "风险：服务器采购延期可能影响上线"},
+    {"index": 4, "text": "Budget review meeting on Friday"},
+]
+
+
+def test_tokenize_mixed_text():
+    assert tokenize("Q3预算 Review") == ["q3", "预", "算", "预算", "review"]
+
+
+def test_rank_paragraphs():
+    assert rank_paragraphs(PARAGRAPHS, "关于预算的那段", top_k=1)[0]["index"] == 2
+    assert rank_paragraphs(PARAGRAPHS, "服务器延期的风险")[0]["index"] == 3
+    assert rank_paragraphs(PARAGRAPHS, "budget meeting")[0]["index"] == 4
+    assert rank_paragraphs(PARAGRAPHS, "xyz") == []
+
+
+def test_update_matches_rebuild():
+    texts = [p["text"] for p in PARAGRAPHS]
+    index = BM25Index(texts)
+    texts[2] = "服务器预算"
+    index.update(2, texts[2])
+    assert index.search("服务器", 5) == BM25Index(texts).search("服务器", 5)
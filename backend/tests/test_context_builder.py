@@ -0,0 +1,26 @@
+from ai.context_builder import ContextBuilder
+from backend.llm_client import build_modification_prompt
+
+
+def test_small_document_kept_whole():
+    paragraphs = [{"index": 0, "text": "项目周报"}, {"index": 1, "text": "待办"}]
+    context = ContextBuilder(2000).build(paragraphs, "把待办改成已完成")
+    assert context.text == "0: 项目周报\n1: 待办"
+    assert not context.truncated
+
+
+def test_large_document_ranked_under_budget():
+    paragraphs = [f"第{i}节 常规内容 lorem ipsum dolor sit amet" for i in range(2000)]
+    paragraphs[1234] = "风险：服务器采购延期可能影响上线"
+    context = ContextBuilder(300).build(paragraphs, "把服务器采购延期那段改成已解决")
+    assert context.truncated
+    assert 1234 in context.indices and 0 in context.indices
+    assert "1234: 风险：服务器采购延期可能影响上线" in context.text
+    assert context.token_count <= 300
+
+    prompt = build_modification_prompt(
+        [{"index": i, "text": text} for i, text in enumerate(paragraphs)],
+        "把服务器采购延期那段改成已解决"
+    )
+    assert "1234: 风险" in prompt
+    assert "1000: 第1000节" not in prompt
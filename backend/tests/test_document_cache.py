@@ -0,0 +1,66 @@
+from document.word_processor import WordProcessor
+from word_agent.document_cache import DocumentCache
+
+
+def _processor(paragraphs=1):
+    processor = WordProcessor()
+    for i in range(paragraphs):
+        processor.add_text(f"第{i}段")
+    return processor
+
+
+def test_lru_eviction_calls_on_evict():
+    evicted = []
+    cache = DocumentCache(max_entries=2, max_bytes=0, on_evict=lambda key, p: evicted.append(key))
+    for key in ("a", "b"):
+        cache.put(key, _processor())
+    assert cache.get("a") is not None
+    cache.put("c", _processor())
+    # b 最近最少使用
+    assert evicted == ["b"]
+    assert list(cache) == ["a", "c"]
+    assert cache.stats()["evictions"] == 1
+
+    cache.pop("a")
+    cache.clear()
+    assert evicted == ["b", "c"] and len(cache) == 0
+
+
+def test_byte_limit_keeps_newest_entry():
+    evicted = []
+    small = _processor()
+    size = small.estimate_memory_size()
+    cache = DocumentCache(max_entries=10, max_bytes=size * 2, on_evict=lambda key, p: evicted.append(key))
+    cache.put("small", small)
+    cache.put("large", _processor(200))
+    # 新放入的文档单独超出预算时保留它，淘汰其他条目
+    assert evicted == ["small"] and list(cache) == ["large"]
+
+
+def test_memory_estimate_is_incremental():
+    processor = _processor(5)
+    size = processor.estimate_memory_size()
+    processor.add_text("新段落")
+    grown = processor.estimate_memory_size()
+    assert grown > size
+    processor.delete_text("新段落")
+    processor.add_heading("标题")
+    # 增量结果与重新扫描一致
+    assert processor.estimate_memory_size() == processor._scan_memory_size()
+    processor.invalidate_text_index()
+    assert processor._memory_size is None
+
+
+def test_peek_does_not_touch_stats_or_order():
+    cache = DocumentCache(max_entries=2, max_bytes=0)
+    first, second = _processor(), _processor()
+    cache.put("a", first)
+    cache.put("b", second)
+    cache.alias("a.out", "a")
+    stats = cache.stats()
+
+    assert cache.peek("a") is first and cache.peek("a.out") is first
+    assert cache.peek("missing") is None
+    assert cache.stats() == stats
+    # a 仍是最久未使用的条目
+    assert list(cache) == ["a", "b"]
@@ -0,0 +1,39 @@
+import os
+
+from docx import Document
+
+from backend.word_utils import parse_docx_structure
+
+
+def _structure_from_document(docx_path):
+    """用 python-docx 读取结构，作为对照"""
+    doc = Document(docx_path)
+    return {
+        "paragraphs": [{"index": i, "text": p.text} for i, p in enumerate(doc.paragraphs)],
+        "tables": [
+            {
+                "index": t_idx,
+                "rows": len(table.rows),
+                "cols": len(table.columns),
+                "content": [[cell.text for cell in row.cells] for row in table.rows]
+            }
+            for t_idx, table in enumerate(doc.tables)
+        ]
+    }
+
+
+def test_streaming_structure_matches_python_docx(tmp_path):
+    doc = Document(os.path.join(os.path.dirname(__file__), '../test.docx'))
+    paragraph = doc.add_paragraph("制表\t符")
+    paragraph.add_run("换\n行")
+    table = doc.add_table(rows=3, cols=3)
+    for i in range(3):
+        for j in range(3):
+            table.cell(i, j).text = f"{i}{j}"
+    table.cell(0, 0).merge(table.cell(0, 1))
+    table.cell(0, 2).merge(table.cell(2, 2))
+    table.cell(1, 0).add_paragraph("第二段")
+    path = str(tmp_path / "merged.docx")
+    doc.save(path)
+
+    assert parse_docx_structure(path) == _structure_from_document(path)
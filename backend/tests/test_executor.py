@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+import pytest
+from word_agent.executor import DocumentExecutor
+
+
+class ConcurrencyProbe:
+    """记录同时运行的任务数"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def task(self, duration=0.05, result=None):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(duration)
+            return result
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+@pytest.fixture
+def executor():
+    executor = DocumentExecutor(max_workers=4)
+    yield executor
+    executor.shutdown()
+
+
+def test_same_document_tasks_never_overlap(executor, tmp_path):
+    probe = ConcurrencyProbe()
+    path = str(tmp_path / "a.docx")
+
+    async def main():
+        # 同一文件的不同写法映射到同一把锁
+        paths = [path, str(tmp_path / "." / "a.docx"), path, path]
+        return await asyncio.gather(*(executor.run(p, probe.task, 0.03, i) for i, p in enumerate(paths)))
+
+    assert asyncio.run(main()) == [0, 1, 2, 3]
+    assert probe.peak == 1
+    assert executor.stats()["locked_documents"] == 0
+
+
+def test_different_documents_run_in_parallel(executor, tmp_path):
+    # 两个任务必须同时运行才能通过屏障
+    barrier = threading.Barrier(2, timeout=2)
+
+    def wait_for_other(name):
+        barrier.wait()
+        return name
+
+    async def main():
+        return await asyncio.gather(
+            executor.run(str(tmp_path / "a.docx"), wait_for_other, "a"),
+            executor.run(str(tmp_path / "b.docx"), wait_for_other, "b"),
+        )
+
+    assert asyncio.run(main()) == ["a", "b"]
+
+
+def test_pool_size_bounds_concurrency(tmp_path):
+    executor = DocumentExecutor(max_workers=2)
+    probe = ConcurrencyProbe()
+
+    def fail():
+        raise ValueError("失败")
+
+    async def main():
+        await asyncio.gather(*(executor.run(str(tmp_path / f"{i}.docx"), probe.task) for i in range(6)))
+        await asyncio.gather(*(executor.run(None, probe.task) for _ in range(4)))
+        with pytest.raises(ValueError):
+            await executor.run(None, fail)
+
+    try:
+        asyncio.run(main())
+        assert probe.peak == 2
+        stats = executor.stats()
+        assert stats["max_workers"] == 2
+        assert stats["completed"] == 10 and stats["failed"] == 1
+        assert stats["running"] == 0 and stats["queued"] == 0
+    finally:
+        executor.shutdown()
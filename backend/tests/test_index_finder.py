@@ -0,0 +1,40 @@
+import re
+
+from backend.index_finder import ParagraphIndex, find_indices, get_paragraph_index
+
+
+PARAGRAPHS = [
+    {"index": 0, "text": "项目周报"},
+    {"index": 1, "text": "待办：整理需求"},
+    {"index": 2, "text": "已完成：接口联调 v1.2"},
+    {"index": 3, "text": "待办事项 TODO: review"},
+    {"index": 4, "text": ""},
+]
+
+RULES = [
+    {"type": "keyword", "value": "待办"},
+    {"type": "keyword", "value": "办"},
+    {"type": "keyword", "value": ""},
+    {"type": "keyword", "value": "不存在"},
+    {"type": "regex", "value": "^待办.*需求"},
+    {"type": "regex", "value": r"v1\.\d"},
+    {"type": "regex", "value": "TODO?:"},
+    {"type": "regex", "value": "周报|联调"},
+]
+
+
+def test_index_matches_scan():
+    index = ParagraphIndex(PARAGRAPHS)
+    for rule in RULES:
+        expected = find_indices(PARAGRAPHS, rule)
+        assert find_indices(PARAGRAPHS, rule, index=index) == expected
+        if rule["type"] == "regex":
+            assert expected == [p["index"] for p in PARAGRAPHS if re.search(rule["value"], p["text"])]
+
+
+def test_index_built_on_second_use():
+    version = ("test-doc", 1)
+    assert get_paragraph_index(PARAGRAPHS, version) is None
+    index = get_paragraph_index(PARAGRAPHS, version)
+    assert isinstance(index, ParagraphIndex)
+    assert get_paragraph_index(PARAGRAPHS, version) is index
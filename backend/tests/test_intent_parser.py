@@ -0,0 +1,59 @@
+import pytest
+from word_agent.intent_parser import IntentParser
+
+THRESHOLD = 0.85
+
+parser = IntentParser()
+
+
+@pytest.mark.parametrize("instruction, expected", [
+    ("添加二级标题：项目背景", {"operation_type": "add_heading", "content": "项目背景", "metadata": {"level": 2}}),
+    ("添加标题“概述”", {"operation_type": "add_heading", "content": "概述", "metadata": {"level": 1}}),
+    ("插入一个3行4列的表格", {"operation_type": "add_table", "table_data": {"rows": 3, "cols": 4}}),
+    ("插入一个五行两列的表格", {"operation_type": "add_table", "table_data": {"rows": 5, "cols": 2}}),
+    ("插入一个2x3的表格", {"operation_type": "add_table", "table_data": {"rows": 2, "cols": 3}}),
+    # 只给出列数时按表头加默认数据行数补齐
+    ("插入一个三列表格，表头为姓名、年龄、城市", {
+        "operation_type": "add_table",
+        "table_data": {"rows": 3, "cols": 3, "headers": ["姓名", "年龄", "城市"]}
+    }),
+    ("把待办改成已完成", {"operation_type": "modify_text", "content": "已完成", "metadata": {"old_text": "待办"}}),
+    ("将“草稿”替换为“终稿”", {"operation_type": "modify_text", "content": "终稿", "metadata": {"old_text": "草稿"}}),
+    ("删除“临时备注”", {"operation_type": "delete_text", "content": "临时备注"}),
+    ("在开头添加一段文字：前言", {"operation_type": "add_text", "content": "前言", "position": "beginning"}),
+    ("在第2段后面添加文字：补充说明", {"operation_type": "add_text", "content": "补充说明", "position": "after:1"}),
+    # 内容中的序数是原文，不是位置引用
+    ("添加标题 第一章", {"operation_type": "add_heading", "content": "第一章", "metadata": {"level": 1}}),
+    ("添加二级标题 第二节 方法", {"operation_type": "add_heading", "content": "第二节 方法", "metadata": {"level": 2}}),
+    ("添加段落 第三节内容", {"operation_type": "add_text", "content": "第三节内容", "position": "end"}),
+    ("添加一个有序列表，包括苹果、香蕉、橙子", {
+        "operation_type": "add_list", "metadata": {"items": ["苹果", "香蕉", "橙子"], "ordered": True}
+    }),
+])
+def test_simple_instructions_parsed_locally(instruction, expected):
+    result = parser.parse(instruction)
+    assert result.confidence >= THRESHOLD, result.reasons
+    assert [op.model_dump(mode="json", exclude_none=True) for op in result.operations] == [expected]
+
+
+@pytest.mark.parametrize("instruction", [
+    # 复合指令
+    "添加标题“概述”，然后插入一个3行4列的表格",
+    "删除“草稿”并且添加一段文字：终稿",
+    # 需要生成内容
+    "添加一段关于人工智能的介绍",
+    "总结全文并添加到末尾",
+    "在文档末尾撰写一段项目总结",
+    # 样式、相对位置和非文本对象
+    "把标题加粗",
+    "把上面这段改成红色",
+    "删除表格",
+    "把第三段改成你好",
+    "在第三段添加 你好",
+    "添加段落 和上面一样",
+    # 缺少槽位
+    "添加一个表格",
+    "",
+])
+def test_ambiguous_instructions_stay_below_threshold(instruction):
+    assert parser.parse(instruction).confidence < THRESHOLD
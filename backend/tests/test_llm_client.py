@@ -0,0 +1,160 @@
+import json
+import httpx
+import pytest
+from ai.openai_api import AsyncLLMClient, LLMError
+from backend.llm_client import get_modification_rule
+
+def _chat_response(content):
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+def _make_client(handler, max_retries=3):
+    return AsyncLLMClient(
+        api_key="dummy",
+        base_url="http://llm.test/v1",
+        max_retries=max_retries,
+        backoff_base=0.001,
+        backoff_max=0.01,
+        transport=httpx.MockTransport(handler)
+    )
+
+def test_retry_on_server_error():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json=_chat_response("ok"))
+
+    client = _make_client(handler)
+    try:
+        response = client.chat_completion([{"role": "user", "content": "hi"}])
+        assert response["choices"][0]["message"]["content"] == "ok"
+        assert calls == ["/v1/chat/completions", "/v1/chat/completions"]
+        assert client.stats()["retries"] == 1
+    finally:
+        client.close()
+
+def test_no_retry_on_client_error():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(400, json={"error": "bad request"})
+
+    client = _make_client(handler)
+    try:
+        with pytest.raises(LLMError):
+            client.chat_completion([{"role": "user", "content": "hi"}])
+        assert len(calls) == 1
+    finally:
+        client.close()
+
+def test_get_modification_rule_uses_client():
+    def handler(request):
+        body = json.loads(request.content)
+        assert body["messages"][0]["role"] == "system"
+        assert "0: 待办" in body["messages"][-1]["content"]
+        assert request.headers["authorization"] == "Bearer sk-test"
+        content = '结果：{"rule": {"type": "keyword", "value": "待办"}, "new_text": "已完成"}'
+        return httpx.Response(200, json=_chat_response(content))
+
+    client = _make_client(handler)
+    try:
+        rule, new_text = get_modification_rule(
+            [{"index": 0, "text": "待办"}], "把待办改成已完成", "sk-test", client=client
+        )
+        assert rule == {"type": "keyword", "value": "待办"}
+        assert new_text == "已完成"
+    finally:
+        client.close()
+
+def _sse_response(text, size=5):
+    events = [
+        "data: " + json.dumps({"choices": [{"delta": {"content": text[i:i + size]}}]}, ensure_ascii=False)
+        for i in range(0, len(text), size)
+    ]
+    return httpx.Response(200, content=("\n\n".join(events + ["data: [DONE]"]) + "\n\n").encode("utf-8"))
+
+def test_stream_instruction_yields_operations():
+    from word_agent.command_parser import CommandParser
+    from ai.openai_api import OpenAIAPI
+    operations = [{"operation_type": "add_text", "content": f"第{i}段"} for i in range(3)]
+    text = "```json\n" + json.dumps(operations, ensure_ascii=False) + "\n```"
+
+    def handler(request):
+        assert json.loads(request.content)["stream"] is True
+        return _sse_response(text)
+
+    client = _make_client(handler)
+    try:
+        parser = CommandParser(OpenAIAPI(client=client))
+        stream = parser.stream_instruction("写三段内容")
+        assert stream.streaming
+        assert [op.content for op in stream] == ["第0段", "第1段", "第2段"]
+        assert stream.error is None and stream.source == "llm"
+
+        # 数组没有闭合时记录错误并给出回退结果
+        text = text[:len(text) // 2]
+        stream = parser.stream_instruction("写三段内容")
+        list(stream)
+        assert stream.error is not None
+        assert stream.source == "fallback" and stream.fallback
+    finally:
+        client.close()
+
+def test_static_prompt_first_and_usage_reported():
+    from word_agent.command_parser import CommandParser
+    from ai.openai_api import OpenAIAPI
+    bodies = []
+
+    def handler(request):
+        bodies.append(json.loads(request.content))
+        response = _chat_response("T|你好")
+        response["usage"] = {"prompt_tokens": 500, "completion_tokens": 5,
+                             "prompt_tokens_details": {"cached_tokens": 448}}
+        return httpx.Response(200, json=response)
+
+    client = _make_client(handler)
+    try:
+        parser = CommandParser(OpenAIAPI(client=client))
+        usage = {}
+        for instruction in ["写一段问候语", "写一段结束语"]:
+            parser.parse_instruction_with_source(instruction, paragraphs=["标题"], on_usage=usage.update)
+        # system 消息在前且每次相同，指令只出现在最后一条消息中
+        assert bodies[0]["messages"][0] == bodies[1]["messages"][0]
+        assert bodies[0]["messages"][0]["role"] == "system"
+        assert "写一段问候语" in bodies[0]["messages"][-1]["content"]
+        assert usage == {"prompt_tokens": 500, "cached_tokens": 448, "completion_tokens": 5}
+        assert client.stats()["cached_tokens"] == 896
+    finally:
+        client.close()
+
+def test_deadline_cancels_slow_llm_call():
+    import asyncio
+    import time
+    from word_agent.command_parser import CommandParser
+    from ai.openai_api import OpenAIAPI
+    from utils.deadline import Deadline
+
+    async def handler(request):
+        await asyncio.sleep(2)
+        return httpx.Response(200, json=_chat_response("T|太慢了"))
+
+    client = _make_client(handler)
+    try:
+        parser = CommandParser(OpenAIAPI(client=client))
+        started = time.monotonic()
+        deadline = Deadline(0.1)
+        operations, source = parser.parse_instruction_with_source("添加一段内容", deadline=deadline)
+        assert source == "fallback" and operations
+        assert deadline.exceeded
+
+        deadline = Deadline(0.1)
+        stream = parser.stream_instruction("添加一段内容", deadline=deadline)
+        assert list(stream) == []
+        assert stream.timed_out and stream.fallback and deadline.exceeded
+        assert time.monotonic() - started < 1.5
+        assert client.stats()["timeouts"] == 2
+    finally:
+        client.close()
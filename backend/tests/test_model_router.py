@@ -0,0 +1,29 @@
+import pytest
+from word_agent.model_router import ModelRouter
+
+TIERS = [
+    {"name": "large", "model": "big-model"},
+    {"name": "fast", "model": "small-model", "max_score": 0.35},
+]
+
+
+def test_route_by_complexity():
+    router = ModelRouter(TIERS)
+    assert router.route("加粗标题").tier.name == "fast"
+    complex_instruction = "在末尾添加一段关于项目进度的总结，然后把所有待办改成已完成，并插入一个三行四列的表格"
+    decision = router.route(complex_instruction, ["正文" * 50] * 100)
+    assert decision.tier.name == "large"
+    assert 0 < decision.score <= 1
+
+
+def test_tier_stats():
+    router = ModelRouter(TIERS)
+    router.route("加粗标题")
+    router.record("fast", 120.0, operations=2, succeeded=1)
+    router.record("fast", 80.0, failed=True)
+    stats = router.stats()["fast"]
+    assert stats["routed"] == 1 and stats["llm_calls"] == 2
+    assert stats["avg_latency_ms"] == 100.0
+    assert stats["fallback_rate"] == 0.5 and stats["success_rate"] == 0.5
+    with pytest.raises(ValueError):
+        ModelRouter([{"name": "no-model"}])
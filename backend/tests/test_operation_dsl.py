@@ -0,0 +1,37 @@
+import json
+from word_agent.command_parser import CommandParser
+from word_agent.operation_dsl import OperationDslStream, decode_operations, encode_operation
+
+PLAN = [
+    {"operation_type": "add_heading", "content": "项目周报", "metadata": {"level": 1}},
+    {"operation_type": "add_text", "content": "联调|测试\n第二行", "position": "after:3",
+     "style": {"bold": True, "font_size": 12, "color": "#FF0000"}},
+    {"operation_type": "modify_text", "content": "已完成", "metadata": {"old_text": "待办"}},
+    {"operation_type": "add_table", "table_data": {"rows": 2, "cols": 2, "headers": ["姓名", "进度"],
+                                                  "data": [["张三", "80%"], ["李四", "60%"]]}},
+]
+
+def _dump(parser, items):
+    return [parser._create_operation_from_dict(item).model_dump(exclude_none=True) for item in items]
+
+def test_round_trip_matches_json():
+    parser = CommandParser(openai_api=None)
+    text = "\n".join(encode_operation(item) for item in PLAN)
+    assert _dump(parser, decode_operations(text)) == _dump(parser, PLAN)
+
+def test_stream_decode_in_small_chunks():
+    text = "好的：\n" + "\n".join(encode_operation(item) for item in PLAN)
+    decoder = OperationDslStream()
+    items = []
+    for i in range(0, len(text), 3):
+        items.extend(decoder.feed(text[i:i + 3]))
+    items.extend(decoder.finish())
+    assert items == decode_operations(text)
+    assert len(items) == len(PLAN)
+
+def test_json_response_still_parsed():
+    parser = CommandParser(openai_api=None)
+    response = "```json\n" + json.dumps(PLAN, ensure_ascii=False) + "\n```"
+    assert decode_operations(response) == []
+    operations = parser._parse_ai_response(response)
+    assert [op.operation_type.value for op in operations] == [item["operation_type"] for item in PLAN]
@@ -0,0 +1,79 @@
+import random
+import pytest
+from api.models import TableData
+from document.word_processor import WordProcessor
+
+
+def _assert_index_consistent(processor):
+    """缓存的段落索引与 document.paragraphs 一致"""
+    paragraphs = processor.document.paragraphs
+    assert processor.get_paragraph_count() == len(paragraphs)
+    assert processor.get_paragraph_texts() == [p.text for p in paragraphs]
+    for index, paragraph in enumerate(paragraphs):
+        assert processor.get_paragraph(index)._p is paragraph._p
+    assert processor.get_paragraph(len(paragraphs)) is None
+    assert processor.get_paragraph(-1) is None
+
+
+def test_insert_delete_and_invalidate_interleaved():
+    processor = WordProcessor()
+    _assert_index_consistent(processor)
+
+    steps = [
+        lambda: processor.add_text("末尾一"),
+        lambda: processor.add_text("开头", position="beginning"),
+        lambda: processor.add_text("中间", position="after:0"),
+        lambda: processor.add_heading("标题", 2),
+        lambda: processor.add_list(["甲", "乙"], ordered=True),
+        lambda: processor.delete_text("中间"),
+        # 直接修改文档后丢弃索引
+        lambda: (processor.document.add_paragraph("直接添加"), processor.invalidate_text_index()),
+        lambda: processor.add_text("越界位置", position="after:99"),
+        lambda: processor.add_table(TableData(rows=1, cols=2, data=[["表格", "内容"]])),
+        lambda: processor.modify_text("甲", "丙"),
+        lambda: processor.delete_text("开头"),
+        lambda: processor.add_text("开头二", position="beginning"),
+    ]
+    for step in steps:
+        step()
+        _assert_index_consistent(processor)
+
+    assert "中间" not in processor.get_paragraph_texts()
+    assert processor.get_paragraph_texts()[0] == "开头二"
+
+
+@pytest.mark.parametrize("position", ["after:-1", "after:-3", "after:5"])
+def test_out_of_range_after_position_appends(position):
+    processor = WordProcessor()
+    for text in ("一", "二", "三"):
+        processor.add_text(text)
+    assert processor.add_text("新段落", position=position)
+    # 越界（包括负数）的位置按末尾追加，索引与文档一致
+    assert processor.get_paragraph_texts() == ["一", "二", "三", "新段落"]
+    _assert_index_consistent(processor)
+    assert processor.modify_text("一", "改")
+    assert [p.text for p in processor.document.paragraphs][0] == "改"
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_edits_keep_index_in_sync(seed):
+    rng = random.Random(seed)
+    processor = WordProcessor()
+    for step in range(60):
+        count = processor.get_paragraph_count()
+        action = rng.choice(["end", "beginning", "after", "delete", "invalidate", "direct_delete"])
+        if action == "end":
+            processor.add_text(f"段{step}")
+        elif action == "beginning":
+            processor.add_text(f"段{step}", position="beginning")
+        elif action == "after" and count:
+            processor.add_text(f"段{step}", position=f"after:{rng.randrange(count)}")
+        elif action == "delete" and count:
+            processor.delete_text(processor.get_paragraph(rng.randrange(count)).text)
+        elif action == "invalidate":
+            processor.invalidate_text_index()
+        elif action == "direct_delete" and count:
+            p = processor.document.paragraphs[rng.randrange(count)]._p
+            p.getparent().remove(p)
+            processor.invalidate_text_index()
+        _assert_index_consistent(processor)
@@ -0,0 +1,133 @@
+import pytest
+from fastapi.testclient import TestClient
+from api import word_api
+from api.models import WordOperation, OperationType, TextStyle
+from word_agent.agent_engine import WordAgent
+from word_agent.executor import DocumentExecutor
+from word_agent.parse_cache import ParseCache
+
+
+def _operations(content="内容"):
+    return [WordOperation(operation_type=OperationType.ADD_TEXT, content=content, style=TextStyle(bold=True))]
+
+
+def test_memory_tier_lru():
+    cache = ParseCache(max_entries=2)
+    keys = [ParseCache.make_key(f"指令{i}", "文档", "model") for i in range(3)]
+    assert len(set(keys)) == 3
+    assert ParseCache.make_key(" 指令0 ", "文档", "model") == keys[0]
+    assert ParseCache.make_key("指令0", "另一个文档", "model") != keys[0]
+
+    cache.put(keys[0], _operations("0"))
+    cache.put(keys[1], _operations("1"))
+    assert cache.get(keys[0])[0].content == "0"
+    cache.put(keys[2], _operations("2"))
+    # keys[1] 最近最少使用，被淘汰
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+    stats = cache.stats()
+    assert stats["memory_entries"] == 2 and not stats["persistent"]
+    assert stats["memory_hits"] == 3 and stats["misses"] == 1
+
+
+def test_returned_operations_are_deep_copies():
+    cache = ParseCache()
+    operations = _operations()
+    cache.put("key", operations)
+    operations[0].content = "调用方修改"
+
+    first = cache.get("key")
+    first[0].content = "被修改"
+    first[0].style.bold = False
+    first.append(first[0])
+
+    second = cache.get("key")
+    assert len(second) == 1
+    assert second[0].content == "内容" and second[0].style.bold is True
+
+
+def test_sqlite_tier_shared_across_instances(tmp_path):
+    db_path = str(tmp_path / "cache" / "parse_cache.db")
+    writer = ParseCache(db_path=db_path)
+    writer.put("key", _operations(), instruction="指令", model="model")
+    writer.close()
+
+    reader = ParseCache(db_path=db_path)
+    try:
+        operations = reader.get("key")
+        assert [op.model_dump() for op in operations] == [op.model_dump() for op in _operations()]
+        assert reader.stats()["disk_hits"] == 1 and reader.stats()["persistent"]
+        # 读入后进入内存层
+        reader.get("key")
+        assert reader.stats()["memory_hits"] == 1
+    finally:
+        reader.close()
+
+
+def test_ttl_expiry(tmp_path, monkeypatch):
+    import word_agent.parse_cache as parse_cache_module
+    now = [1000.0]
+    monkeypatch.setattr(parse_cache_module.time, "time", lambda: now[0])
+
+    cache = ParseCache(db_path=str(tmp_path / "parse_cache.db"), ttl=10)
+    try:
+        cache.put("key", _operations())
+        cache.put("other", _operations())
+        now[0] += 5
+        assert cache.get("key") is not None
+        now[0] += 10
+        # 内存层和磁盘层都已过期
+        assert cache.get("key") is None
+        assert cache.purge_expired() == 1
+        assert cache.stats()["memory_entries"] == 0
+    finally:
+        cache.close()
+
+    never = ParseCache(ttl=0)
+    never.put("key", _operations())
+    now[0] += 10 ** 9
+    assert never.get("key") is not None
+
+
+def test_invalidate(tmp_path):
+    cache = ParseCache(db_path=str(tmp_path / "parse_cache.db"))
+    try:
+        cache.put("a1", _operations(), instruction="指令A", model="m1")
+        cache.put("a2", _operations(), instruction="指令A", model="m2")
+        cache.put("b1", _operations(), instruction="指令B", model="m1")
+
+        assert cache.invalidate(instruction="指令A", model="m1") == 1
+        assert cache.get("a1") is None and cache.get("a2") is not None
+        assert cache.invalidate(model="m1") == 1
+        assert cache.get("b1") is None
+        assert cache.invalidate() == 1
+        assert cache.get("a2") is None
+    finally:
+        cache.close()
+
+
+def test_delete_parse_cache_endpoint(tmp_path, monkeypatch):
+    agent = WordAgent({
+        "workspace": str(tmp_path / "out"),
+        "parse_cache_path": str(tmp_path / "parse_cache.db"),
+        "log_path": str(tmp_path / "app.log")
+    })
+    executor = DocumentExecutor(max_workers=1)
+    monkeypatch.setattr(word_api, "word_agent", agent)
+    monkeypatch.setattr(word_api, "document_executor", executor)
+    try:
+        agent.parse_cache.put("a", _operations(), instruction="指令A", model="m1")
+        agent.parse_cache.put("b", _operations(), instruction="指令B", model="m1")
+        client = TestClient(word_api.app)
+
+        response = client.delete("/api/word/parse-cache", params={"instruction": "指令A"})
+        assert response.status_code == 200
+        assert response.json()["success"] and response.json()["removed"] == 1
+        assert agent.parse_cache.get("a") is None and agent.parse_cache.get("b") is not None
+
+        response = client.delete("/api/word/parse-cache")
+        assert response.json()["removed"] == 1
+        assert agent.parse_cache.get("b") is None
+    finally:
+        executor.shutdown()
+        agent.shutdown()
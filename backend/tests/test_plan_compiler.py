@@ -0,0 +1,53 @@
+from docx.oxml.ns import qn
+from api.models import WordOperation, OperationType, TextStyle, TableData
+from document.plan_compiler import STEP_APPEND
+from document.word_processor import WordProcessor
+
+BOLD_RED = TextStyle(bold=True, color="FF0000", font_size=14)
+
+
+def _op(operation_type, content=None, **kwargs):
+    return WordOperation(operation_type=operation_type, content=content, **kwargs)
+
+
+def _mixed_operations():
+    return [
+        _op(OperationType.ADD_HEADING, "概述", metadata={"level": 0}),
+        _op(OperationType.ADD_TEXT, "第一段草稿", style=BOLD_RED),
+        _op(OperationType.ADD_LIST, metadata={"items": ["苹果", "香蕉"], "ordered": True}, style=BOLD_RED),
+        _op(OperationType.ADD_HEADING, "细节", metadata={"level": 2}, style=BOLD_RED),
+        _op(OperationType.MODIFY_TEXT, "保留", metadata={"old_text": "原文"}),
+        _op(OperationType.ADD_LIST, metadata={"items": ["甲", "乙"]}),
+        _op(OperationType.ADD_TABLE, table_data=TableData(rows=2, cols=2, headers=["名称", "数量"])),
+        _op(OperationType.ADD_TEXT, "结尾草稿"),
+        _op(OperationType.MODIFY_TEXT, "终稿", metadata={"old_text": "草稿"}, style=BOLD_RED),
+        # 无效标题级别在两种执行方式下都应失败且不修改文档
+        _op(OperationType.ADD_HEADING, "无效", metadata={"level": 12}),
+    ]
+
+
+def _processor():
+    processor = WordProcessor()
+    processor.add_text("原文段落")
+    return processor
+
+
+def _body_xml(processor):
+    body = processor.document.element.body
+    return [child.xml for child in body.iterchildren() if child.tag != qn("w:sectPr")]
+
+
+def test_plan_matches_sequential_execution():
+    sequential = _processor()
+    expected = [sequential.execute_operation(op) for op in _mixed_operations()]
+
+    planned = _processor()
+    plan = planned.compile_plan(_mixed_operations())
+    assert any(step.kind == STEP_APPEND and len(step.operations) > 1 for step in plan.steps)
+    assert planned.execute_plan(plan) == expected
+    assert expected[-1] is False
+
+    assert _body_xml(planned) == _body_xml(sequential)
+    assert [p.style.name for p in planned.document.paragraphs] == \
+        [p.style.name for p in sequential.document.paragraphs]
+    assert planned.get_paragraph_count() == len(planned.document.paragraphs)
@@ -0,0 +1,95 @@
+import json
+import pytest
+from docx import Document
+from fastapi.testclient import TestClient
+from api import word_api
+from api.models import WordOperation, OperationType
+from word_agent.agent_engine import WordAgent
+from word_agent.executor import DocumentExecutor
+
+
+def _read_events(response):
+    """按 SSE 格式拆分事件，每个事件为 event 行加 data 行，以空行结束"""
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    body = response.text
+    assert body.endswith("\n\n")
+    events = []
+    for block in body.split("\n\n")[:-1]:
+        lines = block.split("\n")
+        assert len(lines) == 2 and lines[0].startswith("event: ") and lines[1].startswith("data: ")
+        events.append((lines[0][len("event: "):], json.loads(lines[1][len("data: "):])))
+    return events
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    agent = WordAgent({
+        "workspace": str(tmp_path / "out"),
+        "parse_cache_enabled": False,
+        "log_path": str(tmp_path / "app.log")
+    })
+    executor = DocumentExecutor(max_workers=2)
+    monkeypatch.setattr(word_api, "word_agent", agent)
+    monkeypatch.setattr(word_api, "document_executor", executor)
+    yield TestClient(word_api.app)
+    executor.shutdown()
+    agent.shutdown()
+
+
+def test_process_stream_event_order(client, tmp_path):
+    source = str(tmp_path / "source.docx")
+    Document().save(source)
+    operations = [
+        WordOperation(operation_type=OperationType.ADD_HEADING, content="标题", metadata={"level": 1}),
+        WordOperation(operation_type=OperationType.ADD_TEXT, content="正文"),
+    ]
+    response = client.post("/api/word/process/stream", json={
+        "instruction": "",
+        "document_path": source,
+        "operations": [op.model_dump(mode="json") for op in operations]
+    })
+    assert response.status_code == 200
+    events = _read_events(response)
+    stages = [stage for stage, _ in events]
+    assert stages == ["started", "parsing", "llm_complete", "plan", "operation", "operation", "saved", "result"]
+
+    data = dict(events)
+    assert data["llm_complete"]["source"] == "request"
+    assert [data for stage, data in events if stage == "operation"][0]["index"] == 0
+    for stage, payload in events[:-1]:
+        assert payload["elapsed_ms"] >= payload["stage_ms"] >= 0
+    result = data["result"]
+    assert result["success"]
+    assert [p.text for p in Document(result["document_path"]).paragraphs] == ["标题", "正文"]
+
+
+def test_process_stream_error_event(client, monkeypatch):
+    def failing(request, progress, **kwargs):
+        progress("started", {"instruction": request.instruction})
+        raise RuntimeError("执行器崩溃")
+
+    monkeypatch.setattr(word_api.word_agent, "process_instruction", failing)
+    response = client.post("/api/word/process/stream", json={"instruction": "添加段落 你好"})
+    assert response.status_code == 200
+    events = _read_events(response)
+    assert [stage for stage, _ in events] == ["started", "error"]
+    assert "执行器崩溃" in events[-1][1]["message"]
+
+
+def test_progress_tracker_timing_and_callback_errors():
+    from word_agent.progress import ProgressTracker
+    events = []
+    tracker = ProgressTracker(lambda stage, data: events.append((stage, data)))
+    tracker.emit("started", instruction="x")
+    tracker.emit("parsing")
+    assert [stage for stage, _ in events] == ["started", "parsing"]
+    assert events[0][1]["instruction"] == "x"
+    assert events[1][1]["elapsed_ms"] >= events[0][1]["elapsed_ms"]
+
+    # 回调出错不影响处理；没有回调时不做任何事
+    def broken(stage, data):
+        raise RuntimeError("断开")
+
+    ProgressTracker(broken).emit("started")
+    ProgressTracker().emit("started")
@@ -0,0 +1,175 @@
+import shutil
+import pytest
+from docx import Document
+from ai.openai_api import LLMError, LLMTimeoutError
+from api.models import ProcessRequest
+from word_agent.agent_engine import WordAgent
+
+# 本地解析置信度不足，需要调用模型
+INSTRUCTION = "在文档末尾撰写一段项目总结"
+
+
+@pytest.fixture
+def agent(tmp_path):
+    agent = WordAgent({
+        "workspace": str(tmp_path / "out"),
+        "parse_cache_enabled": False,
+        "model_tiers": [{"name": "default", "model": "fake-model"}],
+        "log_path": str(tmp_path / "app.log")
+    })
+    yield agent
+    agent.shutdown()
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / "source.docx")
+    document = Document()
+    document.add_paragraph("原有内容")
+    document.save(path)
+    return path
+
+
+def _fake_stream(agent, chunks, error=None):
+    """让模型流式输出 chunks 后抛出 error（为 None 时正常结束），返回每次调用的消息列表"""
+    calls = []
+
+    def stream_chat_completion(messages, **kwargs):
+        calls.append(messages)
+        yield from chunks
+        if error is not None:
+            raise error
+
+    agent.openai_api.stream_chat_completion = stream_chat_completion
+    return calls
+
+
+def _run(agent, source, instruction=INSTRUCTION):
+    events = []
+    response = agent.process_instruction(
+        ProcessRequest(instruction=instruction, document_path=source),
+        progress=lambda stage, data: events.append((stage, data))
+    )
+    return response, events
+
+
+def test_timeout_keeps_partial_operations(agent, source):
+    # 第二个操作行已完整但还没等到下一行，最后一行不完整
+    _fake_stream(agent, ["T|第一段\nT|第二", "段\nT|第三"], LLMTimeoutError("超时"))
+    response, events = _run(agent, source)
+
+    assert response.success
+    stages = [stage for stage, _ in events]
+    assert stages[stages.index("parsing") + 1:stages.index("llm_complete") + 1] == \
+        ["operation", "operation", "deadline", "llm_complete"]
+    complete = dict(events)["llm_complete"]
+    assert complete["source"] == "partial"
+    assert [op["content"] for op in complete["operations"]] == ["第一段", "第二段"]
+
+    texts = [p.text for p in Document(response.document_path).paragraphs]
+    assert texts == ["原有内容", "第一段", "第二段"]
+
+    stats = agent.command_parser.get_stats()
+    assert stats["partial"] == 1 and stats["fallback"] == 0 and stats["llm"] == 0
+    # 超时算作模型调用失败
+    assert agent.model_router.stats()["default"]["fallback_rate"] == 1.0
+
+
+def test_stream_error_rolls_back_and_runs_fallback_once(agent, source, monkeypatch):
+    # 出错时第三个操作还在等待后续行，不会产出
+    calls = _fake_stream(agent, ["T|流式一\nT|流式二\n", "T|流式三\n"], LLMError("连接中断"))
+    fallback_calls = []
+    fallback = agent.command_parser._fallback_operations
+
+    def counting_fallback(*args, **kwargs):
+        operations = fallback(*args, **kwargs)
+        fallback_calls.append(operations)
+        return operations
+
+    monkeypatch.setattr(agent.command_parser, "_fallback_operations", counting_fallback)
+    response, events = _run(agent, source)
+
+    assert len(calls) == 1 and len(fallback_calls) == 1
+    stages = [stage for stage, _ in events]
+    assert stages[stages.index("parsing") + 1:stages.index("llm_complete") + 1] == \
+        ["operation", "operation", "rollback", "llm_complete"]
+    assert dict(events)["rollback"]["operations"] == 2
+    complete = dict(events)["llm_complete"]
+    assert complete["source"] == "fallback"
+    fallback_operations = agent.command_parser.validate_operations(fallback_calls[0])
+    assert len(complete["operations"]) == len(fallback_operations) > 0
+
+    # 流式执行的操作被回滚，回退结果只执行一次
+    texts = [p.text for p in Document(response.document_path).paragraphs]
+    assert texts[0] == "原有内容"
+    assert not any(text.startswith("流式") for text in texts)
+    assert len(texts) == 1 + len(fallback_operations)
+    assert stages.count("operation") == 2 + len(fallback_operations)
+    assert agent.command_parser.get_stats()["fallback"] == 1
+
+
+def _texts(response):
+    return [p.text for p in Document(response.document_path).paragraphs]
+
+
+def test_local_parse_with_streaming_enabled(agent, source):
+    calls = _fake_stream(agent, ["T|不应调用"])
+    response, events = _run(agent, source, "添加段落 你好")
+
+    assert response.success and calls == []
+    complete = dict(events)["llm_complete"]
+    assert complete["source"] == "local"
+    assert [op["content"] for op in complete["operations"]] == ["你好"]
+    assert _texts(response) == ["原有内容", "你好"]
+
+
+def test_parse_cache_hit_with_streaming_enabled(tmp_path, source):
+    agent = WordAgent({
+        "workspace": str(tmp_path / "out"),
+        "parse_cache_path": str(tmp_path / "parse_cache.db"),
+        "log_path": str(tmp_path / "app.log")
+    })
+    try:
+        calls = _fake_stream(agent, ["T|缓存内容\n"])
+        first, events = _run(agent, source)
+        assert dict(events)["llm_complete"]["source"] == "llm"
+        # 同样内容的另一份文档命中解析缓存
+        copy = str(tmp_path / "copy.docx")
+        shutil.copyfile(source, copy)
+        second, events = _run(agent, copy)
+        assert dict(events)["llm_complete"]["source"] == "cache"
+        assert len(calls) == 1
+        assert _texts(first) == _texts(second) == ["原有内容", "缓存内容"]
+    finally:
+        agent.shutdown()
+
+
+def test_fallback_when_request_cannot_be_prepared(agent, source, monkeypatch):
+    calls = _fake_stream(agent, ["T|不应调用"])
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("无法组装请求")
+
+    monkeypatch.setattr(agent.command_parser, "_prepare_llm_request", fail)
+    response, events = _run(agent, source)
+
+    assert calls == []
+    complete = dict(events)["llm_complete"]
+    assert complete["source"] == "fallback" and complete["operations"]
+    assert "rollback" not in dict(events)
+    assert len(_texts(response)) == 1 + len(complete["operations"])
+
+
+def test_non_streaming_client(agent, source):
+    class NonStreamingAPI:
+        model = "fake-model"
+
+        def chat_completion(self, messages, **kwargs):
+            return "T|非流式内容"
+
+    agent.command_parser.openai_api = NonStreamingAPI()
+    response, events = _run(agent, source)
+
+    complete = dict(events)["llm_complete"]
+    assert complete["source"] == "llm"
+    assert _texts(response) == ["原有内容", "非流式内容"]
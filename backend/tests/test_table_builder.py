@@ -0,0 +1,71 @@
+import pytest
+from docx import Document
+from api.models import TableData
+from document.word_processor import WordProcessor
+
+
+def _legacy_add_table(document, table_data):
+    """TableBuilder 之前通过 python-docx 逐个单元格赋值的实现"""
+    table = document.add_table(rows=table_data.rows, cols=table_data.cols)
+    table.style = 'Table Grid'
+    if table_data.headers:
+        hdr_cells = table.rows[0].cells
+        for i, header in enumerate(table_data.headers):
+            if i < len(hdr_cells):
+                hdr_cells[i].text = header
+                for paragraph in hdr_cells[i].paragraphs:
+                    for run in paragraph.runs:
+                        run.font.bold = True
+    if table_data.data:
+        start_row = 1 if table_data.headers else 0
+        for row_idx, row_data in enumerate(table_data.data):
+            if start_row + row_idx < len(table.rows):
+                row_cells = table.rows[start_row + row_idx].cells
+                for col_idx, cell_data in enumerate(row_data):
+                    if col_idx < len(row_cells):
+                        row_cells[col_idx].text = str(cell_data)
+    return table
+
+
+def _rpr(run):
+    rpr = run._r.rPr
+    return [] if rpr is None else [(child.tag, dict(child.attrib)) for child in rpr]
+
+
+def _snapshot(table):
+    """单元格文本、每个 run 的文本和 rPr、表格样式"""
+    return {
+        "style": table.style.name,
+        "cols": len(table.columns),
+        "cells": [
+            [
+                (cell.text, [(run.text, _rpr(run), run.bold) for p in cell.paragraphs for run in p.runs])
+                for cell in row.cells
+            ]
+            for row in table.rows
+        ],
+    }
+
+
+@pytest.mark.parametrize("table_data", [
+    TableData(rows=3, cols=2, headers=["姓名", "年龄"], data=[["张三", "30"], ["李四", "25"]]),
+    # 行数多于表头加数据，补空行
+    TableData(rows=5, cols=3, headers=["a", "b", "c"], data=[["1", "2", "3"]]),
+    TableData(rows=4, cols=2, data=[["x", "y"]]),
+    # 数据超出行列时截断，表头多于列数时忽略多余表头
+    TableData(rows=2, cols=2, headers=["h1", "h2", "h3"], data=[["1", "2", "3"], ["4", "5"], ["6", "7"]]),
+    # 制表符、换行、首尾空格和空字符串
+    TableData(rows=3, cols=2, headers=[" 左", ""], data=[["a\tb", "c\nd"], ["", "x"]]),
+    TableData(rows=1, cols=1),
+])
+def test_matches_legacy_python_docx_output(table_data):
+    legacy = _legacy_add_table(Document(), table_data)
+
+    processor = WordProcessor()
+    assert processor.add_table(table_data)
+    built = processor.document.tables[-1]
+
+    assert _snapshot(built) == _snapshot(legacy)
+    # 表头加粗，数据行不加粗
+    if table_data.headers:
+        assert all(run.bold for cell in built.rows[0].cells for p in cell.paragraphs for run in p.runs)
@@ -0,0 +1,105 @@
+import pytest
+from docx.enum.text import WD_BREAK
+from api.models import TextStyle
+from document.text_replacer import AhoCorasick, MultiPatternMatcher, replace_in_paragraph
+from document.word_processor import WordProcessor
+
+
+def _paragraph(*runs):
+    """runs 为 (文本, 格式) 列表，格式如 {"bold": True}"""
+    processor = WordProcessor()
+    paragraph = processor.document.add_paragraph()
+    for text, formatting in runs:
+        run = paragraph.add_run(text)
+        for name, value in formatting.items():
+            setattr(run, name, value)
+    processor.invalidate_text_index()
+    return processor, paragraph
+
+
+def _run_formats(paragraph):
+    return [(run.text, run.bold, run.italic, run.underline) for run in paragraph.runs]
+
+
+def test_match_across_runs_keeps_run_formats():
+    _, paragraph = _paragraph(("Hel", {"bold": True}), ("lo W", {"italic": True}), ("orld", {"underline": True}))
+    hosts = replace_in_paragraph(paragraph._p, "lo Wo", "XY")
+    assert paragraph.text == "HelXYrld"
+    # 替换文本写入匹配起始字符所在的 run，其余字符留在原 run
+    assert hosts == [paragraph.runs[1]._r]
+    assert _run_formats(paragraph) == [
+        ("Hel", True, None, None),
+        ("XY", None, True, None),
+        ("rld", None, None, True),
+    ]
+
+
+@pytest.mark.parametrize("old_text, new_text, expected", [
+    ("\tb", "-", "a-|c"),
+    ("b|c", "", "a\t"),
+    ("a\tb|", "X", "Xc"),
+    ("\t", "\t", "a\tb|c"),
+])
+def test_match_covering_tab_and_break_atoms(old_text, new_text, expected):
+    _, paragraph = _paragraph(("a", {}))
+    run = paragraph.runs[0]
+    run.add_tab()
+    run.add_text("b")
+    run.add_break(WD_BREAK.LINE)
+    paragraph.add_run("c")
+    old_text = old_text.replace("|", "\n")
+    replace_in_paragraph(paragraph._p, old_text, new_text)
+    assert paragraph.text == expected.replace("|", "\n")
+
+
+def test_replace_is_left_to_right_without_overlap():
+    _, paragraph = _paragraph(("aa", {"bold": True}), ("aa", {}))
+    replace_in_paragraph(paragraph._p, "aa", "b")
+    assert paragraph.text == "aaaa".replace("aa", "b")
+    assert _run_formats(paragraph) == [("b", True, None, None), ("b", None, None, None)]
+
+
+def test_overlapping_patterns_apply_in_order():
+    edits = [(False, "ab", "x", None), (False, "xc", "y", None), (False, "bc", "z", None), (True, "y", "", None)]
+
+    sequential, _ = _paragraph(("abc", {}))
+    sequential.document.add_paragraph("bcd")
+    sequential.invalidate_text_index()
+    for is_delete, target, replacement, _ in edits:
+        if is_delete:
+            sequential.delete_text(target)
+        else:
+            sequential.modify_text(target, replacement)
+
+    batched, _ = _paragraph(("abc", {}))
+    batched.document.add_paragraph("bcd")
+    batched.invalidate_text_index()
+    results = batched._apply_text_edits(edits)
+
+    # 后面的编辑命中前面替换产生的文本；"y" 段落删除后整段移除
+    assert results == [True, True, True, True]
+    assert [p.text for p in batched.document.paragraphs] == [p.text for p in sequential.document.paragraphs]
+    assert [p.text for p in batched.document.paragraphs] == ["zd"]
+
+
+def test_style_only_applied_to_host_runs():
+    processor, paragraph = _paragraph(("前缀", {"italic": True}), ("旧", {}), ("文本后缀", {"underline": True}))
+    untouched = [paragraph.runs[0]._r.xml, paragraph.runs[2]._r.xml]
+    assert processor.modify_text("旧文本", "新内容", TextStyle(bold=True))
+    assert paragraph.text == "前缀新内容后缀"
+    assert [run.bold for run in paragraph.runs] == [None, True, None]
+    assert paragraph.runs[0]._r.xml == untouched[0]
+    assert paragraph.runs[2].underline and paragraph.runs[2].text == "后缀"
+
+
+def test_automaton_finds_overlapping_matches():
+    automaton = AhoCorasick(["he", "she", "his", "hers", ""])
+    assert sorted(automaton.finditer("ushers")) == [(1, 4, 1), (2, 4, 0), (2, 6, 3)]
+    assert automaton.present("ushers") == {0, 1, 3}
+
+    matcher = MultiPatternMatcher(["b", "a", "b"])
+    present = matcher.present("ab")
+    assert matcher.next_edit(present, 0) == 0
+    assert matcher.next_edit(present, 1) == 1
+    assert matcher.next_edit(present, 3) is None
+    assert matcher.present("xyz") == set()
@@ -0,0 +1,96 @@
+import os
+import time
+from docx import Document
+from api.models import ProcessRequest, WordOperation, OperationType
+from document.word_processor import WordProcessor
+from word_agent.agent_engine import WordAgent
+from word_agent.write_behind import WriteBehindSaver
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def _dirty_processor(text="内容"):
+    processor = WordProcessor()
+    processor.add_text(text)
+    return processor
+
+
+def test_debounce_coalesces_saves(tmp_path):
+    target = str(tmp_path / "out.docx")
+    saver = WriteBehindSaver(debounce=0.1, max_delay=10)
+    try:
+        processor = _dirty_processor()
+        for _ in range(3):
+            saver.mark_dirty(processor, target)
+        assert not os.path.exists(target)
+        assert _wait_for(lambda: saver.stats()["saves"] == 1)
+        assert os.path.exists(target) and not processor.dirty
+        assert saver.stats()["coalesced"] == 2 and saver.pending_count() == 0
+    finally:
+        saver.stop()
+
+
+def test_max_delay_bounds_continuous_edits(tmp_path):
+    target = str(tmp_path / "out.docx")
+    saver = WriteBehindSaver(debounce=0.2, max_delay=0.3)
+    try:
+        processor = _dirty_processor()
+        started = time.monotonic()
+        # 持续修改，debounce 永远不会到期
+        while not os.path.exists(target) and time.monotonic() - started < 2:
+            with processor.lock:
+                processor.add_text("追加")
+            saver.mark_dirty(processor, target)
+            time.sleep(0.05)
+        assert os.path.exists(target)
+        assert time.monotonic() - started < 1.0
+    finally:
+        saver.stop()
+
+
+def test_stop_flushes_pending(tmp_path):
+    target = str(tmp_path / "out.docx")
+    saver = WriteBehindSaver(debounce=60, auto_flush=False)
+    saver.mark_dirty(_dirty_processor("未保存"), target, source_path="source.docx")
+    assert saver.flush("other.docx") == 0
+    saver.stop(flush=True)
+    assert Document(target).paragraphs[0].text == "未保存"
+
+
+def test_agent_flushes_on_evict_and_caches_once(tmp_path):
+    sources = []
+    for name in ("a.docx", "b.docx"):
+        path = str(tmp_path / name)
+        Document().save(path)
+        sources.append(path)
+    agent = WordAgent({
+        "workspace": str(tmp_path / "out"),
+        "parse_cache_enabled": False,
+        "save_mode": "write_behind",
+        "save_debounce": 60,
+        "cache_size": 1
+    })
+    try:
+        operations = [WordOperation(operation_type=OperationType.ADD_TEXT, content="A 的修改")]
+        response = agent.process_instruction(
+            ProcessRequest(instruction="", document_path=sources[0], operations=operations)
+        )
+        assert response.success and not os.path.exists(response.document_path)
+        # 保存路径是源路径的别名，处理器只占一个条目
+        stats = agent.get_cache_stats()
+        assert stats["entries"] == 1 and stats["aliases"] == 1
+        assert agent.document_cache.get(sources[0]) is agent.document_cache.get(response.document_path)
+
+        # 加载另一个文档时 a 被淘汰，淘汰前落盘
+        agent.process_instruction(ProcessRequest(instruction="", document_path=sources[1], operations=operations))
+        assert Document(response.document_path).paragraphs[-1].text == "A 的修改"
+        assert sources[0] not in agent.document_cache
+    finally:
+        agent.shutdown()
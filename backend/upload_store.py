@@ -0,0 +1,175 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, BinaryIO, Callable, Dict, Hashable, Optional
+
+# 上传 ID 即内容的 SHA-256
+UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class StoredUpload:
+    """已保存的上传文件"""
+
+    def __init__(self, digest: str, path: str, size: int, reused: bool):
+        """初始化
+
+        Args:
+            digest: 文件内容的 SHA-256
+            path: 存储路径
+            size: 字节数
+            reused: 是否命中已有的相同内容
+        """
+        self.digest = digest
+        self.path = path
+        self.size = size
+        self.reused = reused
+
+
+class UploadStore:
+    """内容寻址的上传文件存储
+
+    上传内容分块写入临时文件并同时计算哈希，完成后以 <sha256><扩展名> 为名存放；
+    相同内容只保存一份，重复上传时丢弃临时文件。
+    """
+
+    # 每次读取的块大小
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, root: str):
+        """初始化
+
+        Args:
+            root: 存储目录，第一次保存时创建
+        """
+        self.root = root
+        self.uploads = 0
+        self.dedup_hits = 0
+        self._paths: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def save(self, stream: BinaryIO, filename: Optional[str] = None) -> StoredUpload:
+        """保存上传内容
+
+        Args:
+            stream: 二进制输入流
+            filename: 原始文件名，只用于确定扩展名
+
+        Returns:
+            保存结果
+        """
+        ext = os.path.splitext(filename or "")[1].lower() or ".docx"
+        sha256 = hashlib.sha256()
+        size = 0
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = stream.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    sha256.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+
+            digest = sha256.hexdigest()
+            path = os.path.join(self.root, digest + ext)
+            with self._lock:
+                self.uploads += 1
+                reused = os.path.exists(path)
+                if reused:
+                    self.dedup_hits += 1
+                    os.remove(tmp_path)
+                else:
+                    os.replace(tmp_path, path)
+                self._paths[digest] = path
+            return StoredUpload(digest, path, size, reused)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get(self, upload_id: str) -> Optional[StoredUpload]:
+        """按上传 ID（内容哈希）查找已保存的文件，客户端分页时无需重复上传
+
+        Args:
+            upload_id: save() 返回的 digest
+
+        Returns:
+            保存结果，ID 无效或文件不存在时返回 None
+        """
+        if not upload_id or not UPLOAD_ID_PATTERN.match(upload_id):
+            return None
+        with self._lock:
+            path = self._paths.get(upload_id)
+        if path is None or not os.path.exists(path):
+            if not os.path.isdir(self.root):
+                return None
+            # 进程重启后从存储目录中查找
+            path = next(
+                (os.path.join(self.root, name) for name in sorted(os.listdir(self.root))
+                 if os.path.splitext(name)[0] == upload_id and not name.endswith(".part")),
+                None
+            )
+            if path is None:
+                return None
+            with self._lock:
+                self._paths[upload_id] = path
+        return StoredUpload(upload_id, path, os.path.getsize(path), reused=True)
+
+    def stats(self) -> Dict[str, int]:
+        """获取统计信息"""
+        with self._lock:
+            return {"uploads": self.uploads, "dedup_hits": self.dedup_hits}
+
+
+class ParseResultCache:
+    """按内容哈希缓存的解析结果（LRU）"""
+
+    def __init__(self, max_entries: int = 256):
+        """初始化
+
+        Args:
+            max_entries: 最大缓存条目数，0 表示不缓存
+        """
+        self.max_entries = max(0, int(max_entries))
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """获取缓存结果，未命中时计算并缓存
+
+        解析在锁外执行；同一键被并发计算时，后完成的结果覆盖先完成的（两者相同）。
+
+        Args:
+            key: 缓存键（包含内容哈希）
+            compute: 计算函数
+
+        Returns:
+            解析结果（调用方不应修改）
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+        if self.max_entries:
+            with self._lock:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        """获取统计信息"""
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -1,56 +1,119 @@
-from docx import Document
+import os
 import re
-from typing import List, Dict, Optional
+import uuid
+from docx import Document
+from typing import Callable, List, Dict, Optional
+
+from utils.bm25 import BM25Index
+from backend.index_finder import compile_pattern
+from utils.docx_reader import DocxReader, body_structure, read_docx_structure
 
 def parse_docx_structure(docx_path: str) -> Dict:
-    doc = Document(docx_path)
-    paragraphs = [
-        {"index": i, "text": p.text}
-        for i, p in enumerate(doc.paragraphs)
-    ]
-    tables = []
-    for t_idx, table in enumerate(doc.tables):
-        content = []
-        for row in table.rows:
-            content.append([cell.text for cell in row.cells])
-        tables.append({
-            "index": t_idx,
-            "rows": len(table.rows),
-            "cols": len(table.columns),
-            "content": content
-        })
-    return {"paragraphs": paragraphs, "tables": tables}
+    # 只读解析：流式读取 document.xml，不构建完整的 Document
+    return read_docx_structure(docx_path)
+
+def parse_docx_structure_page(docx_path: str, offset: int = 0, limit: Optional[int] = None) -> Dict:
+    # 按块（段落和表格按文档顺序统一计数）分页，只解析到当前页为止；
+    # 返回的 index 仍是段落/表格在全文中的序号，next_offset 为 None 表示已到末尾
+    with DocxReader(docx_path) as reader:
+        return reader.read_structure(offset, limit)
 
 def edit_text(docx_path: str, locate_type: str, locate_value: str, op_type: str, content: Optional[str]) -> Dict:
+    edit = {"locate_type": locate_type, "locate_value": locate_value, "op_type": op_type, "content": content}
+    result = edit_text_batch(docx_path, [edit])
+    if not result["success"]:
+        return {"success": False, "message": result["errors"][0]["message"]}
+    return {"success": True, "download_url": result["download_url"], "structure": result["structure"]}
+
+def edit_text_batch(docx_path: str, edits: List[Dict], save_path: Optional[str] = None,
+                    return_structure: bool = True) -> Dict:
+    """一次加载、一次保存地执行一组段落编辑
+
+    Args:
+        docx_path: 源文档路径
+        edits: 编辑列表，每项包含 locate_type、locate_value、op_type、content，按顺序执行，
+            每项的定位都基于前面编辑后的文本
+        save_path: 保存路径，默认为源文件名加 _edited 和随机后缀（相同内容的上传共用源文件，每次编辑的结果各自保存）
+        return_structure: 是否返回完整结构（从内存中的文档读取）；为 False 时只返回修改过的段落
+
+    Returns:
+        {"success": 全部编辑是否成功, "download_url": 保存路径（没有任何编辑成功时不保存，为 None）,
+         "structure": 完整结构或 None, "changed": 修改过的段落 [{"index", "text"}],
+         "errors": 失败的编辑 [{"edit", "message"}]}
+    """
     doc = Document(docx_path)
-    para_idx = None
+    paragraphs = doc.paragraphs
+    # 段落文本缓存，定位时不必反复拼接 run
+    texts = [p.text for p in paragraphs]
+    changed = set()
+    errors = []
+    # 'nl' 定位用的 BM25 索引，第一次用到时构建，之后随段落修改增量更新
+    ranker = None
+
+    def get_ranker() -> BM25Index:
+        nonlocal ranker
+        if ranker is None:
+            ranker = BM25Index(texts)
+        return ranker
+
+    for position, edit in enumerate(edits):
+        try:
+            para_idx = _locate_paragraph(texts, edit.get('locate_type'), str(edit.get('locate_value', '')), get_ranker)
+        except ValueError as e:
+            # 未知定位方式、无效的序号或正则只使本项失败，与未找到段落一样记录后继续
+            errors.append({"edit": position, "message": str(e)})
+            continue
+        op_type = edit.get('op_type')
+        content = edit.get('content')
+        if para_idx is None or not 0 <= para_idx < len(paragraphs):
+            errors.append({"edit": position, "message": "未找到目标段落"})
+            continue
+        para = paragraphs[para_idx]
+        if op_type == 'insert':
+            para.text = (content or '') + texts[para_idx]
+        elif op_type == 'replace':
+            para.text = content or ''
+        elif op_type == 'delete':
+            para.text = ''
+        else:
+            errors.append({"edit": position, "message": "未知操作类型"})
+            continue
+        texts[para_idx] = para.text
+        changed.add(para_idx)
+        if ranker is not None:
+            ranker.update(para_idx, texts[para_idx])
+
+    save = None
+    if changed:
+        save = save_path or f"{os.path.splitext(docx_path)[0]}_edited_{uuid.uuid4().hex}.docx"
+        doc.save(save)
+
+    return {
+        "success": not errors,
+        "download_url": save,
+        "structure": body_structure(doc.element.body) if return_structure else None,
+        "changed": [{"index": i, "text": texts[i]} for i in sorted(changed)],
+        "errors": errors
+    }
+
+def _locate_paragraph(texts: List[str], locate_type: str, locate_value: str,
+                      get_ranker: Callable[[], BM25Index]) -> Optional[int]:
     if locate_type == 'index':
-        para_idx = int(locate_value)
-    elif locate_type == 'regex':
-        for i, p in enumerate(doc.paragraphs):
-            if re.search(locate_value, p.text):
-                para_idx = i
-                break
-    elif locate_type == 'nl':
-        # 预留大模型接口，暂用简单包含
-        for i, p in enumerate(doc.paragraphs):
-            if locate_value in p.text:
-                para_idx = i
-                break
-    else:
-        raise ValueError('未知定位方式')
-    if para_idx is None or para_idx >= len(doc.paragraphs):
-        return {"success": False, "message": "未找到目标段落"}
-    para = doc.paragraphs[para_idx]
-    if op_type == 'insert':
-        para.text = para.text[:0] + (content or '') + para.text[0:]
-    elif op_type == 'replace':
-        para.text = content or ''
-    elif op_type == 'delete':
-        para.text = ''
-    else:
-        return {"success": False, "message": "未知操作类型"}
-    save_path = docx_path.replace('.docx', '_edited.docx')
-    doc.save(save_path)
-    structure = parse_docx_structure(save_path)
-    return {"success": True, "download_url": save_path, "structure": structure}
\ No newline at end of file
+        try:
+            return int(locate_value)
+        except ValueError:
+            raise ValueError(f'无效的段落序号: {locate_value}')
+    if locate_type == 'regex':
+        try:
+            pattern = compile_pattern(locate_value)
+        except re.error as e:
+            raise ValueError(f'无效的正则表达式: {e}')
+        return next((i for i, text in enumerate(texts) if pattern.search(text)), None)
+    if locate_type == 'nl':
+        # 先找原文包含描述的段落，没有时按 BM25 相关度取最相关的段落
+        exact = next((i for i, text in enumerate(texts) if locate_value in text), None)
+        if exact is not None:
+            return exact
+        ranked = get_ranker().search(locate_value, top_k=1)
+        return ranked[0][0] if ranked else None
+    raise ValueError(f'未知定位方式: {locate_type}')
@@ -7,6 +7,13 @@ DEFAULT_CONFIG = {
     "openai_api_key": os.getenv("OPENAI_API_KEY", ""),
     "embedding_model": "text-embedding-ada-002",
     "chat_model": "gpt-3.5-turbo",
+    "openai_base_url": "https://api.openai.com/v1",
+    "llm_timeout": 60,  # 单次请求超时（秒）
+    "request_timeout": 30,  # 处理指令的默认时限（秒），超过时取消模型调用并回退到本地解析；0 表示不限时
+    "llm_max_retries": 3,
+    "llm_max_concurrency": 8,  # 同时进行的 LLM 请求数上限
+    "llm_max_connections": 20,
+    "llm_max_keepalive_connections": 10,
     "db_path": "data/chroma_db",
     "log_path": "data/app.log",
     "workspace": "data/workspace",
@@ -17,11 +24,28 @@ DEFAULT_CONFIG = {
     "max_tokens": 2000,
     "cache_enabled": True,
     "cache_size": 100,
+    "cache_max_bytes": 512 * 1024 * 1024,  # 512MB
+    "local_parse_enabled": True,
+    "local_parse_threshold": 0.85,  # 本地解析置信度达到该值时跳过模型调用
+    "context_token_budget": 2000,  # 提示词中文档上下文的 token 预算
+    "llm_streaming": True,  # 流式接收模型输出，每个操作生成完即执行
+    "llm_output_format": "dsl",  # 模型输出格式：dsl（紧凑的按行格式）或 json
+    # 模型档位，按 max_score 从小到大匹配指令复杂度（0~1），为空时所有指令使用 chat_model，例如
+    # [{"name": "fast", "model": "gpt-4o-mini", "max_score": 0.35}, {"name": "large", "model": "gpt-4o"}]
+    "model_tiers": [],
+    "parse_cache_enabled": True,
+    "parse_cache_path": "data/parse_cache.db",
+    "parse_cache_size": 1000,
+    "parse_cache_ttl": 86400,  # 24 hours
     "auto_save": True,
+    "save_mode": "immediate",  # immediate: 每条指令后保存; write_behind: 延迟合并保存
+    "save_debounce": 2.0,  # write_behind 模式下最后一次修改后等待的秒数
     "backup_enabled": True,
     "backup_interval": 300,  # 5 minutes
     "server_host": "0.0.0.0",
     "server_port": 8000,
+    "worker_pool_size": 8,
+    "batch_workers": None,  # None 表示使用 CPU 核数
     "debug": False
 }
 
@@ -0,0 +1,150 @@
+"""
+操作计划编译器
+
+在执行前把操作列表编译为执行计划：
+- 连续的 modify_text / delete_text 合并为一次段落扫描（text_pass）
+- 连续的末尾追加（add_text 末尾、add_heading、add_list、add_table）合并为一次批量追加（append），
+  样式只解析一次
+
+只在不改变执行结果的前提下调整顺序：追加操作可以移到其后的文本修改之后，
+前提是追加的文本不包含这些修改要查找的文本（否则修改会作用到新追加的段落）。
+其余操作（指定位置插入等）保持原位，作为计划的分隔点。
+"""
+
+from typing import Any, Dict, List, Optional
+
+from api.models import WordOperation, OperationType
+
+STEP_TEXT_PASS = "text_pass"
+STEP_APPEND = "append"
+STEP_SINGLE = "single"
+
+TEXT_PASS_TYPES = {OperationType.MODIFY_TEXT, OperationType.DELETE_TEXT}
+APPEND_TYPES = {OperationType.ADD_TEXT, OperationType.ADD_HEADING, OperationType.ADD_LIST, OperationType.ADD_TABLE}
+
+
+class PlanStep:
+    """执行计划中的一步"""
+
+    def __init__(self, kind: str, indices: List[int], operations: List[WordOperation]):
+        """初始化
+
+        Args:
+            kind: 步骤类型（text_pass / append / single）
+            indices: 各操作在原始列表中的序号
+            operations: 操作列表
+        """
+        self.kind = kind
+        self.indices = indices
+        self.operations = operations
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            "kind": self.kind,
+            "indices": list(self.indices),
+            "operation_types": [op.operation_type.value for op in self.operations]
+        }
+
+
+class ExecutionPlan:
+    """执行计划"""
+
+    def __init__(self, steps: List[PlanStep], operation_count: int):
+        """初始化
+
+        Args:
+            steps: 执行步骤
+            operation_count: 原始操作数
+        """
+        self.steps = steps
+        self.operation_count = operation_count
+
+    @property
+    def reordered(self) -> bool:
+        """执行顺序是否与原始顺序不同"""
+        order = [index for step in self.steps for index in step.indices]
+        return order != sorted(order)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（用于调试输出）"""
+        return {
+            "operation_count": self.operation_count,
+            "step_count": len(self.steps),
+            "reordered": self.reordered,
+            "steps": [step.to_dict() for step in self.steps]
+        }
+
+
+def is_end_append(operation: WordOperation) -> bool:
+    """是否为追加到文档末尾的操作"""
+    if operation.operation_type not in APPEND_TYPES:
+        return False
+    if operation.operation_type == OperationType.ADD_TEXT:
+        return (operation.position or "end") == "end"
+    return True
+
+
+def search_text(operation: WordOperation) -> Optional[str]:
+    """获取文本修改操作要查找的文本"""
+    if operation.operation_type == OperationType.MODIFY_TEXT:
+        return operation.metadata.get('old_text', '') if operation.metadata else ''
+    return operation.content or ''
+
+
+def appended_texts(operation: WordOperation) -> List[str]:
+    """获取追加操作新增到 document.paragraphs 中的段落文本（表格不计入）"""
+    if operation.operation_type in (OperationType.ADD_TEXT, OperationType.ADD_HEADING):
+        return [operation.content or '']
+    if operation.operation_type == OperationType.ADD_LIST:
+        items = operation.metadata.get('items', []) if operation.metadata else []
+        return [str(item) for item in items]
+    return []
+
+
+class PlanCompiler:
+    """操作计划编译器"""
+
+    def compile(self, operations: List[WordOperation]) -> ExecutionPlan:
+        """编译执行计划
+
+        Args:
+            operations: 操作列表
+
+        Returns:
+            执行计划
+        """
+        steps: List[PlanStep] = []
+        text_group: List[int] = []
+        append_group: List[int] = []
+
+        def flush():
+            if text_group:
+                steps.append(PlanStep(STEP_TEXT_PASS, list(text_group), [operations[i] for i in text_group]))
+                text_group.clear()
+            if append_group:
+                steps.append(PlanStep(STEP_APPEND, list(append_group), [operations[i] for i in append_group]))
+                append_group.clear()
+
+        for index, operation in enumerate(operations):
+            if operation.operation_type in TEXT_PASS_TYPES:
+                # 已有追加操作时，只有它们不受本次修改影响才能把本次修改提前
+                if append_group and not self._commutes(
+                    [operations[i] for i in append_group], search_text(operation)
+                ):
+                    flush()
+                text_group.append(index)
+            elif is_end_append(operation):
+                append_group.append(index)
+            else:
+                flush()
+                steps.append(PlanStep(STEP_SINGLE, [index], [operation]))
+
+        flush()
+        return ExecutionPlan(steps, len(operations))
+
+    def _commutes(self, appends: List[WordOperation], pattern: Optional[str]) -> bool:
+        """追加操作与文本修改能否交换顺序"""
+        if not pattern:
+            return False
+        return all(pattern not in text for op in appends for text in appended_texts(op))
@@ -0,0 +1,200 @@
+"""
+批量表格构建
+
+直接拼接 w:tbl 的 XML 生成表格，不再逐个单元格通过 cell.text 赋值。
+行数据可以来自迭代器，按批解析追加，大表不需要一次性放入内存。
+"""
+
+import re
+from itertools import islice
+from typing import Any, Iterable, List, Optional, Sequence
+from xml.sax.saxutils import escape
+
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from docx.shared import Cm, Emu, Length
+from docx.table import Table
+
+from api.models import TextStyle
+
+# XML 1.0 不允许的控制字符（制表符、换行、回车除外）
+INVALID_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# 与 python-docx 的 run.text 赋值一致：制表符转为 w:tab，换行和回车转为 w:br
+RUN_SPECIAL_CHARS = re.compile(r"(\t|\n|\r)")
+HEX_COLOR = re.compile(r"^#[0-9A-Fa-f]{6}$")
+
+
+class TableBuilder:
+    """批量表格构建器"""
+
+    # 每批解析的行数
+    ROW_BATCH_SIZE = 500
+
+    def __init__(self, document):
+        """初始化
+
+        Args:
+            document: python-docx Document 对象
+        """
+        self.document = document
+
+    def add_table(
+        self,
+        rows: Iterable[Sequence[Any]],
+        cols: int,
+        headers: Optional[List[str]] = None,
+        row_count: Optional[int] = None,
+        column_widths: Optional[List[float]] = None,
+        style_name: Optional[str] = "Table Grid",
+        text_style: Optional[TextStyle] = None,
+        repeat_header: bool = True
+    ) -> Table:
+        """在文档末尾添加表格
+
+        Args:
+            rows: 数据行（可以是迭代器），每行超出列数的部分被忽略
+            cols: 列数
+            headers: 表头，加粗显示
+            row_count: 表格总行数（含表头）。数据不足时补空行，超出时截断；为 None 时按数据行数
+            column_widths: 列宽（厘米），未指定的列平分剩余宽度
+            style_name: 表格样式名称
+            text_style: 应用到所有单元格文本的样式
+            repeat_header: 表头是否在每页重复
+
+        Returns:
+            表格对象
+        """
+        widths = self._column_widths(cols, column_widths)
+        style_id = (
+            self.document.part.get_style_id(style_name, WD_STYLE_TYPE.TABLE)
+            if style_name else None
+        )
+
+        body = self.document._body
+        tbl = parse_xml(self._table_xml(widths, style_id, fixed_layout=bool(column_widths)))
+        body._element._insert_tbl(tbl)
+
+        cell_rpr = _rpr_xml(text_style, bold=False)
+        header_rpr = _rpr_xml(text_style, bold=True)
+        cell_prs = ['<w:tcPr><w:tcW w:type="dxa" w:w="%d"/></w:tcPr>' % width.twips for width in widths]
+
+        remaining = row_count
+        chunks = []
+        if headers and remaining != 0:
+            tr_pr = "<w:trPr><w:tblHeader/></w:trPr>" if repeat_header else ""
+            chunks.append(self._row_xml(headers, cell_prs, header_rpr, tr_pr))
+            if remaining is not None:
+                remaining -= 1
+
+        data_rows = iter(rows)
+        if remaining is not None:
+            data_rows = islice(data_rows, max(remaining, 0))
+        for row in data_rows:
+            chunks.append(self._row_xml(row, cell_prs, cell_rpr))
+            if remaining is not None:
+                remaining -= 1
+            if len(chunks) >= self.ROW_BATCH_SIZE:
+                self._append_rows(tbl, chunks)
+                chunks = []
+
+        # 数据不足时补空行
+        while remaining:
+            chunks.append(self._row_xml((), cell_prs, cell_rpr))
+            remaining -= 1
+            if len(chunks) >= self.ROW_BATCH_SIZE:
+                self._append_rows(tbl, chunks)
+                chunks = []
+        self._append_rows(tbl, chunks)
+
+        return Table(tbl, body)
+
+    def _column_widths(self, cols: int, column_widths: Optional[List[float]]) -> List[Length]:
+        """计算各列宽度"""
+        block_width = self.document._block_width
+        if not column_widths:
+            width = Emu(int(block_width / cols)) if cols > 0 else Emu(0)
+            return [width] * cols
+
+        specified = [Cm(w) if w else None for w in column_widths[:cols]]
+        specified += [None] * (cols - len(specified))
+        unspecified = specified.count(None)
+        if unspecified:
+            rest = max(block_width - sum(w for w in specified if w is not None), 0)
+            share = Emu(int(rest / unspecified))
+            specified = [w if w is not None else share for w in specified]
+        return specified
+
+    def _table_xml(self, widths: List[Length], style_id: Optional[str], fixed_layout: bool) -> str:
+        """表格框架（不含行）"""
+        return (
+            "<w:tbl %s>"
+            "<w:tblPr>%s"
+            '<w:tblW w:type="auto" w:w="0"/>'
+            "%s"
+            '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" '
+            'w:noHBand="0" w:noVBand="1" w:val="04A0"/>'
+            "</w:tblPr>"
+            "<w:tblGrid>%s</w:tblGrid>"
+            "</w:tbl>"
+        ) % (
+            nsdecls("w"),
+            '<w:tblStyle w:val="%s"/>' % escape(style_id, {'"': "&quot;"}) if style_id else "",
+            '<w:tblLayout w:type="fixed"/>' if fixed_layout else "",
+            "".join('<w:gridCol w:w="%d"/>' % width.twips for width in widths)
+        )
+
+    def _row_xml(self, values: Sequence[Any], cell_prs: List[str], rpr: str, tr_pr: str = "") -> str:
+        """一行的 XML"""
+        cells = []
+        for col, cell_pr in enumerate(cell_prs):
+            value = values[col] if col < len(values) else None
+            # 与 cell.text 赋值一致：给出的值（包括空字符串）都生成 run，补齐的单元格为空段落
+            run = "" if value is None else _run_xml(str(value), rpr)
+            cells.append("<w:tc>%s<w:p>%s</w:p></w:tc>" % (cell_pr, run))
+        return "<w:tr>%s%s</w:tr>" % (tr_pr, "".join(cells))
+
+    def _append_rows(self, tbl, chunks: List[str]):
+        """解析一批行并追加到表格"""
+        if not chunks:
+            return
+        fragment = parse_xml("<w:tbl %s>%s</w:tbl>" % (nsdecls("w"), "".join(chunks)))
+        tbl.extend(list(fragment))
+
+
+def _run_xml(text: str, rpr: str) -> str:
+    """单元格文本的 w:r"""
+    parts = []
+    for piece in RUN_SPECIAL_CHARS.split(INVALID_XML_CHARS.sub("", text)):
+        if not piece:
+            continue
+        if piece == "\t":
+            parts.append("<w:tab/>")
+        elif piece in ("\n", "\r"):
+            parts.append("<w:br/>")
+        elif len(piece.strip()) < len(piece):
+            parts.append('<w:t xml:space="preserve">%s</w:t>' % escape(piece))
+        else:
+            parts.append("<w:t>%s</w:t>" % escape(piece))
+    return "<w:r>%s%s</w:r>" % (rpr, "".join(parts))
+
+
+def _rpr_xml(style: Optional[TextStyle], bold: bool) -> str:
+    """由文本样式生成 w:rPr（子元素按架构顺序排列）"""
+    elements = []
+    if style and style.font_name:
+        name = escape(style.font_name, {'"': "&quot;"})
+        elements.append('<w:rFonts w:ascii="%s" w:hAnsi="%s"/>' % (name, name))
+    if style and style.bold is not None and not bold:
+        elements.append("<w:b/>" if style.bold else '<w:b w:val="0"/>')
+    elif bold:
+        elements.append("<w:b/>")
+    if style and style.italic is not None:
+        elements.append("<w:i/>" if style.italic else '<w:i w:val="0"/>')
+    if style and style.color and HEX_COLOR.match(style.color):
+        elements.append('<w:color w:val="%s"/>' % style.color[1:].upper())
+    if style and style.font_size:
+        elements.append('<w:sz w:val="%d"/>' % int(style.font_size * 2))
+    if style and style.underline is not None:
+        elements.append('<w:u w:val="%s"/>' % ("single" if style.underline else "none"))
+    return "<w:rPr>%s</w:rPr>" % "".join(elements) if elements else ""
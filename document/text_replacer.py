@@ -0,0 +1,254 @@
+"""
+多模式文本查找与 run 级替换
+
+- AhoCorasick：一次扫描找出文本中出现的全部模式
+- MultiPatternMatcher：C 实现的正则预筛 + Aho-Corasick，按原始顺序给出下一个要执行的编辑
+- replace_in_paragraph：在段落的 run 内替换文本，保留各 run 的格式
+"""
+
+import re
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from docx.oxml.shared import OxmlElement, qn
+
+# 与 python-docx 的 CT_R.text 一致的 run 内文本元素
+RUN_TEXT_XPATH = "w:br | w:cr | w:noBreakHyphen | w:ptab | w:t | w:tab"
+W_T = qn("w:t")
+W_R = qn("w:r")
+W_HYPERLINK = qn("w:hyperlink")
+XML_SPACE = qn("xml:space")
+
+
+class AhoCorasick:
+    """Aho-Corasick 多模式匹配自动机"""
+
+    def __init__(self, patterns: Sequence[str]):
+        """构建自动机
+
+        Args:
+            patterns: 模式列表（空模式被忽略），模式编号为其在列表中的位置
+        """
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        for pattern_id, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._output[state] += (pattern_id,)
+
+        # 广度优先计算失败指针，并沿失败链合并输出
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fallback = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fallback if fallback != next_state else 0
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def present(self, text: str) -> Set[int]:
+        """找出文本中出现的模式编号
+
+        Args:
+            text: 文本
+
+        Returns:
+            出现过的模式编号集合
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        root = goto[0]
+        found: Set[int] = set()
+        state = 0
+        for char in text:
+            if state == 0:
+                state = root.get(char, 0)
+            else:
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+    def finditer(self, text: str):
+        """找出所有（可重叠的）匹配
+
+        Args:
+            text: 文本
+
+        Yields:
+            (起始位置, 结束位置, 模式编号)
+        """
+        goto = self._goto
+        fail = self._fail
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in self._output[state]:
+                yield index + 1 - len(self.patterns[pattern_id]), index + 1, pattern_id
+
+
+class MultiPatternMatcher:
+    """按顺序执行的一组文本编辑的匹配器
+
+    同一段落中，编辑必须按原始顺序执行（前面的替换结果可能被后面的编辑命中），
+    因此只用自动机判断哪些编辑适用，再按顺序逐个执行。
+    """
+
+    def __init__(self, targets: Sequence[str]):
+        """初始化
+
+        Args:
+            targets: 每个编辑要查找的文本（可重复）
+        """
+        unique = list(dict.fromkeys(t for t in targets if t))
+        pattern_ids = {pattern: i for i, pattern in enumerate(unique)}
+        self._edits_by_pattern: List[List[int]] = [[] for _ in unique]
+        for edit_index, target in enumerate(targets):
+            if target:
+                self._edits_by_pattern[pattern_ids[target]].append(edit_index)
+
+        self.automaton = AhoCorasick(unique)
+        # 大多数段落不含任何模式，先用 C 实现的正则整体预筛
+        self._prefilter = (
+            re.compile("|".join(re.escape(p) for p in sorted(unique, key=len, reverse=True)))
+            if unique else None
+        )
+
+    def present(self, text: str) -> Set[int]:
+        """文本中出现的模式编号"""
+        if self._prefilter is None or not self._prefilter.search(text):
+            return set()
+        return self.automaton.present(text)
+
+    def next_edit(self, pattern_ids: Set[int], start: int) -> Optional[int]:
+        """在给定模式命中的情况下，找出序号不小于 start 的第一个适用编辑
+
+        Args:
+            pattern_ids: 当前文本中出现的模式编号
+            start: 起始编辑序号
+
+        Returns:
+            编辑序号，没有时返回 None
+        """
+        best = None
+        for pattern_id in pattern_ids:
+            edits = self._edits_by_pattern[pattern_id]
+            position = bisect_left(edits, start)
+            if position < len(edits) and (best is None or edits[position] < best):
+                best = edits[position]
+        return best
+
+
+def iter_text_atoms(p_element):
+    """按 paragraph.text 的顺序列出段落中的文本元素
+
+    Args:
+        p_element: w:p 元素
+
+    Returns:
+        (元素, 元素文本, 所属 w:r) 列表，不产生文本的元素（分页符等）不列出
+    """
+    atoms = []
+    for child in p_element.xpath("w:r | w:hyperlink"):
+        runs = [child] if child.tag == W_R else child.xpath("w:r")
+        for run in runs:
+            for element in run.xpath(RUN_TEXT_XPATH):
+                text = str(element)
+                if text:
+                    atoms.append((element, text, run))
+    return atoms
+
+
+def replace_in_paragraph(p_element, old_text: str, new_text: str) -> List:
+    """在段落内替换全部 old_text，不重建 run
+
+    与 str.replace 相同，从左到右替换不重叠的匹配。未被匹配的字符保留在原来的 run 中；
+    替换文本写入匹配起始字符所在的 run，继承该 run 的格式；跨 run 的匹配从后续 run 中删去对应字符。
+
+    Args:
+        p_element: w:p 元素
+        old_text: 要查找的文本（非空）
+        new_text: 替换文本（为空时即删除）
+
+    Returns:
+        写入了替换文本的 w:r 元素列表
+    """
+    atoms = iter_text_atoms(p_element)
+    text = "".join(atom_text for _, atom_text, _ in atoms)
+
+    matches = []
+    position = text.find(old_text)
+    while position != -1:
+        matches.append((position, position + len(old_text)))
+        position = text.find(old_text, position + len(old_text))
+    if not matches:
+        return []
+
+    hosts = []
+    match_index = 0
+    offset = 0
+    for element, atom_text, run in atoms:
+        start, end = offset, offset + len(atom_text)
+        offset = end
+        pieces = []
+        cursor = start
+        while cursor < end:
+            if match_index < len(matches) and matches[match_index][0] < end:
+                match_start, match_end = matches[match_index]
+                if match_start > cursor:
+                    pieces.append(atom_text[cursor - start:match_start - start])
+                    cursor = match_start
+                if cursor == match_start and new_text:
+                    pieces.append(new_text)
+                    hosts.append(run)
+                cursor = min(match_end, end)
+                if match_end <= end:
+                    match_index += 1
+            else:
+                pieces.append(atom_text[cursor - start:])
+                cursor = end
+
+        new_atom_text = "".join(pieces)
+        if new_atom_text == atom_text:
+            continue
+        if element.tag == W_T:
+            _set_text(element, new_atom_text)
+        elif new_atom_text:
+            # 制表符、换行等元素被匹配覆盖，原位换成承载替换文本的 w:t
+            t = OxmlElement("w:t")
+            _set_text(t, new_atom_text)
+            element.addprevious(t)
+            element.getparent().remove(element)
+        else:
+            element.getparent().remove(element)
+
+    return list(dict.fromkeys(hosts))
+
+
+def _set_text(t_element, text: str):
+    """设置 w:t 的文本，首尾有空白时保留空白"""
+    t_element.text = text
+    if text and (text[0].isspace() or text[-1].isspace()):
+        t_element.set(XML_SPACE, "preserve")
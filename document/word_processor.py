@@ -3,17 +3,28 @@ from docx.shared import Inches, Pt, RGBColor
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 from docx.enum.style import WD_STYLE_TYPE
 from docx.oxml.shared import OxmlElement, qn
-from typing import List, Optional, Dict, Any
+from docx.opc.part import XmlPart
+from docx.text.paragraph import Paragraph
+from docx.text.run import Run
+from typing import List, Optional, Dict, Any, Callable, Iterable, Sequence
+import copy
 import os
 import re
+import threading
 from pathlib import Path
 
 from api.models import WordOperation, TextStyle, TableData, OperationType
+from document.table_builder import TableBuilder
+from document.text_replacer import MultiPatternMatcher, replace_in_paragraph
+from document.plan_compiler import PlanCompiler, ExecutionPlan, STEP_TEXT_PASS, STEP_APPEND
 
 
 class WordProcessor:
     """Word文档处理器"""
     
+    # 每个 XML 元素（含 lxml 节点及属性）的平均内存开销估算值
+    ESTIMATED_BYTES_PER_ELEMENT = 200
+    
     def __init__(self, document_path: Optional[str] = None):
         """初始化文档处理器
         
@@ -26,6 +37,22 @@ class WordProcessor:
         else:
             self.document = Document()
             self.document_path = None
+        
+        # 是否存在尚未保存的修改
+        self.dirty = False
+        
+        # 文档级锁，python-docx 对象不是线程安全的，跨线程访问需持有此锁
+        self.lock = threading.RLock()
+        
+        # 段落索引（段落代理对象及其文本），与 document.paragraphs 一一对应，
+        # 首次查询时构建，之后由各修改操作增量维护
+        self._paragraph_index: Optional[List[Paragraph]] = None
+        self._text_index: Optional[List[str]] = None
+        self._text_length = 0
+        self._joined_text: Optional[str] = None
+        
+        # 内存估算，首次估算时扫描全部部件，之后随段落和表格的增删增量调整
+        self._memory_size: Optional[int] = None
     
     def save_document(self, output_path: str) -> bool:
         """保存文档
@@ -41,6 +68,7 @@ class WordProcessor:
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             self.document.save(output_path)
             self.document_path = output_path
+            self.dirty = False
             return True
         except Exception as e:
             print(f"保存文档失败: {e}")
@@ -58,25 +86,26 @@ class WordProcessor:
             是否成功
         """
         try:
-            if position == "beginning":
+            position = position or "end"
+            paragraphs = self._get_paragraphs() if position != "end" else []
+            if position == "beginning" and paragraphs:
                 # 在开头插入
-                paragraph = self.document.paragraphs[0]
-                paragraph.insert_paragraph_before(content)
-            elif position.startswith("after:"):
+                paragraph = paragraphs[0].insert_paragraph_before(content)
+                self._index_insert(0, paragraph)
+            elif position.startswith("after:") and 0 <= int(position.split(":")[1]) < len(paragraphs):
                 # 在指定段落后插入
                 index = int(position.split(":")[1])
-                if index < len(self.document.paragraphs):
-                    self.document.paragraphs[index].insert_paragraph_after(content)
-                else:
-                    self.document.add_paragraph(content)
+                paragraph = self._insert_paragraph_after(paragraphs[index], content)
+                self._index_insert(index + 1, paragraph)
             else:
                 # 在末尾添加
-                paragraph = self.document.add_paragraph(content)
+                paragraph = self._append_paragraph(content)
                 
             # 应用样式
             if style:
                 self._apply_text_style(paragraph, style)
-                
+            
+            self._mark_dirty()
             return True
         except Exception as e:
             print(f"添加文本失败: {e}")
@@ -94,9 +123,8 @@ class WordProcessor:
             是否成功
         """
         try:
-            heading = self.document.add_heading(content, level)
-            if style:
-                self._apply_text_style(heading, style)
+            self._append_heading(content, level, style)
+            self._mark_dirty()
             return True
         except Exception as e:
             print(f"添加标题失败: {e}")
@@ -107,36 +135,55 @@ class WordProcessor:
         
         Args:
             table_data: 表格数据
-            style: 文本样式
+            style: 文本样式，应用到所有单元格
             
         Returns:
             是否成功
         """
         try:
-            table = self.document.add_table(rows=table_data.rows, cols=table_data.cols)
-            table.style = 'Table Grid'
-            
-            # 添加表头
-            if table_data.headers:
-                hdr_cells = table.rows[0].cells
-                for i, header in enumerate(table_data.headers):
-                    if i < len(hdr_cells):
-                        hdr_cells[i].text = header
-                        # 表头加粗
-                        for paragraph in hdr_cells[i].paragraphs:
-                            for run in paragraph.runs:
-                                run.font.bold = True
-            
-            # 添加数据
-            if table_data.data:
-                start_row = 1 if table_data.headers else 0
-                for row_idx, row_data in enumerate(table_data.data):
-                    if start_row + row_idx < len(table.rows):
-                        row_cells = table.rows[start_row + row_idx].cells
-                        for col_idx, cell_data in enumerate(row_data):
-                            if col_idx < len(row_cells):
-                                row_cells[col_idx].text = str(cell_data)
+            table = TableBuilder(self.document).add_table(
+                table_data.data or [],
+                cols=table_data.cols,
+                headers=table_data.headers,
+                row_count=table_data.rows,
+                column_widths=table_data.column_widths,
+                text_style=style
+            )
+            self._track_memory(table._tbl)
+            self._mark_dirty()
+            return True
+        except Exception as e:
+            print(f"添加表格失败: {e}")
+            return False
+    
+    def add_table_rows(self, rows: Iterable[Sequence[Any]], cols: Optional[int] = None,
+                       headers: Optional[List[str]] = None, column_widths: Optional[List[float]] = None,
+                       style: Optional[TextStyle] = None) -> bool:
+        """从行迭代器流式添加表格，行数由数据决定
+        
+        Args:
+            rows: 数据行迭代器
+            cols: 列数，为 None 时取表头长度
+            headers: 表头
+            column_widths: 列宽（厘米）
+            style: 文本样式，应用到所有单元格
             
+        Returns:
+            是否成功
+        """
+        try:
+            cols = cols or (len(headers) if headers else 0)
+            if cols <= 0:
+                raise ValueError("未指定列数")
+            table = TableBuilder(self.document).add_table(
+                rows,
+                cols=cols,
+                headers=headers,
+                column_widths=column_widths,
+                text_style=style
+            )
+            self._track_memory(table._tbl)
+            self._mark_dirty()
             return True
         except Exception as e:
             print(f"添加表格失败: {e}")
@@ -145,6 +192,8 @@ class WordProcessor:
     def modify_text(self, old_text: str, new_text: str, style: Optional[TextStyle] = None) -> bool:
         """修改文本
         
+        在 run 内替换，保留原有格式；指定样式时只应用到写入了新文本的 run。
+        
         Args:
             old_text: 原文本
             new_text: 新文本
@@ -154,15 +203,7 @@ class WordProcessor:
             是否成功
         """
         try:
-            modified = False
-            for paragraph in self.document.paragraphs:
-                if old_text in paragraph.text:
-                    paragraph.text = paragraph.text.replace(old_text, new_text)
-                    if style:
-                        self._apply_text_style(paragraph, style)
-                    modified = True
-            
-            return modified
+            return self._apply_text_edits([(False, old_text, new_text or "", style)])[0]
         except Exception as e:
             print(f"修改文本失败: {e}")
             return False
@@ -177,20 +218,7 @@ class WordProcessor:
             是否成功
         """
         try:
-            paragraphs_to_remove = []
-            for paragraph in self.document.paragraphs:
-                if target_text in paragraph.text:
-                    # 如果整个段落都是目标文本，则删除段落
-                    if paragraph.text.strip() == target_text.strip():
-                        paragraphs_to_remove.append(paragraph)
-                    else:
-                        # 否则只删除文本内容
-                        paragraph.text = paragraph.text.replace(target_text, "")
-            
-            # 删除段落
-            for paragraph in paragraphs_to_remove:
-                self._delete_paragraph(paragraph)
-            
+            self._apply_text_edits([(True, target_text, "", None)])
             return True
         except Exception as e:
             print(f"删除文本失败: {e}")
@@ -208,51 +236,140 @@ class WordProcessor:
             是否成功
         """
         try:
-            for item in items:
-                if ordered:
-                    paragraph = self.document.add_paragraph(item, style='List Number')
-                else:
-                    paragraph = self.document.add_paragraph(item, style='List Bullet')
-                
-                if style:
-                    self._apply_text_style(paragraph, style)
-            
+            self._append_list(items, ordered, style)
+            self._mark_dirty()
             return True
         except Exception as e:
             print(f"添加列表失败: {e}")
             return False
     
-    def _apply_text_style(self, paragraph, style: TextStyle):
+    def _append_paragraph(self, content: Optional[str], style_name: Optional[str] = None,
+                          style: Optional[TextStyle] = None, cache: Optional[Dict[Any, Any]] = None) -> Paragraph:
+        """在文档末尾（分节符之前）追加段落并更新索引
+        
+        add_text（末尾）、add_heading、add_list 和批量追加都经过这里。
+        段落样式先解析再插入，样式不存在时抛出异常且不修改文档。
+        
+        Args:
+            content: 文本内容
+            style_name: 段落样式名称，如 Heading 1、List Bullet
+            style: 文本样式
+            cache: 批量追加时共享的缓存，保存已解析的段落样式 ID 和编译好的文本样式
+            
+        Returns:
+            新段落
+        """
+        cache = cache if cache is not None else {}
+        style_id = None
+        if style_name:
+            key = ("paragraph_style", style_name)
+            if key not in cache:
+                cache[key] = self.document.part.get_style_id(style_name, WD_STYLE_TYPE.PARAGRAPH)
+            style_id = cache[key]
+        
+        body = self.document._body
+        p = OxmlElement('w:p')
+        if style_id:
+            p.style = style_id
+        paragraph = Paragraph(p, body)
+        if content:
+            paragraph.add_run(content)
+        sect_pr = body._element.sectPr
+        if sect_pr is not None:
+            sect_pr.addprevious(p)
+        else:
+            body._element.append(p)
+        self._index_insert(None, paragraph)
+        
+        if style:
+            key = ("text_style", id(style))
+            if key not in cache:
+                cache[key] = self._compile_text_style(style)
+            self._apply_text_style(paragraph, style, cache[key])
+        return paragraph
+    
+    def _append_heading(self, content: str, level: int, style: Optional[TextStyle] = None,
+                        cache: Optional[Dict[Any, Any]] = None) -> Paragraph:
+        """在文档末尾追加标题，级别 0 为 Title 样式"""
+        if not 0 <= level <= 9:
+            raise ValueError(f"标题级别必须在 0-9 之间，当前为 {level}")
+        return self._append_paragraph(content, "Title" if level == 0 else f"Heading {level}", style, cache)
+    
+    def _append_list(self, items: List[str], ordered: bool, style: Optional[TextStyle] = None,
+                     cache: Optional[Dict[Any, Any]] = None):
+        """在文档末尾追加列表项"""
+        style_name = 'List Number' if ordered else 'List Bullet'
+        for item in items:
+            self._append_paragraph(item, style_name, style, cache)
+    
+    def _apply_text_style(self, paragraph, style: TextStyle, formatter: Optional[Callable] = None):
         """应用文本样式
         
         Args:
             paragraph: 段落对象
             style: 文本样式
+            formatter: 预先编译的样式函数（批量应用同一样式时复用）
         """
         try:
+            formatter = formatter or self._compile_text_style(style)
             for run in paragraph.runs:
-                if style.font_name:
-                    run.font.name = style.font_name
-                if style.font_size:
-                    run.font.size = Pt(style.font_size)
-                if style.bold is not None:
-                    run.font.bold = style.bold
-                if style.italic is not None:
-                    run.font.italic = style.italic
-                if style.underline is not None:
-                    run.font.underline = style.underline
-                if style.color:
-                    # 解析颜色（支持RGB格式）
-                    if style.color.startswith('#'):
-                        color_hex = style.color[1:]
-                        if len(color_hex) == 6:
-                            r = int(color_hex[0:2], 16)
-                            g = int(color_hex[2:4], 16)
-                            b = int(color_hex[4:6], 16)
-                            run.font.color.rgb = RGBColor(r, g, b)
+                formatter(run)
         except Exception as e:
             print(f"应用样式失败: {e}")
     
+    def _compile_text_style(self, style: TextStyle) -> Callable:
+        """把文本样式编译为作用于 run 的函数，字号、颜色等只解析一次
+        
+        Args:
+            style: 文本样式
+            
+        Returns:
+            样式函数，参数为 run
+        """
+        font_size = Pt(style.font_size) if style.font_size else None
+        color = None
+        # 解析颜色（支持RGB格式）
+        if style.color and style.color.startswith('#'):
+            color_hex = style.color[1:]
+            if len(color_hex) == 6:
+                r = int(color_hex[0:2], 16)
+                g = int(color_hex[2:4], 16)
+                b = int(color_hex[4:6], 16)
+                color = RGBColor(r, g, b)
+        
+        def apply(run):
+            if style.font_name:
+                run.font.name = style.font_name
+            if font_size:
+                run.font.size = font_size
+            if style.bold is not None:
+                run.font.bold = style.bold
+            if style.italic is not None:
+                run.font.italic = style.italic
+            if style.underline is not None:
+                run.font.underline = style.underline
+            if color is not None:
+                run.font.color.rgb = color
+        
+        return apply
+    
+    def _insert_paragraph_after(self, paragraph, content: str):
+        """在指定段落之后插入新段落
+        
+        Args:
+            paragraph: 参照段落
+            content: 文本内容
+            
+        Returns:
+            新段落对象
+        """
+        new_p = OxmlElement('w:p')
+        paragraph._p.addnext(new_p)
+        new_paragraph = Paragraph(new_p, paragraph._parent)
+        if content:
+            new_paragraph.add_run(content)
+        return new_paragraph
+    
     def _delete_paragraph(self, paragraph):
         """删除段落
         
@@ -261,11 +378,175 @@ class WordProcessor:
         """
         try:
             p = paragraph._element
+            self._track_memory(p, removed=True)
             p.getparent().remove(p)
             paragraph._p = paragraph._element = None
         except Exception as e:
             print(f"删除段落失败: {e}")
     
+    def _mark_dirty(self):
+        """标记文档存在未保存的修改"""
+        self.dirty = True
+    
+    def estimate_memory_size(self) -> int:
+        """估算文档对象占用的内存字节数
+        
+        按 XML 元素数量和内嵌二进制部件（图片等）大小粗略估算，
+        用于文档缓存的内存预算控制。首次调用时扫描全部部件，之后返回缓存值，
+        段落和表格的增删会增量调整该值，文本和样式修改带来的小幅变化不计入；
+        invalidate_text_index 和 restore 之后重新扫描。
+        
+        Returns:
+            估算的字节数
+        """
+        if self._memory_size is None:
+            self._memory_size = self._scan_memory_size()
+        return self._memory_size
+    
+    def _scan_memory_size(self) -> int:
+        """扫描全部部件估算内存字节数"""
+        try:
+            element_count = 0
+            binary_size = 0
+            for part in self.document.part.package.iter_parts():
+                if isinstance(part, XmlPart):
+                    element_count += int(part.element.xpath('count(//*)'))
+                else:
+                    binary_size += len(part.blob)
+            return element_count * self.ESTIMATED_BYTES_PER_ELEMENT + binary_size
+        except Exception as e:
+            print(f"估算文档内存失败: {e}")
+            return 0
+    
+    def _track_memory(self, element, removed: bool = False):
+        """按新增或删除的元素（含子元素）调整内存估算，尚未估算时忽略"""
+        if self._memory_size is None or element is None:
+            return
+        size = (int(element.xpath('count(.//*)')) + 1) * self.ESTIMATED_BYTES_PER_ELEMENT
+        self._memory_size = max(0, self._memory_size - size if removed else self._memory_size + size)
+    
+    def _build_index(self):
+        """从文档构建段落索引（document.paragraphs 每次访问都会新建代理对象，只在此处访问一次）"""
+        self._paragraph_index = self.document.paragraphs
+        self._text_index = [paragraph.text for paragraph in self._paragraph_index]
+        self._text_length = sum(len(text) for text in self._text_index)
+        self._joined_text = None
+    
+    def _get_text_index(self) -> List[str]:
+        """获取段落文本索引，未构建时从文档构建
+        
+        Returns:
+            段落文本列表
+        """
+        if self._text_index is None:
+            self._build_index()
+        return self._text_index
+    
+    def _get_paragraphs(self) -> List[Paragraph]:
+        """获取段落代理对象索引，未构建时从文档构建
+        
+        Returns:
+            段落列表（只读，请勿修改）
+        """
+        if self._paragraph_index is None:
+            self._build_index()
+        return self._paragraph_index
+    
+    def _index_insert(self, position: Optional[int], paragraph: Paragraph):
+        """在索引中插入段落，position 为 None 时追加到末尾"""
+        self._track_memory(paragraph._p)
+        if self._text_index is None:
+            return
+        text = paragraph.text
+        if position is None:
+            self._paragraph_index.append(paragraph)
+            self._text_index.append(text)
+        else:
+            self._paragraph_index.insert(position, paragraph)
+            self._text_index.insert(position, text)
+        self._text_length += len(text)
+        self._joined_text = None
+    
+    def _index_set(self, position: int, text: str):
+        """更新索引中指定段落的文本"""
+        if self._text_index is None:
+            return
+        self._text_length += len(text) - len(self._text_index[position])
+        self._text_index[position] = text
+        self._joined_text = None
+    
+    def _index_delete(self, position: int):
+        """从索引中删除指定段落"""
+        if self._text_index is None:
+            return
+        del self._paragraph_index[position]
+        self._text_length -= len(self._text_index.pop(position))
+        self._joined_text = None
+    
+    def invalidate_text_index(self):
+        """丢弃段落索引
+        
+        直接通过 self.document 修改文档后需调用此方法，下次查询时重新构建。
+        """
+        self._paragraph_index = None
+        self._text_index = None
+        self._text_length = 0
+        self._joined_text = None
+        self._memory_size = None
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """记录当前文档正文，用于之后回滚
+        
+        只复制正文 XML（各操作只修改正文），图片等新增部件不会随回滚删除，但不再被引用。
+        
+        Returns:
+            快照
+        """
+        return {
+            "body": copy.deepcopy(self.document.element.body),
+            "dirty": self.dirty
+        }
+    
+    def restore(self, snapshot: Dict[str, Any]):
+        """把文档正文恢复到快照时的状态（每个快照只能恢复一次）
+        
+        Args:
+            snapshot: snapshot() 返回的快照
+        """
+        body = self.document.element.body
+        # 保留 body 元素本身，python-docx 缓存的正文代理对象仍然有效
+        for child in list(body):
+            body.remove(child)
+        body.extend(list(snapshot["body"]))
+        self.dirty = snapshot["dirty"]
+        self.invalidate_text_index()
+    
+    def get_paragraph(self, index: int) -> Optional[Paragraph]:
+        """按索引获取段落（不重建段落列表）
+        
+        Args:
+            index: 段落索引
+            
+        Returns:
+            段落对象，索引越界时返回 None
+        """
+        paragraphs = self._get_paragraphs()
+        if 0 <= index < len(paragraphs):
+            return paragraphs[index]
+        return None
+    
+    def get_paragraph_count(self) -> int:
+        """段落数"""
+        return len(self._get_paragraphs())
+    
+    def get_paragraph_texts(self) -> List[str]:
+        """获取各段落文本
+        
+        Returns:
+            段落文本列表（只读，请勿修改）
+        """
+        return self._get_text_index()
+    
     def get_document_text(self) -> str:
         """获取文档全文
         
@@ -273,14 +554,49 @@ class WordProcessor:
             文档文本内容
         """
         try:
-            full_text = []
-            for paragraph in self.document.paragraphs:
-                full_text.append(paragraph.text)
-            return '\n'.join(full_text)
+            if self._joined_text is None:
+                self._joined_text = '\n'.join(self._get_text_index())
+            return self._joined_text
         except Exception as e:
             print(f"获取文档文本失败: {e}")
             return ""
     
+    def get_document_length(self) -> int:
+        """获取文档全文长度（与 get_document_text() 的长度一致）
+        
+        Returns:
+            字符数
+        """
+        texts = self._get_text_index()
+        return self._text_length + max(len(texts) - 1, 0)
+    
+    def get_document_preview(self, max_chars: int = 500) -> str:
+        """获取文档开头的预览文本
+        
+        只拼接覆盖预览长度所需的段落，不生成全文。
+        
+        Args:
+            max_chars: 最大字符数
+            
+        Returns:
+            预览文本
+        """
+        try:
+            if self._joined_text is not None:
+                return self._joined_text[:max_chars]
+            
+            parts = []
+            length = 0
+            for text in self._get_text_index():
+                if length >= max_chars:
+                    break
+                parts.append(text)
+                length += len(text) + 1
+            return '\n'.join(parts)[:max_chars]
+        except Exception as e:
+            print(f"获取文档预览失败: {e}")
+            return ""
+    
     def execute_operation(self, operation: WordOperation) -> bool:
         """执行单个操作
         
@@ -315,17 +631,187 @@ class WordProcessor:
             print(f"执行操作失败: {e}")
             return False
     
-    def execute_operations(self, operations: List[WordOperation]) -> List[bool]:
+    def execute_operations(self, operations: List[WordOperation],
+                           on_result: Optional[Callable[[int, WordOperation, bool], None]] = None,
+                           optimize: bool = True) -> List[bool]:
         """执行多个操作
         
         Args:
             operations: 操作列表
+            on_result: 每个操作执行完成后的回调，参数为 (序号, 操作, 是否成功)
+            optimize: 是否先编译执行计划（合并文本修改和末尾追加）
             
         Returns:
             每个操作的执行结果
         """
+        if optimize:
+            return self.execute_plan(self.compile_plan(operations), on_result)
+        
         results = []
-        for operation in operations:
+        for index, operation in enumerate(operations):
             result = self.execute_operation(operation)
             results.append(result)
-        return results
\ No newline at end of file
+            if on_result:
+                on_result(index, operation, result)
+        return results
+    
+    def compile_plan(self, operations: List[WordOperation]) -> ExecutionPlan:
+        """编译执行计划
+        
+        Args:
+            operations: 操作列表
+            
+        Returns:
+            执行计划
+        """
+        return PlanCompiler().compile(operations)
+    
+    def execute_plan(self, plan: ExecutionPlan,
+                     on_result: Optional[Callable[[int, WordOperation, bool], None]] = None) -> List[bool]:
+        """执行编译好的计划
+        
+        Args:
+            plan: 执行计划
+            on_result: 每个操作执行完成后的回调，按原始序号依次调用
+            
+        Returns:
+            每个操作的执行结果（按原始顺序）
+        """
+        results: List[Optional[bool]] = [None] * plan.operation_count
+        operations: List[Optional[WordOperation]] = [None] * plan.operation_count
+        reported = 0
+        
+        for step in plan.steps:
+            if step.kind == STEP_TEXT_PASS:
+                step_results = self._execute_text_pass(step.operations)
+            elif step.kind == STEP_APPEND:
+                step_results = self._execute_append_batch(step.operations)
+            else:
+                step_results = [self.execute_operation(op) for op in step.operations]
+            
+            for index, operation, result in zip(step.indices, step.operations, step_results):
+                results[index] = result
+                operations[index] = operation
+            
+            # 计划可能调整了顺序，回调只在前序操作都完成后按原始序号发出
+            while reported < plan.operation_count and results[reported] is not None:
+                if on_result:
+                    on_result(reported, operations[reported], results[reported])
+                reported += 1
+        
+        return [bool(result) for result in results]
+    
+    def _execute_text_pass(self, operations: List[WordOperation]) -> List[bool]:
+        """一次扫描段落执行一组 modify_text / delete_text
+        
+        Args:
+            operations: 文本修改操作列表
+            
+        Returns:
+            每个操作的执行结果
+        """
+        try:
+            edits = []
+            for operation in operations:
+                if operation.operation_type == OperationType.MODIFY_TEXT:
+                    old_text = operation.metadata.get('old_text', '') if operation.metadata else ''
+                    edits.append((False, old_text, operation.content or "", operation.style))
+                else:
+                    edits.append((True, operation.content, "", None))
+            return self._apply_text_edits(edits)
+        except Exception as e:
+            print(f"批量修改文本失败: {e}")
+            return [False] * len(operations)
+    
+    def _apply_text_edits(self, edits: List[tuple]) -> List[bool]:
+        """一次扫描段落，按顺序执行一组文本替换/删除
+        
+        多模式自动机找出每个段落命中的编辑，只有命中的段落才会被访问和修改。
+        同一段落内的编辑按原始顺序执行，结果与逐个执行一致：
+        替换在 run 内进行并保留格式；删除后只剩目标文本的段落被整体移除。
+        
+        Args:
+            edits: (是否删除, 查找文本, 替换文本, 样式) 列表
+            
+        Returns:
+            每个编辑的结果：替换是否命中；删除始终为 True
+        """
+        results = [is_delete for is_delete, _, _, _ in edits]
+        matcher = MultiPatternMatcher([target or "" for _, target, _, _ in edits])
+        formatters: Dict[int, Callable] = {}
+        
+        updates = []
+        removals = []
+        for i, text in enumerate(self._get_text_index()):
+            hits = matcher.present(text)
+            if not hits:
+                continue
+            
+            paragraph = self._get_paragraphs()[i]
+            current = text
+            edit_index = matcher.next_edit(hits, 0)
+            while edit_index is not None:
+                is_delete, target, replacement, style = edits[edit_index]
+                if is_delete and current.strip() == target.strip():
+                    removals.append(i)
+                    break
+                hosts = replace_in_paragraph(paragraph._p, target, replacement)
+                current = current.replace(target, replacement)
+                if style and hosts:
+                    if id(style) not in formatters:
+                        formatters[id(style)] = self._compile_text_style(style)
+                    for r in hosts:
+                        formatters[id(style)](Run(r, paragraph))
+                if not is_delete:
+                    results[edit_index] = True
+                edit_index = matcher.next_edit(matcher.present(current), edit_index + 1)
+            
+            if current != text:
+                updates.append((i, current))
+        
+        for i, text in updates:
+            self._index_set(i, text)
+        # 删除段落（倒序，保证索引有效）
+        for i in reversed(removals):
+            self._delete_paragraph(self._get_paragraphs()[i])
+            self._index_delete(i)
+        
+        if updates or removals or any(results):
+            self._mark_dirty()
+        return results
+    
+    def _execute_append_batch(self, operations: List[WordOperation]) -> List[bool]:
+        """批量追加段落到文档末尾
+        
+        与逐个执行使用相同的追加函数，段落样式（列表、标题）和文本样式在整批中只解析一次。
+        
+        Args:
+            operations: 末尾追加操作列表
+            
+        Returns:
+            每个操作的执行结果
+        """
+        results = []
+        cache: Dict[Any, Any] = {}
+        for operation in operations:
+            try:
+                operation_type = operation.operation_type
+                metadata = operation.metadata or {}
+                if operation_type == OperationType.ADD_TEXT:
+                    self._append_paragraph(operation.content, style=operation.style, cache=cache)
+                elif operation_type == OperationType.ADD_HEADING:
+                    self._append_heading(operation.content, metadata.get('level', 1), operation.style, cache)
+                elif operation_type == OperationType.ADD_LIST:
+                    self._append_list(metadata.get('items', []), metadata.get('ordered', False),
+                                      operation.style, cache)
+                else:
+                    results.append(self.execute_operation(operation))
+                    continue
+                self._mark_dirty()
+                result = True
+            except Exception as e:
+                print(f"追加内容失败: {e}")
+                result = False
+            results.append(result)
+        
+        return results
@@ -6,7 +6,7 @@ Word Agent 使用示例
 import requests
 import json
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 class WordAgentClient:
     """Word Agent 客户端"""
@@ -35,10 +35,14 @@ class WordAgentClient:
         response = self.session.post(url, json=data)
         return response.json()
     
-    def get_preview(self, document_path: str) -> Dict[str, Any]:
-        """获取预览"""
+    def get_preview(self, document_path: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """获取预览（传 limit 时分页，用返回的 next_cursor 取下一页）"""
         url = f"{self.base_url}/api/word/preview"
         params = {"document_path": document_path}
+        if limit is not None:
+            params["limit"] = limit
+        if cursor:
+            params["cursor"] = cursor
         response = self.session.get(url, params=params)
         return response.json()
     
@@ -0,0 +1,142 @@
+"""
+BM25 段落检索
+
+中日韩文字按单字和双字切分，不需要分词器；用于本地按相关度定位段落和挑选提示词上下文。
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+# 假名、中日韩统一表意文字、兼容表意文字和韩文音节；其余字母数字按串切分
+CJK_RANGES = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+TOKEN_PATTERN = re.compile(r"[%s]+|[^\W_%s]+" % (CJK_RANGES, CJK_RANGES))
+CJK_PATTERN = re.compile(r"[%s]" % CJK_RANGES)
+
+
+def tokenize(text: str) -> List[str]:
+    """分词：中日韩文字切为单字和相邻双字，其余按字母数字串切分并转为小写
+
+    Args:
+        text: 文本
+
+    Returns:
+        词项列表
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text):
+        run = match.group()
+        if CJK_PATTERN.match(run):
+            tokens.extend(run)
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run.lower())
+    return tokens
+
+
+class BM25Index:
+    """段落 BM25 检索
+
+    不依赖模型，在本地按相关度为自然语言描述排序候选段落。
+    """
+
+    def __init__(self, texts: List[str], k1: float = 1.5, b: float = 0.75):
+        """构建索引
+
+        Args:
+            texts: 段落文本列表，检索结果中的序号即其在列表中的位置
+            k1: 词频饱和参数
+            b: 长度归一化参数
+        """
+        self.k1 = k1
+        self.b = b
+        self._lengths: List[int] = []
+        self._total_length = 0
+        # 词项 -> {段落位置: 词频}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        # 段落位置 -> 词频表，用于更新段落时撤销旧词项
+        self._term_counts: List[Counter] = []
+        for text in texts:
+            self._lengths.append(0)
+            self._term_counts.append(Counter())
+            self.update(len(self._lengths) - 1, text)
+
+    @property
+    def doc_count(self) -> int:
+        """段落数"""
+        return len(self._lengths)
+
+    def update(self, position: int, text: str):
+        """更新某个段落的文本（段落被修改后调用，不必重建索引）
+
+        Args:
+            position: 段落位置
+            text: 新文本
+        """
+        for term in self._term_counts[position]:
+            posting = self._postings[term]
+            del posting[position]
+            if not posting:
+                del self._postings[term]
+
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[position] = tf
+        length = sum(counts.values())
+        self._total_length += length - self._lengths[position]
+        self._lengths[position] = length
+        self._term_counts[position] = counts
+
+    def idf(self, term: str) -> float:
+        """词项的逆文档频率（非负）"""
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[int, float]]:
+        """检索
+
+        Args:
+            query: 自然语言描述
+            top_k: 最多返回的结果数
+
+        Returns:
+            [(段落位置, 得分)]，按得分从高到低排列，只包含得分大于 0 的段落
+        """
+        k1 = self.k1
+        lengths = self._lengths
+        avg_length = self._total_length / self.doc_count if self._total_length else 1.0
+        # 长度归一化系数 k1 * (1 - b + b * len / avg) = base + scale * len
+        base = k1 * (1 - self.b)
+        scale = k1 * self.b / avg_length
+
+        scores: Dict[int, float] = {}
+        for term, query_tf in Counter(tokenize(query)).items():
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            weight = self.idf(term) * query_tf * (k1 + 1)
+            for position, tf in postings.items():
+                scores[position] = scores.get(position, 0.0) + weight * tf / (tf + base + scale * lengths[position])
+
+        ranked = heapq.nsmallest(max(top_k, 0), scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(position, score) for position, score in ranked if score > 0]
+
+
+def rank_paragraphs(paragraphs: List[Dict], query: str, top_k: int = 5) -> List[Dict]:
+    """按相关度排序段落
+
+    Args:
+        paragraphs: List[dict]，每个dict包含 index 和 text
+        query: 自然语言描述
+        top_k: 最多返回的结果数
+
+    Returns:
+        [{"index", "score", "text"}]，按得分从高到低排列
+    """
+    index = BM25Index([para['text'] for para in paragraphs])
+    return [
+        {"index": paragraphs[position]['index'], "score": round(score, 4), "text": paragraphs[position]['text']}
+        for position, score in index.search(query, top_k)
+    ]
@@ -0,0 +1,49 @@
+"""
+请求截止时间
+
+API 层收到请求时创建，逐层向下传递；各层用 remaining() 作为自己操作（如模型调用）的超时上限，
+超时后调用 mark_exceeded() 记录，便于在响应中说明结果来自回退路径。
+"""
+
+import time
+from typing import Optional
+
+
+class Deadline:
+    """请求截止时间"""
+
+    def __init__(self, timeout: Optional[float] = None):
+        """初始化
+
+        Args:
+            timeout: 从现在起的可用秒数，为 None 时不限时
+        """
+        self.expires_at = time.monotonic() + timeout if timeout is not None else None
+        self.exceeded = False
+
+    @classmethod
+    def from_request(cls, timeout_ms: Optional[int], default_timeout: Optional[float] = None) -> "Deadline":
+        """按请求指定的毫秒数和默认秒数中较小的一个创建
+
+        Args:
+            timeout_ms: 请求指定的超时（毫秒）
+            default_timeout: 服务端默认超时（秒）
+
+        Returns:
+            截止时间
+        """
+        candidates = [value for value in (
+            timeout_ms / 1000 if timeout_ms else None,
+            default_timeout or None
+        ) if value is not None]
+        return cls(min(candidates) if candidates else None)
+
+    def remaining(self) -> Optional[float]:
+        """剩余秒数（不小于 0），不限时时为 None"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def mark_exceeded(self):
+        """记录有操作因截止时间被取消"""
+        self.exceeded = True
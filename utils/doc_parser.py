@@ -1,5 +1,5 @@
 import pdfplumber
-from docx import Document
+from utils.docx_reader import iter_docx_paragraphs
 
 def parse_pdf(file_path):
     text_blocks = []
@@ -11,8 +11,7 @@ def parse_pdf(file_path):
     return text_blocks
 
 def parse_docx(file_path):
-    doc = Document(file_path)
-    text_blocks = [para.text.strip() for para in doc.paragraphs if para.text.strip()]
+    text_blocks = [text.strip() for text in iter_docx_paragraphs(file_path) if text.strip()]
     return text_blocks
 
 def parse_file(file_path):
@@ -0,0 +1,428 @@
+"""
+轻量级 docx 流式读取
+
+直接从 zip 中 iterparse 主文档 XML，逐个产出正文段落和表格，处理完的元素立即释放，
+内存占用只与最大的单个段落/表格有关，而不是整个文档。
+文本提取规则与 python-docx 的 Paragraph.text、_Cell.text、_Row.cells 保持一致，只读场景下可以直接替代 Document。
+"""
+
+import posixpath
+import zipfile
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from lxml import etree
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+OFFICE_DOCUMENT_REL = "/officeDocument"
+DEFAULT_MAIN_PART = "word/document.xml"
+
+
+def _w(tag: str) -> str:
+    return f"{{{W_NS}}}{tag}"
+
+
+W_BODY = _w("body")
+W_P = _w("p")
+W_R = _w("r")
+W_HYPERLINK = _w("hyperlink")
+W_TBL = _w("tbl")
+W_TR = _w("tr")
+W_TC = _w("tc")
+W_TC_PR = _w("tcPr")
+W_GRID_SPAN = _w("gridSpan")
+W_V_MERGE = _w("vMerge")
+W_TBL_GRID = _w("tblGrid")
+W_GRID_COL = _w("gridCol")
+W_T = _w("t")
+W_TAB = _w("tab")
+W_PTAB = _w("ptab")
+W_BR = _w("br")
+W_CR = _w("cr")
+W_NO_BREAK_HYPHEN = _w("noBreakHyphen")
+W_VAL = _w("val")
+W_TYPE = _w("type")
+
+PARAGRAPH = "paragraph"
+TABLE = "table"
+
+
+class DocxReader:
+    """docx 流式读取器
+
+    用法::
+
+        with DocxReader(path) as reader:
+            for kind, block in reader.iter_blocks():
+                ...
+    """
+
+    def __init__(self, source: Union[str, IO[bytes]]):
+        """初始化
+
+        Args:
+            source: 文件路径或二进制文件对象
+        """
+        self._zip = zipfile.ZipFile(source)
+        self.main_part = self._find_main_part()
+
+    def __enter__(self) -> "DocxReader":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """关闭文件"""
+        self._zip.close()
+
+    def iter_blocks(self, want: Optional[Callable[[str, int], bool]] = None) -> Iterator[Tuple[str, Any]]:
+        """按文档顺序产出正文中的段落和表格
+
+        Args:
+            want: 判断是否需要某个块内容的函数，参数为 (块类型, 该类型内的序号)；
+                  不需要的块只计数、不提取文本，产出的内容为 None。为 None 时提取全部
+
+        Yields:
+            ("paragraph", 段落文本) 或 ("table", {"rows", "cols", "content"})
+        """
+        counts = {PARAGRAPH: 0, TABLE: 0}
+
+        def wanted(kind: str) -> bool:
+            return want is None or want(kind, counts[kind])
+
+        with self._zip.open(self.main_part) as stream:
+            context = etree.iterparse(
+                stream, events=("end",), tag=(W_P, W_TR, W_TBL),
+                resolve_entities=False, huge_tree=True
+            )
+            # 当前正文表格的累积器；不需要其内容时为 False
+            table = None
+            for _, element in context:
+                parent = element.getparent()
+                if element.tag == W_TR:
+                    # 正文表格逐行处理后即释放，大表格也不需要整体驻留内存
+                    body = parent.getparent() if parent is not None else None
+                    if body is None or body.tag != W_BODY:
+                        continue
+                    if table is None:
+                        table = TableAccumulator(parent) if wanted(TABLE) else False
+                    if table is not False:
+                        table.add_row(element)
+                    _release(element, parent)
+                    continue
+
+                # 只处理 body 的直接子元素，单元格内的段落随所在行一并处理
+                if parent is None or parent.tag != W_BODY:
+                    continue
+                if element.tag == W_P:
+                    kind = PARAGRAPH
+                    yield kind, paragraph_text(element) if wanted(kind) else None
+                else:
+                    kind = TABLE
+                    if table is None:
+                        table = TableAccumulator(element) if wanted(kind) else False
+                    yield kind, table.finish() if table is not False else None
+                    table = None
+                counts[kind] += 1
+                _release(element, parent)
+
+    def iter_paragraphs(self, offset: int = 0) -> Iterator[str]:
+        """产出正文段落文本（与 Document.paragraphs 一一对应），表格不解析
+
+        Args:
+            offset: 起始段落序号，之前的段落不提取文本
+        """
+        want = lambda kind, index: kind == PARAGRAPH and index >= offset
+        index = 0
+        for kind, block in self.iter_blocks(want):
+            if kind == PARAGRAPH:
+                if index >= offset:
+                    yield block
+                index += 1
+
+    def iter_tables(self) -> Iterator[Dict[str, Any]]:
+        """产出正文表格（与 Document.tables 一一对应），段落不解析"""
+        for kind, block in self.iter_blocks(lambda kind, index: kind == TABLE):
+            if kind == TABLE:
+                yield block
+
+    def read_structure(self, offset: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """读取段落和表格，可按块（段落和表格按文档顺序统一计数）分页
+
+        只解析到窗口之后的第一个块为止，窗口之前的块不提取内容。
+
+        Args:
+            offset: 起始块序号
+            limit: 最多返回的块数，为 None 时读到文档末尾
+
+        Returns:
+            {"paragraphs": [{"index", "text"}], "tables": [{"index", "rows", "cols", "content"}],
+             "next_offset": 下一页的起始块序号，没有更多内容时为 None}
+        """
+        stop = None if limit is None else offset + limit
+        counts = {PARAGRAPH: 0, TABLE: 0}
+        paragraphs = []
+        tables = []
+        next_offset = None
+        block_index = 0
+        want = lambda kind, index: block_index >= offset and (stop is None or block_index < stop)
+        for kind, block in self.iter_blocks(want):
+            if stop is not None and block_index >= stop:
+                next_offset = block_index
+                break
+            if block_index >= offset:
+                if kind == PARAGRAPH:
+                    paragraphs.append({"index": counts[kind], "text": block})
+                else:
+                    tables.append({"index": counts[kind], **block})
+            counts[kind] += 1
+            block_index += 1
+        return {"paragraphs": paragraphs, "tables": tables, "next_offset": next_offset}
+
+    def read_paragraphs(self, offset: int = 0, limit: Optional[int] = None) -> Tuple[List[str], Optional[int]]:
+        """按段落分页读取正文文本
+
+        Args:
+            offset: 起始段落序号
+            limit: 最多返回的段落数，为 None 时读到文档末尾
+
+        Returns:
+            (段落文本列表, 下一页的起始段落序号；没有更多段落时为 None)
+        """
+        texts = []
+        for text in self.iter_paragraphs(offset):
+            if limit is not None and len(texts) >= limit:
+                return texts, offset + len(texts)
+            texts.append(text)
+        return texts, None
+
+    def read_text(self, max_chars: Optional[int] = None) -> str:
+        """读取正文段落文本（以换行连接），达到 max_chars 后停止解析
+
+        Args:
+            max_chars: 最大字符数，为 None 时读取全部
+
+        Returns:
+            文本
+        """
+        parts = []
+        length = 0
+        for text in self.iter_paragraphs():
+            if max_chars is not None and length >= max_chars:
+                break
+            parts.append(text)
+            length += len(text) + 1
+        joined = "\n".join(parts)
+        return joined if max_chars is None else joined[:max_chars]
+
+    def _find_main_part(self) -> str:
+        """从包关系中找到主文档部件"""
+        try:
+            rels = etree.fromstring(self._zip.read("_rels/.rels"))
+            for rel in rels.iter(f"{{{REL_NS}}}Relationship"):
+                if rel.get("Type", "").endswith(OFFICE_DOCUMENT_REL):
+                    return posixpath.normpath(rel.get("Target").lstrip("/"))
+        except KeyError:
+            pass
+        return DEFAULT_MAIN_PART
+
+
+def run_text(r) -> str:
+    """run 的文本（同 python-docx CT_R.text）"""
+    parts = []
+    for child in r:
+        tag = child.tag
+        if tag == W_T:
+            parts.append(child.text or "")
+        elif tag == W_TAB or tag == W_PTAB:
+            parts.append("\t")
+        elif tag == W_BR:
+            if child.get(W_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif tag == W_CR:
+            parts.append("\n")
+        elif tag == W_NO_BREAK_HYPHEN:
+            parts.append("-")
+    return "".join(parts)
+
+
+def paragraph_text(p) -> str:
+    """段落文本（同 python-docx Paragraph.text）"""
+    parts = []
+    for child in p:
+        if child.tag == W_R:
+            parts.append(run_text(child))
+        elif child.tag == W_HYPERLINK:
+            parts.extend(run_text(r) for r in child if r.tag == W_R)
+    return "".join(parts)
+
+
+def table_content(tbl) -> Dict[str, Any]:
+    """表格的行列数和单元格文本（同 python-docx Table.rows / Table.columns / _Row.cells）"""
+    table = TableAccumulator(tbl)
+    for tr in tbl.findall(W_TR):
+        table.add_row(tr)
+    return table.finish()
+
+
+class TableAccumulator:
+    """逐行累积表格内容
+
+    与 python-docx 一致，按布局网格把所有单元格展开为一个扁平列表，第 i 行取其中
+    [i * 列数, (i + 1) * 列数) 的部分：横向合并的单元格重复出现，纵向合并的后续单元格取上方单元格的文本。
+    扁平列表只保留尚未输出的部分和最近一行，不随行数增长。
+    """
+
+    def __init__(self, tbl):
+        """初始化
+
+        Args:
+            tbl: w:tbl 元素（至少已解析到 tblGrid）
+        """
+        grid = tbl.find(W_TBL_GRID)
+        self.col_count = len(grid.findall(W_GRID_COL)) if grid is not None else 0
+        self.row_count = 0
+        self.content: List[List[str]] = []
+        self._cells: List[str] = []
+        # self._cells[0] 在扁平列表中的位置
+        self._base = 0
+
+    def add_row(self, tr):
+        """加入一行
+
+        Args:
+            tr: w:tr 元素
+        """
+        col_count = self.col_count
+        cells = self._cells
+        for tc in tr.findall(W_TC):
+            grid_span, v_merge = _cell_properties(tc)
+            text = None
+            for span_index in range(grid_span):
+                if v_merge == "continue" and col_count and len(cells) >= col_count:
+                    cells.append(cells[-col_count])
+                elif span_index > 0:
+                    cells.append(cells[-1])
+                else:
+                    if text is None:
+                        text = "\n".join(paragraph_text(p) for p in tc.findall(W_P))
+                    cells.append(text)
+        self.row_count += 1
+        self._emit_rows(final=False)
+
+    def finish(self) -> Dict[str, Any]:
+        """结束累积
+
+        Returns:
+            {"rows", "cols", "content"}
+        """
+        self._emit_rows(final=True)
+        return {"rows": self.row_count, "cols": self.col_count, "content": self.content}
+
+    def _emit_rows(self, final: bool):
+        """输出已经凑满的行，并丢弃之后不再需要的单元格"""
+        col_count = self.col_count
+        if not col_count:
+            self.content.extend([] for _ in range(self.row_count - len(self.content)))
+            return
+
+        total = self._base + len(self._cells)
+        while len(self.content) < self.row_count:
+            start = len(self.content) * col_count
+            if not final and start + col_count > total:
+                break
+            self.content.append(self._cells[start - self._base:start + col_count - self._base])
+
+        # 纵向合并需要访问倒数第 col_count 个单元格
+        cut = min(len(self.content) * col_count, total - col_count)
+        if cut > self._base:
+            del self._cells[:cut - self._base]
+            self._base = cut
+
+
+def _cell_properties(tc) -> Tuple[int, Optional[str]]:
+    """单元格的 gridSpan 和 vMerge"""
+    tc_pr = tc.find(W_TC_PR)
+    if tc_pr is None:
+        return 1, None
+    grid_span = 1
+    span = tc_pr.find(W_GRID_SPAN)
+    if span is not None:
+        try:
+            grid_span = max(int(span.get(W_VAL)), 1)
+        except (TypeError, ValueError):
+            grid_span = 1
+    v_merge = None
+    merge = tc_pr.find(W_V_MERGE)
+    if merge is not None:
+        v_merge = merge.get(W_VAL, "continue")
+    return grid_span, v_merge
+
+
+def _release(element, parent):
+    """释放已处理的元素及其之前的兄弟节点"""
+    element.clear()
+    while element.getprevious() is not None:
+        del parent[0]
+
+
+def body_structure(body) -> Dict[str, List[Dict[str, Any]]]:
+    """从已加载的 w:body 元素读取段落和表格结构（用于内存中的文档，避免保存后重新读取）
+
+    Args:
+        body: w:body 元素，如 Document.element.body
+
+    Returns:
+        {"paragraphs": [...], "tables": [...]}，格式同 read_docx_structure
+    """
+    paragraphs = []
+    tables = []
+    for child in body:
+        if child.tag == W_P:
+            paragraphs.append({"index": len(paragraphs), "text": paragraph_text(child)})
+        elif child.tag == W_TBL:
+            tables.append({"index": len(tables), **table_content(child)})
+    return {"paragraphs": paragraphs, "tables": tables}
+
+
+def read_docx_structure(source: Union[str, IO[bytes]]) -> Dict[str, List[Dict[str, Any]]]:
+    """读取 docx 的段落和表格结构
+
+    Args:
+        source: 文件路径或二进制文件对象
+
+    Returns:
+        {"paragraphs": [...], "tables": [...]}
+    """
+    with DocxReader(source) as reader:
+        structure = reader.read_structure()
+    structure.pop("next_offset")
+    return structure
+
+
+def iter_docx_paragraphs(source: Union[str, IO[bytes]]) -> Iterator[str]:
+    """逐个读取 docx 正文段落文本
+
+    Args:
+        source: 文件路径或二进制文件对象
+
+    Yields:
+        段落文本
+    """
+    with DocxReader(source) as reader:
+        yield from reader.iter_paragraphs()
+
+
+def read_docx_text(source: Union[str, IO[bytes]], max_chars: Optional[int] = None) -> str:
+    """读取 docx 正文文本
+
+    Args:
+        source: 文件路径或二进制文件对象
+        max_chars: 最大字符数，为 None 时读取全部
+
+    Returns:
+        以换行连接的段落文本
+    """
+    with DocxReader(source) as reader:
+        return reader.read_text(max_chars)
@@ -0,0 +1,124 @@
+"""
+增量 JSON 数组解析
+
+模型流式输出 JSON 数组时，每个顶层元素一闭合就解析出来，不必等整个数组生成完毕。
+第一个 '[' 之前的内容（说明文字、```json 代码块标记等）会被跳过。
+"""
+
+import json
+from typing import Any, List, Optional
+
+
+class JsonArrayStream:
+    """增量解析顶层 JSON 数组的元素"""
+
+    def __init__(self):
+        # 尚未处理完的文本，只保留当前元素开始之后的部分
+        self._buffer = ""
+        # 下一个待扫描字符在 _buffer 中的位置
+        self._pos = 0
+        # 当前元素在 _buffer 中的起始位置
+        self._item_start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.started = False
+        self.closed = False
+        # 已解析出的元素数
+        self.count = 0
+
+    def feed(self, chunk: str) -> List[Any]:
+        """输入一段文本
+
+        Args:
+            chunk: 模型新生成的文本
+
+        Returns:
+            本段文本中闭合的顶层元素（已解析为 Python 对象）
+
+        Raises:
+            ValueError: 元素不是合法的 JSON
+        """
+        items: List[Any] = []
+        if self.closed or not chunk:
+            return items
+        buf = self._buffer + chunk
+        i = self._pos
+        length = len(buf)
+        while i < length:
+            char = buf[i]
+            if not self.started:
+                if char == "[":
+                    self.started = True
+                    self._depth = 1
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                i += 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._item_start is None:
+                    self._item_start = i
+            elif char in "{[":
+                if self._item_start is None:
+                    self._item_start = i
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    # 顶层数组结束，可能还有未以逗号结尾的标量元素
+                    if self._item_start is not None:
+                        items.append(self._decode(buf[self._item_start:i]))
+                        self._item_start = None
+                    self.closed = True
+                    i += 1
+                    break
+                if self._depth == 1:
+                    items.append(self._decode(buf[self._item_start:i + 1]))
+                    self._item_start = None
+            elif self._depth == 1:
+                if char == ",":
+                    if self._item_start is not None:
+                        items.append(self._decode(buf[self._item_start:i]))
+                        self._item_start = None
+                elif not char.isspace() and self._item_start is None:
+                    self._item_start = i
+            i += 1
+
+        # 丢弃已处理的文本
+        cut = self._item_start if self._item_start is not None else i
+        self._buffer = buf[cut:]
+        self._pos = i - cut
+        if self._item_start is not None:
+            self._item_start = 0
+        return items
+
+    def finish(self):
+        """确认数组已完整结束
+
+        Raises:
+            ValueError: 没有找到数组，或数组没有闭合
+        """
+        if not self.started:
+            raise ValueError("响应中没有 JSON 数组")
+        if not self.closed:
+            raise ValueError("JSON 数组不完整")
+
+    def _decode(self, text: str) -> Any:
+        """解析一个元素"""
+        text = text.strip()
+        try:
+            item = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"无法解析数组元素: {text[:100]}: {e}")
+        self.count += 1
+        return item
@@ -7,4 +7,5 @@ def setup_logger():
     log_path = config.get("log_path", "data/app.log")
     os.makedirs(os.path.dirname(log_path), exist_ok=True)
     logger.add(log_path, rotation="1 MB", retention="10 days", encoding="utf-8")
-    logger.info("Logger initialized.")
\ No newline at end of file
+    logger.info("Logger initialized.")
+    return logger
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""
+分页游标
+
+游标是对起始位置的不透明编码，客户端只需原样回传上一页返回的 next_cursor。
+"""
+
+import base64
+import json
+from typing import Optional, Tuple
+
+# 单页最大条目数
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(offset: int) -> str:
+    """编码游标
+
+    Args:
+        offset: 下一页的起始位置
+
+    Returns:
+        游标字符串
+    """
+    raw = json.dumps({"o": int(offset)}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """解码游标
+
+    Args:
+        cursor: 游标字符串
+
+    Returns:
+        起始位置
+
+    Raises:
+        ValueError: 游标无效
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))["o"]
+    except Exception:
+        raise ValueError(f"无效的分页游标: {cursor}")
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError(f"无效的分页游标: {cursor}")
+    return offset
+
+
+def resolve_page(
+    offset: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Tuple[int, Optional[int]]:
+    """确定分页窗口，游标优先于 offset
+
+    Args:
+        offset: 起始位置
+        limit: 单页条目数，为 None 时不分页；超过 MAX_PAGE_SIZE 时按 MAX_PAGE_SIZE 处理
+        cursor: 上一页返回的游标
+
+    Returns:
+        (起始位置, 单页条目数)
+
+    Raises:
+        ValueError: 参数无效
+    """
+    start = decode_cursor(cursor) if cursor else (offset or 0)
+    if start < 0:
+        raise ValueError("offset 不能为负数")
+    if limit is not None:
+        if limit <= 0:
+            raise ValueError("limit 必须为正整数")
+        limit = min(limit, MAX_PAGE_SIZE)
+    return start, limit
@@ -1,88 +1,198 @@
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Iterator
 import os
+import time
 import uuid
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from datetime import datetime
 
-from ai.openai_api import OpenAIAPI
+from ai.context_builder import ContextBuilder
+from ai.openai_api import AsyncLLMClient, OpenAIAPI, get_llm_client
 from document.word_processor import WordProcessor
-from word_agent.command_parser import CommandParser
+from document.plan_compiler import ExecutionPlan
+from word_agent.command_parser import CommandParser, OperationStream
+from word_agent.document_cache import DocumentCache
+from word_agent.intent_parser import IntentParser
+from word_agent.model_router import ModelRouter, RouteDecision
+from word_agent.parse_cache import ParseCache
+from word_agent.write_behind import WriteBehindSaver
+from word_agent.progress import ProgressCallback, ProgressTracker
+from word_agent.batch import init_batch_worker, run_batch_group, group_batch_jobs
 from api.models import (
     WordOperation, ProcessRequest, ProcessResponse, 
-    CreateDocumentRequest, ExportRequest, DocumentFormat
+    CreateDocumentRequest, ExportRequest, DocumentFormat,
+    BatchJob, BatchJobResult
 )
 from config import load_config
+from utils.deadline import Deadline
+from utils.docx_reader import DocxReader
+from utils.pagination import encode_cursor
 from utils.logger import setup_logger
 
 
 class WordAgent:
     """Word Agent 核心引擎"""
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 llm_client: Optional[AsyncLLMClient] = None):
         """初始化 Word Agent
         
         Args:
             config: 配置字典
+            llm_client: LLM 客户端，为 None 时使用进程内共享客户端
         """
         self.config = config or load_config()
         self.logger = setup_logger()
         
-        # 初始化 AI 接口
+        # 初始化 AI 接口（共享连接池）
+        self.llm_client = llm_client or get_llm_client(self.config)
         self.openai_api = OpenAIAPI(
             api_key=self.config.get('openai_api_key', ''),
-            model=self.config.get('chat_model', 'gpt-3.5-turbo')
+            model=self.config.get('chat_model', 'gpt-3.5-turbo'),
+            client=self.llm_client
         )
         
+        # 初始化解析结果缓存
+        self.parse_cache: Optional[ParseCache] = None
+        if self.config.get('parse_cache_enabled', True):
+            self.parse_cache = ParseCache(
+                db_path=self.config.get('parse_cache_path', 'data/parse_cache.db'),
+                max_entries=self.config.get('parse_cache_size', 1000),
+                ttl=self.config.get('parse_cache_ttl', 86400)
+            )
+        
+        # 模型路由：配置了 model_tiers 时按指令复杂度选择模型
+        self.model_router: Optional[ModelRouter] = None
+        if self.config.get('model_tiers'):
+            self.model_router = ModelRouter(self.config['model_tiers'])
+        
         # 初始化指令解析器
-        self.command_parser = CommandParser(self.openai_api)
+        intent_parser = IntentParser() if self.config.get('local_parse_enabled', True) else None
+        self.command_parser = CommandParser(
+            self.openai_api,
+            parse_cache=self.parse_cache,
+            intent_parser=intent_parser,
+            local_threshold=self.config.get('local_parse_threshold', 0.85),
+            context_builder=ContextBuilder(self.config.get('context_token_budget', 2000)),
+            output_format=self.config.get('llm_output_format', 'dsl')
+        )
         
         # 工作目录
         self.workspace = self.config.get('workspace', 'data/workspace')
         os.makedirs(self.workspace, exist_ok=True)
         
-        # 文档缓存
-        self.document_cache: Dict[str, WordProcessor] = {}
+        # 文档缓存（LRU，受条目数与估算内存双重限制）
+        cache_enabled = self.config.get('cache_enabled', True)
+        self.document_cache = DocumentCache(
+            max_entries=self.config.get('cache_size', 100) if cache_enabled else 0,
+            max_bytes=self.config.get('cache_max_bytes', 512 * 1024 * 1024),
+            on_evict=self._flush_evicted_processor
+        )
+        
+        # 批处理进程池（首次批处理时创建）
+        self._batch_pool: Optional[ProcessPoolExecutor] = None
+        
+        # 延迟合并保存：save_mode 为 write_behind 时，指令执行后只标记文档为脏，
+        # 由后台线程在 save_debounce 秒无新修改后保存（最迟 backup_interval 秒）；
+        # auto_save 为 False 时只在显式 flush、缓存淘汰和服务关闭时保存
+        self.write_behind: Optional[WriteBehindSaver] = None
+        if self.config.get('save_mode', 'immediate') == 'write_behind':
+            self.write_behind = WriteBehindSaver(
+                debounce=self.config.get('save_debounce', 2.0),
+                max_delay=self.config.get('backup_interval', 300),
+                auto_flush=self.config.get('auto_save', True),
+                on_error=lambda path, e: self.logger.error(f"延迟保存文档失败: {path}: {e}")
+            )
+    
+    def request_deadline(self, request: ProcessRequest) -> Deadline:
+        """按请求的 timeout_ms 和配置的 request_timeout 中较小的一个创建截止时间
+        
+        Args:
+            request: 处理请求
+            
+        Returns:
+            截止时间
+        """
+        return Deadline.from_request(request.timeout_ms, self.config.get('request_timeout', 30))
     
-    def process_instruction(self, request: ProcessRequest) -> ProcessResponse:
+    def process_instruction(self, request: ProcessRequest,
+                            progress: Optional[ProgressCallback] = None,
+                            deadline: Optional[Deadline] = None) -> ProcessResponse:
         """处理指令请求
         
         Args:
             request: 处理请求
+            progress: 进度回调，依次收到 started、parsing、llm_complete、plan、
+                operation（每个操作一次）、saved 阶段事件；流式执行模型输出时
+                operation 事件先于 llm_complete，且没有 plan 事件，流式解析失败时
+                还会收到 rollback 事件，超过截止时间而保留部分结果时收到 deadline 事件；
+                调用了模型时 llm_complete 带有 usage（token 用量，cached_tokens 为命中提示词缓存的部分）
+            deadline: 截止时间，为 None 时在此处按 request_deadline 创建；
+                API 层应在收到请求时创建，使排队时间也计入时限
             
         Returns:
             处理响应
         """
+        tracker = ProgressTracker(progress)
+        deadline = deadline or self.request_deadline(request)
         try:
             self.logger.info(f"处理指令: {request.instruction}")
+            tracker.emit("started", instruction=request.instruction, document_path=request.document_path)
             
             # 获取或创建文档处理器
             processor = self._get_or_create_processor(request.document_path)
             
-            # 获取当前文档内容
-            current_content = processor.get_document_text()
+            with processor.lock:
+                return self._process_with_processor(processor, request, tracker, deadline)
             
-            # 解析指令
-            if request.operations:
-                # 如果直接提供了操作列表
-                operations = request.operations
-            else:
-                # 使用AI解析自然语言指令
-                operations = self.command_parser.parse_instruction(
-                    request.instruction,
-                    current_content
-                )
-            
-            # 验证操作
-            valid_operations = self.command_parser.validate_operations(operations)
-            
-            if not valid_operations:
-                return ProcessResponse(
-                    success=False,
-                    message="无法解析指令或操作无效"
-                )
-            
-            # 执行操作
-            results = processor.execute_operations(valid_operations)
+        except Exception as e:
+            self.logger.error(f"处理指令失败: {e}")
+            return ProcessResponse(
+                success=False,
+                message=f"处理失败: {str(e)}"
+            )
+    
+    def _process_with_processor(self, processor: WordProcessor, request: ProcessRequest,
+                                tracker: Optional[ProgressTracker] = None,
+                                deadline: Optional[Deadline] = None) -> ProcessResponse:
+        """在已持有文档锁的处理器上执行指令
+        
+        Args:
+            processor: 文档处理器
+            request: 处理请求
+            tracker: 进度上报器
+            deadline: 截止时间
             
+        Returns:
+            处理响应
+        """
+        tracker = tracker or ProgressTracker()
+        valid_operations, results, plan = self._parse_and_execute(processor, request, tracker, deadline)
+        deadline_exceeded = bool(deadline and deadline.exceeded)
+        
+        if not valid_operations:
+            return ProcessResponse(
+                success=False,
+                message="处理超时，本地也无法解析指令" if deadline_exceeded else "无法解析指令或操作无效",
+                deadline_exceeded=deadline_exceeded
+            )
+        
+        if self.write_behind:
+            # 延迟保存：每个处理器使用固定的保存路径，并以该路径访问缓存，
+            # 使后续以返回路径发起的请求命中内存中的最新文档；
+            # 处理器已以源路径缓存时保存路径登记为别名，只占一个缓存条目
+            output_path = (
+                self.write_behind.target_for(processor)
+                or self._generate_output_path(request.document_path, unique=True)
+            )
+            self.write_behind.mark_dirty(processor, output_path, source_path=request.document_path)
+            if request.document_path and request.document_path in self.document_cache:
+                self.document_cache.put(request.document_path, processor)
+                self.document_cache.alias(output_path, request.document_path)
+            else:
+                self.document_cache.put(output_path, processor)
+        else:
             # 保存文档
             output_path = self._generate_output_path(request.document_path)
             save_success = processor.save_document(output_path)
@@ -92,52 +202,427 @@ class WordAgent:
                     success=False,
                     message="文档保存失败"
                 )
+        
+        tracker.emit("saved", document_path=output_path, deferred=bool(self.write_behind))
+        
+        # 文档内容已变化，重新估算缓存占用（延迟保存时已在上面更新）
+        if request.document_path and not self.write_behind:
+            self.document_cache.put(request.document_path, processor)
+        
+        # 获取预览内容
+        preview_text = processor.get_document_preview(500)
+        
+        # 统计成功执行的操作
+        successful_operations = [
+            op for op, result in zip(valid_operations, results) if result
+        ]
+        
+        message = f"成功执行 {len(successful_operations)} 个操作"
+        if deadline_exceeded:
+            message += "（模型响应超时，结果来自本地解析或为部分结果）"
+        return ProcessResponse(
+            success=True,
+            message=message,
+            document_path=output_path,
+            operations_performed=successful_operations,
+            preview_text=preview_text,
+            execution_plan=plan.to_dict() if plan and self.config.get('debug') else None,
+            deadline_exceeded=deadline_exceeded
+        )
+    
+    def _parse_and_execute(self, processor: WordProcessor, request: ProcessRequest,
+                           tracker: Optional[ProgressTracker] = None,
+                           deadline: Optional[Deadline] = None
+                           ) -> Tuple[List[WordOperation], List[bool], Optional[ExecutionPlan]]:
+        """解析指令并在处理器上执行（不保存）
+        
+        Args:
+            processor: 文档处理器
+            request: 处理请求
+            tracker: 进度上报器
+            deadline: 截止时间，超过时取消模型调用并使用回退解析的结果
             
-            # 获取预览内容
-            preview_text = processor.get_document_text()[:500]
-            
-            # 统计成功执行的操作
-            successful_operations = [
-                op for op, result in zip(valid_operations, results) if result
-            ]
+        Returns:
+            (有效操作列表, 每个操作的执行结果, 执行计划)，无有效操作时为 ([], [], None)
+        """
+        tracker = tracker or ProgressTracker()
+        tracker.emit("parsing")
+        
+        # 获取当前文档内容
+        current_content = processor.get_document_text()
+        current_paragraphs = processor.get_paragraph_texts()
+        
+        # 按指令复杂度选择模型档位（未配置档位时使用 chat_model）
+        route = None
+        if self.model_router and not request.operations:
+            route = self.model_router.route(request.instruction, current_paragraphs)
+            self.logger.debug(f"模型路由: {route.to_dict()}")
+        model = route.tier.model if route else None
+        started_at = time.perf_counter()
+        
+        # 解析指令；调用模型时记录 token 用量（含命中提示词缓存的 token 数）
+        usage: Dict[str, int] = {}
+        if request.operations:
+            # 如果直接提供了操作列表
+            operations = request.operations
+            source = "request"
+        elif self.config.get('llm_streaming', True):
+            # 流式解析：模型输出的操作一闭合就执行
+            stream = self.command_parser.stream_instruction(
+                request.instruction,
+                current_content,
+                current_paragraphs,
+                model=model,
+                deadline=deadline
+            )
+            if stream.streaming:
+                result = self._execute_stream(processor, stream, tracker)
+                self._record_route(route, stream.source, started_at, result)
+                return result
+            operations, source = stream.operations, stream.source
+        else:
+            # 解析自然语言指令（简单指令在本地解析，其余交给模型）
+            operations, source = self.command_parser.parse_instruction_with_source(
+                request.instruction,
+                current_content,
+                current_paragraphs,
+                on_usage=usage.update,
+                model=model,
+                deadline=deadline
+            )
+        parse_finished_at = time.perf_counter()
+        
+        # 验证操作
+        valid_operations = self.command_parser.validate_operations(operations)
+        self._log_usage(usage)
+        tracker.emit(
+            "llm_complete",
+            source=source,
+            operations=[op.model_dump(mode="json") for op in valid_operations],
+            usage=usage or None
+        )
+        result = self._execute_planned(processor, valid_operations, tracker)
+        self._record_route(route, source, started_at, result, parse_finished_at)
+        return result
+    
+    def _record_route(self, route: Optional[RouteDecision], source: str, started_at: float,
+                      result: Tuple[List[WordOperation], List[bool], Optional[ExecutionPlan]],
+                      finished_at: Optional[float] = None):
+        """把模型调用的耗时和执行结果计入所选档位（本地解析和缓存命中不计入）
+        
+        超时后保留部分结果（partial）和使用回退解析（fallback）都算作模型调用失败。
+        """
+        if route is None or source not in ("llm", "fallback", "partial"):
+            return
+        valid_operations, results, _ = result
+        latency_ms = ((finished_at or time.perf_counter()) - started_at) * 1000
+        self.model_router.record(
+            route.tier.name,
+            latency_ms,
+            failed=source in ("fallback", "partial"),
+            operations=len(valid_operations),
+            succeeded=sum(1 for success in results if success)
+        )
+    
+    def _execute_planned(self, processor: WordProcessor, valid_operations: List[WordOperation],
+                         tracker: ProgressTracker
+                         ) -> Tuple[List[WordOperation], List[bool], Optional[ExecutionPlan]]:
+        """编译执行计划并执行已验证的操作"""
+        if not valid_operations:
+            return [], [], None
+        
+        # 编译执行计划：合并文本修改和末尾追加
+        plan = processor.compile_plan(valid_operations)
+        self.logger.debug(f"执行计划: {plan.to_dict()}")
+        tracker.emit("plan", **plan.to_dict())
+        
+        # 执行操作
+        def on_result(index: int, operation: WordOperation, success: bool):
+            tracker.emit(
+                "operation",
+                index=index,
+                operation_type=operation.operation_type.value,
+                success=success
+            )
+        
+        results = processor.execute_plan(plan, on_result=on_result if tracker.callback else None)
+        return valid_operations, results, plan
+    
+    def _execute_stream(self, processor: WordProcessor, stream: OperationStream,
+                        tracker: ProgressTracker
+                        ) -> Tuple[List[WordOperation], List[bool], Optional[ExecutionPlan]]:
+        """边接收模型输出边执行操作
+        
+        执行前记录文档快照；模型输出完整解析后整体提交，流式响应中断或输出无法解析时
+        回滚已执行的操作，改为按计划执行回退解析的结果。超过截止时间被取消时，
+        如果已经执行了操作则保留这部分结果，否则同样使用回退解析的结果。
+        
+        Args:
+            processor: 文档处理器（调用方已持有文档锁）
+            stream: 模型操作流
+            tracker: 进度上报器
             
-            return ProcessResponse(
-                success=True,
-                message=f"成功执行 {len(successful_operations)} 个操作",
-                document_path=output_path,
-                operations_performed=successful_operations,
-                preview_text=preview_text
+        Returns:
+            (有效操作列表, 每个操作的执行结果, 执行计划)，流式执行时执行计划为 None
+        """
+        snapshot = processor.snapshot()
+        valid_operations: List[WordOperation] = []
+        results: List[bool] = []
+        for operation in stream:
+            if not self.command_parser.validate_operations([operation]):
+                continue
+            success = processor.execute_operation(operation)
+            tracker.emit(
+                "operation",
+                index=len(valid_operations),
+                operation_type=operation.operation_type.value,
+                success=success
+            )
+            valid_operations.append(operation)
+            results.append(success)
+        
+        self._log_usage(stream.usage)
+        if stream.source == "partial":
+            self.logger.warning(f"模型响应超过截止时间，保留已执行的 {len(valid_operations)} 个操作")
+            tracker.emit("deadline", operations=len(valid_operations), error=str(stream.error))
+        elif stream.error is not None:
+            self.logger.warning(f"流式解析失败，回滚已执行的 {len(valid_operations)} 个操作: {stream.error}")
+            processor.restore(snapshot)
+            tracker.emit("rollback", operations=len(valid_operations), error=str(stream.error))
+            valid_operations = self.command_parser.validate_operations(stream.fallback)
+            tracker.emit(
+                "llm_complete",
+                source=stream.source,
+                operations=[op.model_dump(mode="json") for op in valid_operations],
+                usage=stream.usage or None
+            )
+            return self._execute_planned(processor, valid_operations, tracker)
+        
+        tracker.emit(
+            "llm_complete",
+            source=stream.source,
+            operations=[op.model_dump(mode="json") for op in valid_operations],
+            usage=stream.usage or None
+        )
+        return valid_operations, results, None
+    
+    def _log_usage(self, usage: Dict[str, int]):
+        """记录一次模型调用的 token 用量"""
+        if usage:
+            self.logger.info(
+                f"模型用量: 输入 {usage['prompt_tokens']}（缓存命中 {usage['cached_tokens']}），"
+                f"输出 {usage['completion_tokens']}"
             )
+    
+    def process_batch(self, jobs: List[BatchJob]) -> List[BatchJobResult]:
+        """批量处理多个文档的指令
+        
+        Args:
+            jobs: 任务列表
             
-        except Exception as e:
-            self.logger.error(f"处理指令失败: {e}")
-            return ProcessResponse(
-                success=False,
-                message=f"处理失败: {str(e)}"
+        Returns:
+            按任务序号排列的结果列表
+        """
+        results = list(self.iter_batch(jobs))
+        results.sort(key=lambda result: result.job_index)
+        return results
+    
+    def iter_batch(self, jobs: List[BatchJob]) -> Iterator[BatchJobResult]:
+        """批量处理多个文档的指令，按完成顺序逐个产出结果
+        
+        任务按文档分组后提交到进程池并发执行，同一文档的任务在一个工作进程中
+        依次执行，整批只加载和保存一次。文档已在缓存中时，整组执行期间持有其文档锁，
+        使同一文档上的其他请求在工作进程读取文档时不会修改或保存它。
+        
+        Args:
+            jobs: 任务列表
+            
+        Yields:
+            任务结果
+        """
+        groups = group_batch_jobs(jobs)
+        if not groups:
+            return
+        
+        self.logger.info(f"开始批处理: {len(jobs)} 个任务, {len(groups)} 个文档")
+        pool = self._get_batch_pool()
+        
+        def run_group(group: List[Tuple[int, BatchJob]]) -> List[BatchJobResult]:
+            document_path = group[0][1].document_path
+            # 只为加锁查找处理器，批处理不计入文档缓存的命中统计和 LRU 顺序
+            processor = self.document_cache.peek(document_path) if document_path else None
+            with processor.lock if processor is not None else nullcontext():
+                # 工作进程从磁盘读取文档，先落盘尚未保存的修改
+                if self.write_behind and document_path:
+                    self.write_behind.flush(document_path)
+                return pool.submit(run_batch_group, group).result()
+        
+        # 在线程中等待各组完成，文档锁在同一线程中获取和释放
+        with ThreadPoolExecutor(max_workers=min(len(groups), self._batch_worker_count())) as dispatcher:
+            futures = {dispatcher.submit(run_group, group): group for group in groups}
+            
+            for future in as_completed(futures):
+                group = futures[future]
+                try:
+                    group_results = future.result()
+                except Exception as e:
+                    self.logger.error(f"批处理任务失败: {e}")
+                    group_results = [
+                        BatchJobResult(
+                            job_index=job_index,
+                            success=False,
+                            message=f"处理失败: {str(e)}",
+                            source_path=job.document_path
+                        )
+                        for job_index, job in group
+                    ]
+                
+                for result in group_results:
+                    yield result
+    
+    def run_batch_group(self, jobs: List[Tuple[int, BatchJob]]) -> List[BatchJobResult]:
+        """执行同一文档的一组批处理任务（在批处理工作进程中调用）
+        
+        Args:
+            jobs: (任务序号, 任务) 列表，所有任务的 document_path 相同
+            
+        Returns:
+            各任务结果
+        """
+        document_path = jobs[0][1].document_path
+        group_start = time.perf_counter()
+        processor = WordProcessor(document_path)
+        
+        results = []
+        for job_index, job in jobs:
+            job_start = time.perf_counter()
+            performed = 0
+            failed_instructions = []
+            failed_operations = 0
+            
+            requests = [
+                ProcessRequest(instruction=instruction, document_path=document_path)
+                for instruction in job.instructions
+                if instruction.strip()
+            ]
+            if job.operations:
+                requests.append(ProcessRequest(
+                    instruction="", document_path=document_path, operations=job.operations
+                ))
+            
+            for request in requests:
+                try:
+                    valid_operations, op_results, _ = self._parse_and_execute(processor, request)
+                except Exception as e:
+                    self.logger.error(f"批处理指令失败: {e}")
+                    valid_operations, op_results = [], []
+                
+                succeeded = sum(1 for result in op_results if result)
+                if request.operations:
+                    failed_operations += len(request.operations) - succeeded
+                elif not valid_operations or not all(op_results):
+                    failed_instructions.append(request.instruction)
+                performed += succeeded
+            
+            results.append(BatchJobResult(
+                job_index=job_index,
+                success=not failed_instructions and not failed_operations,
+                message=f"成功执行 {performed} 个操作",
+                source_path=document_path,
+                operations_performed=performed,
+                failed_instructions=failed_instructions,
+                failed_operations=failed_operations,
+                elapsed_ms=round((time.perf_counter() - job_start) * 1000, 2)
+            ))
+        
+        # 整组只保存一次
+        output_path = self._generate_output_path(document_path, unique=True)
+        if processor.save_document(output_path):
+            for result in results:
+                result.document_path = output_path
+        else:
+            for result in results:
+                result.success = False
+                result.message = "文档保存失败"
+        
+        self.logger.info(
+            f"批处理文档完成: {document_path or output_path}, "
+            f"{len(jobs)} 个任务, 耗时 {(time.perf_counter() - group_start) * 1000:.0f}ms"
+        )
+        return results
+    
+    def _get_batch_pool(self) -> ProcessPoolExecutor:
+        """获取（必要时创建）批处理进程池
+        
+        Returns:
+            进程池
+        """
+        if self._batch_pool is None:
+            # 使用 spawn 启动，避免 fork 时复制其他线程持有的锁
+            self._batch_pool = ProcessPoolExecutor(
+                max_workers=self._batch_worker_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_batch_worker,
+                initargs=(self.config,)
             )
+        return self._batch_pool
+    
+    def _batch_worker_count(self) -> int:
+        """批处理工作进程数"""
+        return self.config.get('batch_workers') or os.cpu_count() or 1
     
-    def create_document(self, request: CreateDocumentRequest) -> ProcessResponse:
+    def flush(self, document_path: Optional[str] = None) -> int:
+        """立即保存延迟保存模式下尚未落盘的修改
+        
+        Args:
+            document_path: 只保存该文档（源路径或保存路径），为 None 时保存全部
+            
+        Returns:
+            保存的文档数
+        """
+        if not self.write_behind:
+            return 0
+        saved = self.write_behind.flush(document_path)
+        if saved:
+            self.logger.info(f"已保存 {saved} 个文档的延迟修改")
+        return saved
+    
+    def shutdown(self):
+        """释放后台资源：保存全部延迟修改，关闭批处理进程池"""
+        if self.write_behind:
+            self.write_behind.stop(flush=True)
+        if self._batch_pool is not None:
+            self._batch_pool.shutdown(wait=True)
+            self._batch_pool = None
+    
+    def create_document(self, request: CreateDocumentRequest,
+                        progress: Optional[ProgressCallback] = None) -> ProcessResponse:
         """创建新文档
         
         Args:
             request: 创建文档请求
+            progress: 进度回调，依次收到 started、operation、saved 阶段事件
             
         Returns:
             处理响应
         """
+        tracker = ProgressTracker(progress)
         try:
             self.logger.info(f"创建文档: {request.title}")
+            tracker.emit("started", title=request.title)
             
             # 创建新的文档处理器
             processor = WordProcessor(request.template_path)
             
             # 添加标题
             if request.title:
-                processor.add_heading(request.title, level=1)
+                success = processor.add_heading(request.title, level=1)
+                tracker.emit("operation", index=0, operation_type="add_heading", success=success)
             
             # 添加初始内容
             if request.initial_content:
-                processor.add_text(request.initial_content)
+                success = processor.add_text(request.initial_content)
+                tracker.emit("operation", index=1, operation_type="add_text", success=success)
             
             # 生成文档路径
             document_path = self._generate_document_path(request.title)
@@ -151,14 +636,16 @@ class WordAgent:
                     message="文档创建失败"
                 )
             
+            tracker.emit("saved", document_path=document_path)
+            
             # 缓存文档处理器
-            self.document_cache[document_path] = processor
+            self.document_cache.put(document_path, processor)
             
             return ProcessResponse(
                 success=True,
                 message="文档创建成功",
                 document_path=document_path,
-                preview_text=processor.get_document_text()[:500]
+                preview_text=processor.get_document_preview(500)
             )
             
         except Exception as e:
@@ -214,23 +701,48 @@ class WordAgent:
                 message=f"导出失败: {str(e)}"
             )
     
-    def get_document_preview(self, document_path: str) -> ProcessResponse:
+    def get_document_preview(
+        self,
+        document_path: str,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> ProcessResponse:
         """获取文档预览
         
         Args:
             document_path: 文档路径
+            offset: 起始段落序号
+            limit: 最多返回的段落数，为 None 时返回到文档末尾
             
         Returns:
-            处理响应
+            处理响应，preview_text 为窗口内的段落文本（以换行连接），有更多段落时带 next_cursor
         """
         try:
-            processor = self._get_or_create_processor(document_path)
-            preview_text = processor.get_document_text()
+            next_offset = None
+            processor = self.document_cache.get(document_path)
+            if processor is None and os.path.exists(document_path):
+                # 未打开的文档只读预览：流式读取正文，只解析到当前页为止，不构建 Document，也不放入缓存
+                with DocxReader(document_path) as reader:
+                    texts, next_offset = reader.read_paragraphs(offset, limit)
+                preview_text = "\n".join(texts)
+            else:
+                # 已缓存的处理器可能含有尚未落盘的修改，以内存中的文档为准
+                processor = processor or self._get_or_create_processor(document_path)
+                with processor.lock:
+                    if offset == 0 and limit is None:
+                        preview_text = processor.get_document_text()
+                    else:
+                        texts = processor.get_paragraph_texts()
+                        end = len(texts) if limit is None else offset + limit
+                        preview_text = "\n".join(texts[offset:end])
+                        if end < len(texts):
+                            next_offset = end
             
             return ProcessResponse(
                 success=True,
                 message="获取预览成功",
-                preview_text=preview_text
+                preview_text=preview_text,
+                next_cursor=encode_cursor(next_offset) if next_offset is not None else None
             )
             
         except Exception as e:
@@ -251,34 +763,38 @@ class WordAgent:
         """
         if document_path:
             # 检查缓存
-            if document_path in self.document_cache:
-                return self.document_cache[document_path]
+            processor = self.document_cache.get(document_path)
+            if processor is not None:
+                return processor
             
             # 创建新的处理器
             processor = WordProcessor(document_path)
-            self.document_cache[document_path] = processor
+            self.document_cache.put(document_path, processor)
             return processor
         else:
             # 创建新文档
             return WordProcessor()
     
-    def _generate_output_path(self, original_path: Optional[str] = None) -> str:
+    def _generate_output_path(self, original_path: Optional[str] = None, unique: bool = False) -> str:
         """生成输出文件路径
         
         Args:
             original_path: 原始文件路径
+            unique: 是否追加随机后缀，避免并发任务在同一秒内生成相同路径
             
         Returns:
             输出文件路径
         """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if unique:
+            timestamp = f"{timestamp}_{uuid.uuid4().hex[:8]}"
+        
         if original_path:
             # 基于原始文件生成新路径
             base_name = os.path.splitext(os.path.basename(original_path))[0]
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"{base_name}_{timestamp}.docx"
         else:
             # 生成新的文件名
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"document_{timestamp}.docx"
         
         return os.path.join(self.workspace, filename)
@@ -320,8 +836,53 @@ class WordAgent:
         
         return os.path.join(self.workspace, filename)
     
+    def _flush_evicted_processor(self, document_path: str, processor: WordProcessor):
+        """缓存淘汰回调：落盘尚未保存的修改
+        
+        Args:
+            document_path: 被淘汰的文档路径
+            processor: 被淘汰的文档处理器
+        """
+        if self.write_behind and self.write_behind.target_for(processor):
+            self.write_behind.flush_processor(processor)
+            return
+        
+        with processor.lock:
+            if not processor.dirty:
+                return
+            
+            output_path = self._generate_output_path(document_path)
+            if processor.save_document(output_path):
+                self.logger.info(f"淘汰缓存前已保存未保存的修改: {document_path} -> {output_path}")
+            else:
+                self.logger.error(f"淘汰缓存前保存文档失败: {document_path}")
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取文档缓存统计信息
+        
+        Returns:
+            统计信息字典
+        """
+        return self.document_cache.stats()
+    
+    def invalidate_parse_cache(self, instruction: Optional[str] = None, model: Optional[str] = None) -> int:
+        """失效指令解析缓存
+        
+        Args:
+            instruction: 只失效该指令的条目，为 None 时不限
+            model: 只失效该模型的条目，为 None 时不限
+            
+        Returns:
+            删除的条目数
+        """
+        if not self.parse_cache:
+            return 0
+        removed = self.parse_cache.invalidate(instruction=instruction, model=model)
+        self.logger.info(f"解析缓存已失效 {removed} 条")
+        return removed
+    
     def clear_cache(self):
-        """清理文档缓存"""
+        """清理文档缓存（未保存的修改会先落盘）"""
         self.document_cache.clear()
         self.logger.info("文档缓存已清理")
     
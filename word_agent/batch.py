@@ -0,0 +1,69 @@
+"""
+批处理工作进程
+
+进程池中的每个工作进程持有一个独立的 WordAgent，按文档分组执行批处理任务，
+同一文档在一次批处理中只加载和保存一次。
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from api.models import BatchJob, BatchJobResult
+
+# 工作进程内的 WordAgent 实例，由进程池 initializer 创建
+_worker_agent = None
+
+
+def init_batch_worker(config: Dict[str, Any]):
+    """进程池初始化函数：在工作进程中创建 WordAgent
+
+    Args:
+        config: 配置字典
+    """
+    global _worker_agent
+    from word_agent.agent_engine import WordAgent
+
+    _worker_agent = WordAgent(config)
+
+
+def run_batch_group(jobs: List[Tuple[int, BatchJob]]) -> List[BatchJobResult]:
+    """在工作进程中执行同一文档的一组任务
+
+    Args:
+        jobs: (任务序号, 任务) 列表，所有任务的 document_path 相同
+
+    Returns:
+        各任务结果
+    """
+    if _worker_agent is None:
+        raise RuntimeError("批处理工作进程未初始化")
+    return _worker_agent.run_batch_group(jobs)
+
+
+def group_batch_jobs(jobs: List[BatchJob]) -> List[List[Tuple[int, BatchJob]]]:
+    """按文档路径对任务分组，保持组内任务的原始顺序
+
+    未指定文档路径的任务各自创建新文档，不参与合并。
+
+    Args:
+        jobs: 任务列表
+
+    Returns:
+        分组后的 (任务序号, 任务) 列表
+    """
+    groups: List[List[Tuple[int, BatchJob]]] = []
+    group_by_path: Dict[str, List[Tuple[int, BatchJob]]] = {}
+
+    for job_index, job in enumerate(jobs):
+        path: Optional[str] = job.document_path
+        if not path:
+            groups.append([(job_index, job)])
+            continue
+
+        group = group_by_path.get(path)
+        if group is None:
+            group = []
+            group_by_path[path] = group
+            groups.append(group)
+        group.append((job_index, job))
+
+    return groups
@@ -1,52 +1,368 @@
 import json
 import re
-from typing import List, Dict, Any, Optional
-from ai.openai_api import OpenAIAPI
-from ai.prompt_templates import INSTRUCTION_PARSE_PROMPT
+import threading
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
+from ai.context_builder import ContextBuilder
+from ai.openai_api import LLMTimeoutError, OpenAIAPI
+from ai.prompt_builder import PromptBuilder, default_prompt_builder
 from api.models import WordOperation, OperationType, TextStyle, TableData
+from word_agent.intent_parser import IntentParser
+from word_agent.operation_dsl import OperationDslStream, decode_operations
+from word_agent.parse_cache import ParseCache
+from utils.deadline import Deadline
+from utils.json_stream import JsonArrayStream
+
+
+class OperationStream:
+    """流式解析出的操作序列
+    
+    迭代时逐个产出操作。来自模型的结果边生成边产出（streaming 为 True），
+    迭代结束后 operations 为已产出的全部操作；流式解析失败时 error 记录原因，
+    source 变为 fallback，fallback 为回退解析出的操作（已产出的操作应当回滚）；
+    因请求截止时间被取消时 timed_out 为 True，已产出操作的 source 变为 partial，
+    调用方保留这部分结果，fallback 只在没有产出任何操作时使用。
+    """
+    
+    def __init__(self, source: str, operations: Optional[List[WordOperation]] = None):
+        """初始化
+        
+        Args:
+            source: 结果来源，local / cache / llm / fallback / partial
+            operations: 完整的操作列表，为 None 时表示以流式方式产出
+        """
+        self.source = source
+        self.streaming = operations is None
+        self.operations: List[WordOperation] = list(operations or [])
+        self.error: Optional[Exception] = None
+        self.fallback: List[WordOperation] = []
+        self.timed_out = False
+        # 模型返回的 token 用量，流式响应结束后才有
+        self.usage: Dict[str, int] = {}
+        self._iterator: Optional[Iterator[WordOperation]] = None
+    
+    def __iter__(self) -> Iterator[WordOperation]:
+        if not self.streaming:
+            return iter(self.operations)
+        return self._iterator
 
 
 class CommandParser:
     """指令解析器"""
     
-    def __init__(self, openai_api: OpenAIAPI):
+    def __init__(self, openai_api: OpenAIAPI, parse_cache: Optional[ParseCache] = None,
+                 intent_parser: Optional[IntentParser] = None, local_threshold: float = 0.85,
+                 context_builder: Optional[ContextBuilder] = None, output_format: str = "dsl",
+                 prompt_builder: Optional[PromptBuilder] = None):
         """初始化指令解析器
         
         Args:
             openai_api: OpenAI API 实例
+            parse_cache: 解析结果缓存，为 None 时每次都调用模型
+            intent_parser: 本地意图解析器，为 None 时所有指令都交给模型
+            local_threshold: 本地解析置信度阈值，达到阈值时跳过模型调用
+            context_builder: 提示词上下文构建器，为 None 时使用默认 token 预算
+            output_format: 要求模型输出的格式，dsl 为紧凑的按行格式（见 operation_dsl），
+                json 为 JSON 数组；两种格式的响应都能解析
+            prompt_builder: 对话消息组装器，为 None 时使用进程内共享的组装器
         """
         self.openai_api = openai_api
+        self.parse_cache = parse_cache
+        self.intent_parser = intent_parser
+        self.local_threshold = local_threshold
+        self.context_builder = context_builder or ContextBuilder()
+        if output_format not in ("dsl", "json"):
+            raise ValueError(f"不支持的输出格式: {output_format}")
+        self.output_format = output_format
+        self.prompt_builder = prompt_builder or default_prompt_builder
+        
+        self._stats_lock = threading.Lock()
+        self._source_counts = {"local": 0, "cache": 0, "llm": 0, "fallback": 0, "partial": 0}
     
-    def parse_instruction(self, instruction: str, document_content: str = "") -> List[WordOperation]:
+    def parse_instruction(self, instruction: str, document_content: str = "",
+                          paragraphs: Optional[List[str]] = None) -> List[WordOperation]:
         """解析自然语言指令
         
         Args:
             instruction: 自然语言指令
             document_content: 当前文档内容
+            paragraphs: 当前文档的段落文本列表，提供时不再从 document_content 拆分
             
         Returns:
             解析后的操作列表
         """
+        operations, _ = self.parse_instruction_with_source(instruction, document_content, paragraphs)
+        return operations
+    
+    def parse_instruction_with_source(self, instruction: str, document_content: str = "",
+                                      paragraphs: Optional[List[str]] = None,
+                                      on_usage: Optional[Callable[[Dict[str, int]], None]] = None,
+                                      model: Optional[str] = None,
+                                      deadline: Optional[Deadline] = None) -> Tuple[List[WordOperation], str]:
+        """解析自然语言指令，并返回结果来源
+        
+        依次尝试本地意图解析、解析缓存和模型，模型调用失败或超过截止时间时回退到关键词解析。
+        发送给模型的文档内容由上下文构建器在 token 预算内按与指令的相关度挑选。
+        
+        Args:
+            instruction: 自然语言指令
+            document_content: 当前文档内容
+            paragraphs: 当前文档的段落文本列表，提供时不再从 document_content 拆分
+            on_usage: 调用模型时的 token 用量回调
+            model: 本次使用的模型，为 None 时使用 openai_api 的默认模型
+            deadline: 请求截止时间，剩余时间作为模型调用的总超时；超时的调用被取消，并在 deadline 上记录
+            
+        Returns:
+            (操作列表, 来源)，来源为 local / cache / llm / fallback
+        """
+        local_result = None
+        if self.intent_parser:
+            local_result = self.intent_parser.parse(instruction)
+            if local_result.operations and local_result.confidence >= self.local_threshold:
+                return self._count(local_result.operations, "local")
+        
         try:
-            # 使用AI解析指令
-            prompt = INSTRUCTION_PARSE_PROMPT.format(
-                instruction=instruction,
-                document_content=document_content[:1000]  # 限制长度
+            messages, cache_key, model, cached_operations = self._prepare_llm_request(
+                instruction, document_content, paragraphs, model
             )
+            if cached_operations is not None:
+                return self._count(cached_operations, "cache")
             
             response = self.openai_api.chat_completion(
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
+                messages=messages,
+                temperature=0.3,
+                on_usage=on_usage,
+                model=model,
+                **self._deadline_kwargs(deadline)
             )
             
             # 解析响应
             operations = self._parse_ai_response(response)
-            return operations
             
+            # 只缓存模型成功解析出的结果
+            if cache_key and operations:
+                self.parse_cache.put(cache_key, operations, instruction=instruction, model=model)
+            
+            return self._count(operations, "llm")
+            
+        except Exception as e:
+            print(f"解析指令失败: {e}")
+            if isinstance(e, LLMTimeoutError) and deadline is not None:
+                deadline.mark_exceeded()
+            return self._count(self._fallback_operations(instruction, local_result), "fallback")
+    
+    def stream_instruction(self, instruction: str, document_content: str = "",
+                           paragraphs: Optional[List[str]] = None,
+                           model: Optional[str] = None,
+                           deadline: Optional[Deadline] = None) -> "OperationStream":
+        """流式解析自然语言指令
+        
+        本地解析和缓存命中时直接给出完整结果；需要调用模型时以流式方式请求，
+        模型输出的 JSON 数组中每个操作一闭合就产出，调用方可以边生成边执行。
+        模型接口不支持流式输出时等同于 parse_instruction_with_source。
+        
+        Args:
+            instruction: 自然语言指令
+            document_content: 当前文档内容
+            paragraphs: 当前文档的段落文本列表，提供时不再从 document_content 拆分
+            model: 本次使用的模型，为 None 时使用 openai_api 的默认模型
+            deadline: 请求截止时间，超过时取消模型调用，操作流的 timed_out 置为 True
+            
+        Returns:
+            操作流
+        """
+        stream_completion = getattr(self.openai_api, 'stream_chat_completion', None)
+        if stream_completion is None:
+            return self._complete_stream(self.parse_instruction_with_source(
+                instruction, document_content, paragraphs, model=model, deadline=deadline
+            ))
+        
+        local_result = None
+        if self.intent_parser:
+            local_result = self.intent_parser.parse(instruction)
+            if local_result.operations and local_result.confidence >= self.local_threshold:
+                return self._complete_stream(self._count(local_result.operations, "local"))
+        
+        try:
+            messages, cache_key, model, cached_operations = self._prepare_llm_request(
+                instruction, document_content, paragraphs, model
+            )
         except Exception as e:
             print(f"解析指令失败: {e}")
-            # 回退到简单的关键词解析
-            return self._simple_keyword_parse(instruction)
+            return self._complete_stream(
+                self._count(self._fallback_operations(instruction, local_result), "fallback")
+            )
+        if cached_operations is not None:
+            return self._complete_stream(self._count(cached_operations, "cache"))
+        
+        stream = OperationStream("llm")
+        stream._iterator = self._iter_llm_operations(
+            stream,
+            lambda: stream_completion(
+                messages=messages, temperature=0.3, on_usage=stream.usage.update, model=model,
+                **self._deadline_kwargs(deadline)
+            ),
+            instruction, cache_key, model, local_result, deadline
+        )
+        return stream
+    
+    @staticmethod
+    def _complete_stream(result: Tuple[List[WordOperation], str]) -> "OperationStream":
+        """由 (操作列表, 来源) 构建已完整的操作流（OperationStream 的参数顺序是来源在前）"""
+        operations, source = result
+        return OperationStream(source, operations)
+    
+    def _iter_llm_operations(self, stream: "OperationStream", start_completion, instruction: str,
+                             cache_key: Optional[str], model: str, local_result,
+                             deadline: Optional[Deadline] = None) -> Iterator[WordOperation]:
+        """读取流式响应并逐个产出操作
+        
+        按紧凑格式或 JSON 数组增量解析；都解析不出操作时（例如数组被包在其他结构中），结束后按完整响应解析。
+        出错时不再产出操作，在 stream 上记录错误和回退结果。
+        """
+        parser = JsonArrayStream()
+        # 紧凑格式解码器；发现模型输出的是 JSON 时改用 JSON 数组解析
+        decoder = OperationDslStream() if self.output_format == "dsl" else None
+        chunks = None
+        text = []
+        try:
+            chunks = start_completion()
+            for chunk in chunks:
+                text.append(chunk)
+                if decoder is not None:
+                    items = decoder.feed(chunk)
+                    if decoder.is_json:
+                        decoder = None
+                        items = parser.feed("".join(text))
+                else:
+                    items = parser.feed(chunk)
+                for item in items:
+                    operation = self._create_operation_from_dict(item) if isinstance(item, dict) else None
+                    if operation:
+                        stream.operations.append(operation)
+                        yield operation
+                if parser.closed:
+                    # 数组之后的说明文字不需要等待
+                    break
+            
+            if decoder is not None:
+                items = decoder.finish()
+                if decoder.is_json:
+                    decoder = None
+                    items = parser.feed("".join(text))
+                for item in items:
+                    operation = self._create_operation_from_dict(item) if isinstance(item, dict) else None
+                    if operation:
+                        stream.operations.append(operation)
+                        yield operation
+            
+            if decoder is not None:
+                decoded = decoder.count > 0
+            else:
+                decoded = parser.count > 0 or parser.closed
+                if decoded:
+                    parser.finish()
+            
+            if not decoded:
+                # 没有按预期格式解析出任何操作，按完整响应再解析一次
+                for operation in self._parse_ai_response("".join(text)):
+                    stream.operations.append(operation)
+                    yield operation
+        except Exception as e:
+            print(f"流式解析指令失败: {e}")
+            stream.error = e
+            if isinstance(e, LLMTimeoutError):
+                # 超时前最后一个操作行已经完整，只是还没等到下一行，先产出再记录超时
+                for item in decoder.take_pending() if decoder is not None else []:
+                    operation = self._create_operation_from_dict(item) if isinstance(item, dict) else None
+                    if operation:
+                        stream.operations.append(operation)
+                        yield operation
+                stream.timed_out = True
+                if deadline is not None:
+                    deadline.mark_exceeded()
+            if stream.timed_out and stream.operations:
+                # 调用方保留超时前产出的操作，不需要回退解析
+                stream.source = "partial"
+                self._count(stream.operations, "partial")
+            else:
+                stream.fallback = self._fallback_operations(instruction, local_result)
+                stream.source = "fallback"
+                self._count(stream.fallback, "fallback")
+            return
+        finally:
+            if chunks is not None and hasattr(chunks, 'close'):
+                chunks.close()
+        
+        if cache_key and stream.operations:
+            self.parse_cache.put(cache_key, stream.operations, instruction=instruction, model=model)
+        self._count(stream.operations, "llm")
+    
+    def _prepare_llm_request(self, instruction: str, document_content: str,
+                             paragraphs: Optional[List[str]], model: Optional[str] = None
+                             ) -> Tuple[List[Dict[str, str]], Optional[str], str, Optional[List[WordOperation]]]:
+        """挑选上下文、查询缓存并组装对话消息
+        
+        Returns:
+            (消息列表, 缓存键, 模型名称, 缓存的操作列表)，未命中缓存时最后一项为 None
+        """
+        if paragraphs is None:
+            paragraphs = document_content.split("\n") if document_content else []
+        content_window = self.context_builder.build(paragraphs, instruction).text
+        
+        # 命中缓存时直接返回，跳过模型调用
+        cache_key = None
+        model = model or getattr(self.openai_api, 'model', '')
+        if self.parse_cache:
+            cache_key = self.parse_cache.make_key(instruction, content_window, model)
+            cached_operations = self.parse_cache.get(cache_key)
+            if cached_operations is not None:
+                return [], cache_key, model, cached_operations
+        
+        # 使用AI解析指令：静态说明在前，文档内容和指令在后
+        messages = self.prompt_builder.instruction_messages(instruction, content_window, self.output_format)
+        return messages, cache_key, model, None
+    
+    def _deadline_kwargs(self, deadline: Optional[Deadline]) -> Dict[str, Any]:
+        """把请求截止时间的剩余时间转换为模型调用参数
+        
+        Raises:
+            LLMTimeoutError: 已经到了截止时间，不再发起调用
+        """
+        if deadline is None:
+            return {}
+        remaining = deadline.remaining()
+        if remaining is None:
+            return {}
+        if remaining <= 0:
+            raise LLMTimeoutError("请求已到截止时间，跳过模型调用")
+        return {"total_timeout": remaining}
+    
+    def _fallback_operations(self, instruction: str, local_result) -> List[WordOperation]:
+        """模型调用失败时的回退：优先使用本地解析结果，其次是简单的关键词解析"""
+        if local_result and local_result.operations:
+            return local_result.operations
+        return self._simple_keyword_parse(instruction)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取各解析来源的次数
+        
+        Returns:
+            统计信息字典
+        """
+        with self._stats_lock:
+            counts = dict(self._source_counts)
+        total = sum(counts.values())
+        return {
+            **counts,
+            "local_threshold": self.local_threshold,
+            "local_rate": counts["local"] / total if total else 0.0
+        }
+    
+    def _count(self, operations: List[WordOperation], source: str) -> Tuple[List[WordOperation], str]:
+        """记录解析来源"""
+        with self._stats_lock:
+            self._source_counts[source] += 1
+        return operations, source
     
     def _parse_ai_response(self, response: str) -> List[WordOperation]:
         """解析AI响应
@@ -59,6 +375,15 @@ class CommandParser:
         """
         operations = []
         
+        # 紧凑格式：响应不是 JSON 且解码出了操作时直接使用，否则按 JSON 解析
+        if self.output_format == "dsl":
+            for item in decode_operations(response):
+                operation = self._create_operation_from_dict(item)
+                if operation:
+                    operations.append(operation)
+            if operations:
+                return operations
+        
         try:
             # 提取JSON内容
             json_match = re.search(r'```json\s*(\[.*?\])\s*```', response, re.DOTALL)
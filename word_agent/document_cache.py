@@ -0,0 +1,254 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+
+from document.word_processor import WordProcessor
+
+
+class DocumentCache:
+    """文档处理器 LRU 缓存
+
+    同时受条目数量和估算内存字节数两个上限约束，超出任一上限时
+    按最近最少使用顺序淘汰。淘汰前会调用 on_evict 回调，便于调用方
+    落盘尚未保存的修改。同一处理器需要以多个路径访问时，用 alias 登记
+    额外的路径，处理器只占一个条目，内存只计算一次。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 100,
+        max_bytes: int = 512 * 1024 * 1024,
+        on_evict: Optional[Callable[[str, WordProcessor], None]] = None
+    ):
+        """初始化文档缓存
+
+        Args:
+            max_entries: 最大缓存条目数，0 表示不缓存
+            max_bytes: 估算内存上限（字节），0 表示不限制
+            on_evict: 条目被淘汰前的回调，参数为 (文档路径, 处理器)
+        """
+        self.max_entries = max(0, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self.on_evict = on_evict
+
+        self._entries: "OrderedDict[str, Tuple[WordProcessor, int]]" = OrderedDict()
+        # 别名路径 -> 条目路径
+        self._aliases: Dict[str, str] = {}
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+
+        # 统计计数器
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[WordProcessor]:
+        """获取缓存的处理器，并将其标记为最近使用
+
+        Args:
+            key: 文档路径
+
+        Returns:
+            处理器，未命中时返回 None
+        """
+        with self._lock:
+            key = self._aliases.get(key, key)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, key: str) -> Optional[WordProcessor]:
+        """获取缓存的处理器，不计入命中统计，也不改变 LRU 顺序
+
+        Args:
+            key: 文档路径
+
+        Returns:
+            处理器，未缓存时返回 None
+        """
+        with self._lock:
+            entry = self._entries.get(self._aliases.get(key, key))
+            return entry[0] if entry is not None else None
+
+    def put(self, key: str, processor: WordProcessor):
+        """放入或更新缓存条目
+
+        已存在的条目会重新估算内存大小，适合在文档修改后调用；key 为别名时更新其指向的条目。
+
+        Args:
+            key: 文档路径
+            processor: 文档处理器
+        """
+        if self.max_entries == 0:
+            return
+
+        size = processor.estimate_memory_size()
+
+        with self._lock:
+            key = self._aliases.get(key, key)
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self._total_bytes -= old_entry[1]
+
+            self._entries[key] = (processor, size)
+            self._total_bytes += size
+            evicted = self._collect_evictions(protected_key=key)
+
+        self._notify_evicted(evicted)
+
+    def alias(self, alias_key: str, key: str):
+        """登记别名，以 alias_key 访问 key 的条目
+
+        alias_key 原本是另一个条目时，该条目被移除：处理器与 key 的相同则直接移除，
+        否则经过淘汰回调。
+
+        Args:
+            alias_key: 别名路径
+            key: 已缓存的文档路径
+        """
+        evicted = []
+        with self._lock:
+            key = self._aliases.get(key, key)
+            if alias_key == key:
+                return
+            target = self._entries.get(key)
+            if target is None:
+                return
+            entry = self._entries.pop(alias_key, None)
+            if entry is not None:
+                self._total_bytes -= entry[1]
+                self._drop_aliases(alias_key)
+                if entry[0] is not target[0]:
+                    self.evictions += 1
+                    evicted.append((alias_key, entry[0]))
+            self._aliases[alias_key] = key
+
+        self._notify_evicted(evicted)
+
+    def pop(self, key: str) -> Optional[WordProcessor]:
+        """移除缓存条目（不触发淘汰回调）
+
+        key 为别名时只移除别名。
+
+        Args:
+            key: 文档路径
+
+        Returns:
+            被移除的处理器
+        """
+        with self._lock:
+            if key in self._aliases:
+                entry = self._entries.get(self._aliases.pop(key))
+                return entry[0] if entry else None
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self._total_bytes -= entry[1]
+            self._drop_aliases(key)
+            return entry[0]
+
+    def clear(self):
+        """清空缓存，每个条目都会经过淘汰回调"""
+        with self._lock:
+            evicted = list(self._entries.items())
+            self._entries.clear()
+            self._aliases.clear()
+            self._total_bytes = 0
+            self.evictions += len(evicted)
+
+        self._notify_evicted([(key, entry[0]) for key, entry in evicted])
+
+    def items(self) -> List[Tuple[str, WordProcessor]]:
+        """获取当前缓存条目的快照
+
+        Returns:
+            (文档路径, 处理器) 列表，按最近最少使用到最近使用排序
+        """
+        with self._lock:
+            return [(key, entry[0]) for key, entry in self._entries.items()]
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息
+
+        Returns:
+            统计信息字典
+        """
+        with self._lock:
+            total_lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "aliases": len(self._aliases),
+                "max_entries": self.max_entries,
+                "estimated_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total_lookups, 4) if total_lookups else 0.0
+            }
+
+    def _collect_evictions(self, protected_key: Optional[str] = None) -> List[Tuple[str, WordProcessor]]:
+        """按 LRU 顺序摘除超限条目（需持有锁）
+
+        Args:
+            protected_key: 不参与淘汰的条目（刚放入的文档）
+
+        Returns:
+            被摘除的 (文档路径, 处理器) 列表
+        """
+        evicted = []
+        while self._over_limit():
+            victim_key = next(iter(self._entries))
+            if victim_key == protected_key:
+                # 单个文档本身超出字节预算时仍保留它，只淘汰其他条目
+                if len(self._entries) == 1:
+                    break
+                self._entries.move_to_end(victim_key)
+                continue
+
+            processor, size = self._entries.pop(victim_key)
+            self._total_bytes -= size
+            self._drop_aliases(victim_key)
+            self.evictions += 1
+            evicted.append((victim_key, processor))
+        return evicted
+
+    def _drop_aliases(self, key: str):
+        """删除指向 key 的别名（需持有锁）"""
+        for alias_key in [alias_key for alias_key, target in self._aliases.items() if target == key]:
+            del self._aliases[alias_key]
+
+    def _over_limit(self) -> bool:
+        """判断是否超出数量或字节上限"""
+        if len(self._entries) > self.max_entries:
+            return True
+        if self.max_bytes and self._total_bytes > self.max_bytes:
+            return True
+        return False
+
+    def _notify_evicted(self, evicted: List[Tuple[str, WordProcessor]]):
+        """在锁外调用淘汰回调，避免落盘时阻塞其他请求"""
+        if not self.on_evict:
+            return
+        for key, processor in evicted:
+            try:
+                self.on_evict(key, processor)
+            except Exception as e:
+                print(f"缓存淘汰回调失败: {e}")
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries or key in self._aliases
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries.keys()))
@@ -0,0 +1,122 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class DocumentExecutor:
+    """文档任务执行器
+
+    将阻塞的文档处理（python-docx 读写、LLM 调用等）放到有界线程池中执行，
+    避免阻塞事件循环。同一文档路径上的任务通过按文档划分的异步锁串行执行，
+    不同文档之间的任务可以并行。
+    """
+
+    def __init__(self, max_workers: int = 8):
+        """初始化执行器
+
+        Args:
+            max_workers: 线程池大小
+        """
+        self.max_workers = max(1, int(max_workers))
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="word-agent-worker"
+        )
+
+        # 文档路径 -> [异步锁, 引用计数]，引用计数归零时释放锁对象
+        self._locks: Dict[str, list] = {}
+        self._stats_lock = threading.Lock()
+        self._running = 0
+        self._waiting = 0
+        self._completed = 0
+        self._failed = 0
+
+    async def run(self, document_path: Optional[str], func: Callable[..., Any], *args, **kwargs) -> Any:
+        """在线程池中执行任务
+
+        Args:
+            document_path: 任务涉及的文档路径，为 None 时不加文档锁
+            func: 阻塞函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            函数返回值
+        """
+        if not document_path:
+            return await self._submit(func, *args, **kwargs)
+
+        key = self._normalize_key(document_path)
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = [asyncio.Lock(), 0]
+            self._locks[key] = entry
+        entry[1] += 1
+
+        try:
+            async with entry[0]:
+                return await self._submit(func, *args, **kwargs)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._locks.pop(key, None)
+
+    async def _submit(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """提交任务到线程池并等待结果"""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self._call, func, *args, **kwargs)
+
+        with self._stats_lock:
+            self._waiting += 1
+        return await loop.run_in_executor(self._pool, call)
+
+    def _call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """在工作线程中执行函数并记录统计信息"""
+        with self._stats_lock:
+            self._waiting -= 1
+            self._running += 1
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            with self._stats_lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._stats_lock:
+                self._running -= 1
+
+        with self._stats_lock:
+            self._completed += 1
+        return result
+
+    def _normalize_key(self, document_path: str) -> str:
+        """规范化文档路径，确保同一文件映射到同一把锁"""
+        return os.path.normcase(os.path.abspath(document_path))
+
+    def stats(self) -> Dict[str, Any]:
+        """获取执行器统计信息
+
+        Returns:
+            统计信息字典
+        """
+        with self._stats_lock:
+            return {
+                "max_workers": self.max_workers,
+                "running": self._running,
+                "queued": self._waiting,
+                "completed": self._completed,
+                "failed": self._failed,
+                "locked_documents": len(self._locks)
+            }
+
+    def shutdown(self, wait: bool = True):
+        """关闭线程池
+
+        Args:
+            wait: 是否等待正在执行的任务完成
+        """
+        self._pool.shutdown(wait=wait)
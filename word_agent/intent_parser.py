@@ -0,0 +1,454 @@
+"""
+本地意图解析器
+
+基于关键词前缀树和正则槽位抽取，将简单指令（添加标题、插入文本、删除、修改、
+N行M列表格、列表等）直接解析为操作，并给出置信度。置信度足够高时可以跳过模型调用。
+"""
+
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from api.models import WordOperation, OperationType, TableData
+
+# 关键词类别
+ACTION_ADD = "action:add"
+ACTION_DELETE = "action:delete"
+ACTION_MODIFY = "action:modify"
+OBJECT_HEADING = "object:heading"
+OBJECT_TABLE = "object:table"
+OBJECT_LIST = "object:list"
+OBJECT_TEXT = "object:text"
+STYLE = "style"
+GENERATIVE = "generative"
+CONNECTIVE = "connective"
+RELATIVE = "relative"
+
+INTENT_KEYWORDS: Dict[str, List[str]] = {
+    ACTION_ADD: ["添加", "加入", "插入", "增加", "新增", "写入", "追加", "加上"],
+    ACTION_DELETE: ["删除", "删掉", "移除", "去掉", "去除"],
+    ACTION_MODIFY: ["改成", "改为", "修改为", "替换为", "替换成", "换成", "更改为", "变成"],
+    OBJECT_HEADING: ["标题", "题目", "章节"],
+    OBJECT_TABLE: ["表格", "列表格"],  # "三列表格" 不应识别为列表
+    OBJECT_LIST: ["列表", "清单"],
+    OBJECT_TEXT: ["段落", "文字", "文本", "内容", "一段", "一句"],
+    # 本地解析器不抽取样式，出现时交给模型处理
+    STYLE: ["加粗", "粗体", "斜体", "下划线", "字体", "字号", "颜色", "红色", "蓝色", "居中", "格式", "样式"],
+    # 需要模型生成内容的指令
+    GENERATIVE: ["关于", "介绍", "总结", "概括", "描述", "撰写", "生成", "扩写", "润色", "翻译", "续写", "改写", "优化"],
+    CONNECTIVE: ["然后", "并且", "同时", "之后再", "接着", "以及"],
+    RELATIVE: ["上面", "下面", "上一", "下一", "这段", "该段", "前面", "后面", "所有", "全部", "每个"],
+}
+
+# 引号内容：中文双引号、中文单引号、直角引号、英文引号
+QUOTE_PATTERN = re.compile(r'“([^”]+)”|‘([^’]+)’|「([^」]+)」|"([^"]+)"|\'([^\']+)\'')
+
+CN_DIGITS = {"零": 0, "一": 1, "二": 2, "两": 2, "三": 3, "四": 4, "五": 5,
+             "六": 6, "七": 7, "八": 8, "九": 9}
+NUMBER = r"(\d+|[零一二两三四五六七八九十]+)"
+
+POSITION_PATTERNS: List[Tuple[re.Pattern, Any]] = [
+    (re.compile(r"(?:在)?(?:文档)?(?:的)?(?:开头|最前面|开始处|最前)(?:处)?"), "beginning"),
+    (re.compile(rf"(?:在)?第\s*{NUMBER}\s*段(?:落)?(?:的)?(?:后面|之后|后)"), "after"),
+    (re.compile(r"(?:在)?(?:文档)?(?:的)?(?:末尾|结尾|最后面|最后)(?:处)?"), "end"),
+]
+
+HEADING_LEVEL_PATTERN = re.compile(rf"{NUMBER}\s*级(?:标题)?|[hH]([1-9])")
+ORDINAL_PATTERN = re.compile(rf"第\s*{NUMBER}\s*(?:段|行|页|章|节|句|个)")
+ROWS_PATTERN = re.compile(rf"{NUMBER}\s*行")
+COLS_PATTERN = re.compile(rf"{NUMBER}\s*列")
+TABLE_SIZE_PATTERN = re.compile(r"(\d+)\s*[xX×*]\s*(\d+)")
+TABLE_HEADERS_PATTERN = re.compile(r"(?:表头|列名)\s*(?:为|是|包括|包含)?\s*[:：]?\s*(.+?)(?:[。；;]|$)")
+# 只给出列数时表格的数据行数（不含表头）
+DEFAULT_TABLE_DATA_ROWS = 2
+ITEM_SEPARATORS = re.compile(r"[、，,；;/]")
+MODIFY_PATTERN = re.compile(
+    r"(?:把|将)?\s*(.+?)\s*(?:改成|改为|修改为|替换为|替换成|换成|更改为|变成)\s*(.+)"
+)
+# 内容前的引导语，例如 "添加一段文字：" "标题为" "内容是"
+CONTENT_LEAD = re.compile(
+    r"^(?:一个|一段|一句|一条|一行|一级|二级|三级|[一二三四五六七八九\d]级)?\s*"
+    r"(?:标题|题目|章节|段落|文字|文本|内容|列表|清单|话)?\s*(?:为|是|叫|叫做)?\s*[:：]?\s*"
+)
+
+
+class KeywordTrie:
+    """关键词前缀树
+
+    一次扫描找出文本中所有关键词（同一位置取最长匹配），用于意图识别。
+    """
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+        self._size = 0
+
+    def add(self, keyword: str, category: str):
+        """添加关键词
+
+        Args:
+            keyword: 关键词
+            category: 关键词类别
+        """
+        node = self._root
+        for char in keyword:
+            node = node.setdefault(char, {})
+        if "$" not in node:
+            self._size += 1
+        node["$"] = category
+
+    def scan(self, text: str) -> Iterator[Tuple[int, int, str, str]]:
+        """扫描文本中的关键词
+
+        Args:
+            text: 文本
+
+        Yields:
+            (起始位置, 结束位置, 关键词, 类别)，匹配之间不重叠
+        """
+        i = 0
+        length = len(text)
+        while i < length:
+            node = self._root
+            match_end = -1
+            category = None
+            j = i
+            while j < length and text[j] in node:
+                node = node[text[j]]
+                j += 1
+                if "$" in node:
+                    match_end = j
+                    category = node["$"]
+            if match_end > 0:
+                yield i, match_end, text[i:match_end], category
+                i = match_end
+            else:
+                i += 1
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class IntentParseResult:
+    """本地解析结果"""
+
+    def __init__(self, operations: List[WordOperation], confidence: float,
+                 intent: Optional[str] = None, reasons: Optional[List[str]] = None):
+        self.operations = operations
+        self.confidence = confidence
+        self.intent = intent
+        self.reasons = reasons or []
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            "intent": self.intent,
+            "confidence": self.confidence,
+            "reasons": self.reasons,
+            "operations": [op.model_dump(mode="json", exclude_none=True) for op in self.operations]
+        }
+
+
+class IntentParser:
+    """基于规则的意图解析器"""
+
+    def __init__(self, keywords: Optional[Dict[str, List[str]]] = None):
+        """初始化
+
+        Args:
+            keywords: 类别 -> 关键词列表，为 None 时使用内置词表
+        """
+        self.trie = KeywordTrie()
+        for category, words in (keywords or INTENT_KEYWORDS).items():
+            for word in words:
+                self.trie.add(word, category)
+
+    def parse(self, instruction: str) -> IntentParseResult:
+        """解析指令
+
+        Args:
+            instruction: 自然语言指令
+
+        Returns:
+            解析结果，无法识别时置信度为 0
+        """
+        text = instruction.strip()
+        if not text:
+            return IntentParseResult([], 0.0, reasons=["空指令"])
+
+        quotes = [next(g for g in m.groups() if g is not None) for m in QUOTE_PATTERN.finditer(text)]
+        # 引号内的内容不参与意图识别
+        masked = QUOTE_PATTERN.sub(lambda m: "\u0000" * len(m.group(0)), text)
+        position, span = self._extract_position(masked)
+        if span:
+            text = text[:span[0]] + text[span[1]:]
+            masked = masked[:span[0]] + masked[span[1]:]
+
+        found = self._scan(masked)
+        intent = self._resolve_intent(found)
+        if intent is None:
+            return IntentParseResult([], 0.0, reasons=["未识别到意图"])
+
+        builder = getattr(self, f"_build_{intent}")
+        operation, slot_score, reasons = builder(text, masked, found, quotes)
+        if operation is None:
+            return IntentParseResult([], 0.0, intent=intent, reasons=reasons)
+        if intent == "add_text":
+            operation.position = position or "end"
+        elif position is not None and (intent in ("delete_text", "modify_text") or position != "end"):
+            reasons.append("不支持的位置描述")
+            slot_score -= 0.5
+
+        confidence = 0.5 + slot_score
+        if found.get(ACTION_ADD) or found.get(ACTION_DELETE) or found.get(ACTION_MODIFY):
+            confidence += 0.3
+        # 追加的段落和标题内容是原文，其中的“第一章”“第三节”不是对文档位置的引用
+        content_start = None
+        if intent in ("add_text", "add_heading") and operation.content:
+            position_in_text = masked.rfind(operation.content)
+            if position_in_text > 0:
+                content_start = position_in_text
+        confidence -= self._penalty(masked, found, intent, reasons, content_start)
+        confidence = round(min(1.0, max(0.0, confidence)), 2)
+        return IntentParseResult([operation], confidence, intent=intent, reasons=reasons)
+
+    def _scan(self, masked: str) -> Dict[str, List[Tuple[int, int, str]]]:
+        """扫描关键词并按类别归组
+
+        冒号之后视为用户给出的原文内容，其中只保留连接词（用于识别复合指令）。
+        """
+        colon = re.search(r"[:：]", masked)
+        limit = colon.start() if colon else len(masked)
+        found: Dict[str, List[Tuple[int, int, str]]] = {}
+        for start, end, keyword, category in self.trie.scan(masked):
+            if start < limit or category == CONNECTIVE:
+                found.setdefault(category, []).append((start, end, keyword))
+        return found
+
+    def _resolve_intent(self, found: Dict[str, List]) -> Optional[str]:
+        """根据动作词和对象词确定意图"""
+        if found.get(ACTION_MODIFY):
+            return "modify_text"
+        if found.get(ACTION_DELETE):
+            return "delete_text"
+        if found.get(OBJECT_TABLE):
+            return "add_table"
+        if found.get(OBJECT_LIST):
+            return "add_list"
+        if found.get(OBJECT_HEADING):
+            return "add_heading"
+        if found.get(ACTION_ADD):
+            return "add_text"
+        return None
+
+    def _penalty(self, masked: str, found: Dict[str, List], intent: str, reasons: List[str],
+                 content_start: Optional[int] = None) -> float:
+        """计算降低置信度的因素，content_start 之后的原文内容不检查序数位置引用
+
+        “上面”“所有”等相对引用仍在整条指令中检查：“添加段落 和上面一样”需要理解文档。
+        """
+        penalty = 0.0
+        actions = sum(len(found.get(c, [])) for c in (ACTION_ADD, ACTION_DELETE, ACTION_MODIFY))
+        objects = {c for c in (OBJECT_HEADING, OBJECT_TABLE, OBJECT_LIST) if found.get(c)}
+        if found.get(CONNECTIVE) or actions > 1 or len(objects) > 1:
+            penalty += 0.5
+            reasons.append("复合指令")
+        if intent.startswith(("modify", "delete")) and objects:
+            penalty += 0.5
+            reasons.append("作用于非文本对象")
+        if found.get(STYLE):
+            penalty += 0.4
+            reasons.append("包含样式要求")
+        if found.get(GENERATIVE):
+            penalty += 0.5
+            reasons.append("需要生成内容")
+        reference = masked if content_start is None else masked[:content_start]
+        if found.get(RELATIVE) or ORDINAL_PATTERN.search(re.split(r"[:：]", reference, 1)[0]):
+            penalty += 0.3
+            reasons.append("引用文档中的相对位置")
+        return penalty
+
+    def _extract_position(self, masked: str) -> Tuple[Optional[str], Optional[Tuple[int, int]]]:
+        """抽取插入位置，返回 (位置, 位置描述在文本中的区间)"""
+        for pattern, kind in POSITION_PATTERNS:
+            match = pattern.search(masked)
+            if not match:
+                continue
+            if kind == "after":
+                number = _to_int(match.group(1))
+                if number is None or number < 1:
+                    continue
+                position = f"after:{number - 1}"
+            else:
+                position = kind
+            return position, match.span()
+        return None, None
+
+    def _extract_content(self, text: str, found: Dict[str, List], quotes: List[str],
+                         categories: Tuple[str, ...]) -> Tuple[Optional[str], float]:
+        """抽取内容槽位，返回 (内容, 槽位得分)
+
+        引号内容最可靠；否则取第一个动作词（没有动作词时取对象词）之后的文本，
+        并去掉 "一段文字：" "标题为" 之类的引导语。没有引导语时内容边界不确定，不加分。
+        """
+        if len(quotes) == 1:
+            return quotes[0].strip(), 0.2
+        if len(quotes) > 1:
+            return None, 0.0
+
+        anchor = None
+        for category in categories:
+            if found.get(category):
+                anchor = found[category][0][1]
+                break
+        if anchor is None:
+            return None, 0.0
+        rest = text[anchor:]
+        lead = CONTENT_LEAD.match(rest)
+        explicit = bool(lead and re.search(r"[:：为是\s]", lead.group(0)))
+        content = rest[lead.end():] if lead else rest
+        content = content.strip().rstrip("。.！!")
+        if not content:
+            return None, 0.0
+        return content, 0.2 if explicit else 0.0
+
+    def _build_add_text(self, text, masked, found, quotes):
+        reasons: List[str] = []
+        content, score = self._extract_content(text, found, quotes, (ACTION_ADD, OBJECT_TEXT))
+        if not content:
+            reasons.append("缺少内容")
+            return None, 0.0, reasons
+        return WordOperation(
+            operation_type=OperationType.ADD_TEXT,
+            content=content
+        ), score, reasons
+
+    def _build_add_heading(self, text, masked, found, quotes):
+        reasons: List[str] = []
+        level = 1
+        level_match = HEADING_LEVEL_PATTERN.search(masked)
+        if level_match:
+            level = _to_int(level_match.group(1) or level_match.group(2)) or 1
+            level = min(max(level, 1), 9)
+        content, score = self._extract_content(text, found, quotes, (ACTION_ADD, OBJECT_HEADING))
+        if not content:
+            reasons.append("缺少标题内容")
+            return None, 0.0, reasons
+        return WordOperation(
+            operation_type=OperationType.ADD_HEADING,
+            content=content,
+            metadata={"level": level}
+        ), score, reasons
+
+    def _build_add_table(self, text, masked, found, quotes):
+        reasons: List[str] = []
+        rows = cols = None
+        size_match = TABLE_SIZE_PATTERN.search(masked)
+        if size_match:
+            rows, cols = int(size_match.group(1)), int(size_match.group(2))
+        rows_match = ROWS_PATTERN.search(masked)
+        cols_match = COLS_PATTERN.search(masked)
+        if rows_match:
+            rows = _to_int(rows_match.group(1))
+        if cols_match:
+            cols = _to_int(cols_match.group(1))
+
+        headers = None
+        headers_match = TABLE_HEADERS_PATTERN.search(text)
+        if headers_match:
+            headers = _split_items(headers_match.group(1))
+            if cols is None:
+                cols = len(headers)
+
+        score = 0.2
+        if not rows and cols:
+            # 只给出列数（如“三列表格，表头为…”）时按表头加默认数据行数补齐
+            rows = (1 if headers else 0) + DEFAULT_TABLE_DATA_ROWS
+            score = 0.1
+            reasons.append("未指定行数，使用默认行数")
+        if not rows or not cols:
+            reasons.append("缺少行列数")
+            return None, 0.0, reasons
+        if rows > 1000 or cols > 63:
+            reasons.append("表格尺寸超出范围")
+            return None, 0.0, reasons
+        return WordOperation(
+            operation_type=OperationType.ADD_TABLE,
+            table_data=TableData(rows=rows, cols=cols, headers=headers)
+        ), score, reasons
+
+    def _build_add_list(self, text, masked, found, quotes):
+        reasons: List[str] = []
+        ordered = any(word in masked for word in ("有序", "编号", "数字", "序号"))
+        if len(quotes) > 1:
+            items = [q.strip() for q in quotes if q.strip()]
+            score = 0.2
+        else:
+            end = max(end for _, end, _ in found[OBJECT_LIST])
+            rest = text[end:]
+            separator = re.match(r"\s*[，,]?\s*(?:(?:为|是|包括|包含)\s*[:：]?|[:：])\s*", rest)
+            if not separator:
+                reasons.append("缺少列表项")
+                return None, 0.0, reasons
+            items = _split_items(rest[separator.end():].rstrip("。.！!"))
+            score = 0.2
+        if not items:
+            reasons.append("缺少列表项")
+            return None, 0.0, reasons
+        return WordOperation(
+            operation_type=OperationType.ADD_LIST,
+            metadata={"items": items, "ordered": ordered}
+        ), score, reasons
+
+    def _build_delete_text(self, text, masked, found, quotes):
+        reasons: List[str] = []
+        content, score = self._extract_content(text, found, quotes, (ACTION_DELETE,))
+        if not content:
+            reasons.append("缺少要删除的内容")
+            return None, 0.0, reasons
+        return WordOperation(
+            operation_type=OperationType.DELETE_TEXT,
+            content=content
+        ), score, reasons
+
+    def _build_modify_text(self, text, masked, found, quotes):
+        reasons: List[str] = []
+        if len(quotes) == 2:
+            old_text, new_text = quotes[0].strip(), quotes[1].strip()
+            score = 0.2
+        else:
+            match = MODIFY_PATTERN.search(text)
+            if not match or quotes:
+                reasons.append("无法确定修改前后的文本")
+                return None, 0.0, reasons
+            old_text = match.group(1).strip()
+            new_text = match.group(2).strip().rstrip("。.！!")
+            score = 0.1
+        if not old_text or not new_text:
+            reasons.append("无法确定修改前后的文本")
+            return None, 0.0, reasons
+        return WordOperation(
+            operation_type=OperationType.MODIFY_TEXT,
+            content=new_text,
+            metadata={"old_text": old_text}
+        ), score, reasons
+
+def _to_int(value: Optional[str]) -> Optional[int]:
+    """将阿拉伯数字或中文数字（0-99）转换为整数"""
+    if not value:
+        return None
+    if value.isdigit():
+        return int(value)
+    if "十" in value:
+        tens, _, ones = value.partition("十")
+        tens_value = CN_DIGITS.get(tens, None) if tens else 1
+        ones_value = CN_DIGITS.get(ones, None) if ones else 0
+        if tens_value is None or ones_value is None:
+            return None
+        return tens_value * 10 + ones_value
+    if len(value) == 1:
+        return CN_DIGITS.get(value)
+    return None
+
+
+def _split_items(text: str) -> List[str]:
+    """按中英文分隔符切分列表项"""
+    return [item.strip() for item in ITEM_SEPARATORS.split(text) if item.strip()]
@@ -0,0 +1,205 @@
+"""
+模型路由
+
+按指令复杂度为每个请求选择模型档位：简单指令（如“加粗标题”）交给快速、便宜的模型，
+多处修改、需要生成内容或文档很长的请求交给大模型。
+复杂度由指令长度、涉及的操作种类、是否需要生成内容或包含多个步骤、文档大小加权得到，取值 0~1。
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+from word_agent.intent_parser import (
+    ACTION_ADD, ACTION_DELETE, ACTION_MODIFY, CONNECTIVE, GENERATIVE, INTENT_KEYWORDS,
+    OBJECT_HEADING, OBJECT_LIST, OBJECT_TABLE, OBJECT_TEXT, RELATIVE, STYLE, KeywordTrie
+)
+
+# 计入“操作种类”的关键词类别
+OPERATION_CATEGORIES = {
+    ACTION_ADD, ACTION_DELETE, ACTION_MODIFY, OBJECT_HEADING, OBJECT_TABLE, OBJECT_LIST, OBJECT_TEXT, STYLE
+}
+
+
+class ModelTier:
+    """模型档位"""
+
+    def __init__(self, name: str, model: str, max_score: float = 1.0):
+        """初始化
+
+        Args:
+            name: 档位名称
+            model: 模型名称
+            max_score: 该档位处理的最高复杂度
+        """
+        self.name = name
+        self.model = model
+        self.max_score = max_score
+
+        # 统计
+        self.routed = 0
+        self.llm_calls = 0
+        self.fallbacks = 0
+        self.empty_results = 0
+        self.operations = 0
+        self.succeeded = 0
+        self.total_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """获取统计信息
+
+        latency 为模型调用耗时（流式执行时包含边生成边执行的时间）；
+        success_rate 为模型给出的操作中执行成功的比例，fallback_rate 为模型调用失败的比例，
+        empty_rate 为模型没有给出有效操作的比例，三者用于评估档位的准确率。
+        """
+        calls = self.llm_calls
+        return {
+            "model": self.model,
+            "max_score": self.max_score,
+            "routed": self.routed,
+            "llm_calls": calls,
+            "avg_latency_ms": round(self.total_latency_ms / calls, 2) if calls else 0.0,
+            "max_latency_ms": round(self.max_latency_ms, 2),
+            "fallback_rate": self.fallbacks / calls if calls else 0.0,
+            "empty_rate": self.empty_results / calls if calls else 0.0,
+            "success_rate": self.succeeded / self.operations if self.operations else 0.0
+        }
+
+
+class RouteDecision:
+    """路由结果"""
+
+    def __init__(self, tier: ModelTier, score: float, features: Dict[str, float]):
+        """初始化
+
+        Args:
+            tier: 选中的档位
+            score: 复杂度
+            features: 各项特征（0~1）
+        """
+        self.tier = tier
+        self.score = score
+        self.features = features
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"tier": self.tier.name, "model": self.tier.model, "score": self.score, "features": self.features}
+
+
+class ModelRouter:
+    """按复杂度选择模型档位，并按档位统计延迟和准确率"""
+
+    # 各项特征的权重
+    WEIGHTS = {"length": 0.3, "operations": 0.3, "steps": 0.2, "document": 0.2}
+    # 指令达到该长度（字符）时长度特征取满分
+    LONG_INSTRUCTION = 120
+    # 文档达到该长度（字符）时文档特征取满分
+    LARGE_DOCUMENT = 20000
+
+    def __init__(self, tiers: Sequence[Dict[str, Any]]):
+        """初始化
+
+        Args:
+            tiers: 档位配置列表，每项包含 model，可选 name 和 max_score（默认 1.0）；
+                按 max_score 从小到大匹配，复杂度超过所有档位时使用最后一个档位
+
+        Raises:
+            ValueError: 配置无效
+        """
+        if not tiers:
+            raise ValueError("至少需要一个模型档位")
+        self.tiers: List[ModelTier] = []
+        for config in tiers:
+            if not config.get("model"):
+                raise ValueError(f"模型档位缺少 model: {config}")
+            self.tiers.append(ModelTier(
+                name=config.get("name") or config["model"],
+                model=config["model"],
+                max_score=float(config.get("max_score", 1.0))
+            ))
+        self.tiers.sort(key=lambda tier: tier.max_score)
+        self._by_name = {tier.name: tier for tier in self.tiers}
+
+        self.trie = KeywordTrie()
+        for category, words in INTENT_KEYWORDS.items():
+            for word in words:
+                self.trie.add(word, category)
+        self._lock = threading.Lock()
+
+    def score(self, instruction: str, paragraphs: Optional[Sequence[str]] = None) -> Dict[str, float]:
+        """计算复杂度特征
+
+        Args:
+            instruction: 自然语言指令
+            paragraphs: 当前文档的段落文本列表
+
+        Returns:
+            各项特征（0~1）
+        """
+        categories: Dict[str, int] = {}
+        for _, _, _, category in self.trie.scan(instruction):
+            categories[category] = categories.get(category, 0) + 1
+
+        # 只提到一种操作（如“添加标题”的动作和对象）时为 0，每多一种加 1/3
+        kinds = len(OPERATION_CATEGORIES.intersection(categories))
+        operations = min(1.0, max(0, kinds - 2) / 3)
+        # 需要生成内容、多个步骤或指代上下文
+        steps = min(1.0, (
+            0.5 * bool(categories.get(GENERATIVE))
+            + 0.25 * categories.get(CONNECTIVE, 0)
+            + 0.25 * bool(categories.get(RELATIVE))
+        ))
+        document_chars = sum(len(text) for text in paragraphs) if paragraphs else 0
+        return {
+            "length": min(1.0, len(instruction) / self.LONG_INSTRUCTION),
+            "operations": operations,
+            "steps": steps,
+            "document": min(1.0, document_chars / self.LARGE_DOCUMENT)
+        }
+
+    def route(self, instruction: str, paragraphs: Optional[Sequence[str]] = None) -> RouteDecision:
+        """为请求选择档位
+
+        Args:
+            instruction: 自然语言指令
+            paragraphs: 当前文档的段落文本列表
+
+        Returns:
+            路由结果
+        """
+        features = self.score(instruction, paragraphs)
+        score = round(sum(self.WEIGHTS[name] * value for name, value in features.items()), 3)
+        tier = next((tier for tier in self.tiers if score <= tier.max_score), self.tiers[-1])
+        with self._lock:
+            tier.routed += 1
+        return RouteDecision(tier, score, features)
+
+    def record(self, tier_name: str, latency_ms: float, failed: bool = False,
+               operations: int = 0, succeeded: int = 0):
+        """记录一次模型调用的结果
+
+        Args:
+            tier_name: 档位名称
+            latency_ms: 模型调用耗时（毫秒）
+            failed: 模型调用是否失败（使用了回退解析）
+            operations: 模型给出的有效操作数
+            succeeded: 其中执行成功的操作数
+        """
+        tier = self._by_name.get(tier_name)
+        if tier is None:
+            return
+        with self._lock:
+            tier.llm_calls += 1
+            tier.total_latency_ms += latency_ms
+            tier.max_latency_ms = max(tier.max_latency_ms, latency_ms)
+            if failed:
+                tier.fallbacks += 1
+            else:
+                if not operations:
+                    tier.empty_results += 1
+                tier.operations += operations
+                tier.succeeded += succeeded
+
+    def stats(self) -> Dict[str, Any]:
+        """获取各档位的统计信息"""
+        with self._lock:
+            return {tier.name: tier.stats() for tier in self.tiers}
@@ -0,0 +1,300 @@
+"""
+紧凑操作格式
+
+模型按行输出操作，字段以 | 分隔，省略了 JSON 的字段名和括号，生成的 token 数约为 JSON 的 1/4。
+字段中的 |、换行和反斜杠分别写作 \\|、\\n 和 \\\\；空字段表示未指定。
+
+    T|内容|位置        添加文本，位置为空表示末尾，^ 表示开头，数字 N 表示第 N 段之后
+    H|级别|内容        添加标题
+    D|文本             删除文本
+    M|原文本|新文本    修改文本
+    L|1|项1|项2        添加列表，第二个字段 1 为有序、0 为无序
+    B|行数|列数|表头…  添加表格，其后每个 R 行为一行数据
+    R|单元格|单元格…   上一个表格的数据行
+    S|标记|字号|字体|颜色  上一个操作的样式，标记由 b（粗体）、i（斜体）、u（下划线）组成
+
+无法识别的行（说明文字、代码块标记等）被忽略。
+"""
+
+from typing import Any, Dict, List, Optional
+
+# 操作代码 -> 操作类型
+OPCODES = {
+    "T": "add_text",
+    "H": "add_heading",
+    "D": "delete_text",
+    "M": "modify_text",
+    "L": "add_list",
+    "B": "add_table",
+}
+# 修饰上一个操作的行
+MODIFIER_CODES = {"R", "S"}
+ESCAPES = {"|": "|", "n": "\n", "\\": "\\"}
+
+
+def split_fields(line: str) -> List[str]:
+    """按未转义的 | 拆分字段并还原转义字符"""
+    if "\\" not in line:
+        return line.split("|")
+    fields = []
+    current = []
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if char == "\\" and i + 1 < len(line):
+            current.append(ESCAPES.get(line[i + 1], line[i + 1]))
+            i += 2
+            continue
+        if char == "|":
+            fields.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    fields.append("".join(current))
+    return fields
+
+
+def escape_field(value: Any) -> str:
+    """转义字段值"""
+    if value is None:
+        return ""
+    return str(value).replace("\\", "\\\\").replace("|", "\\|").replace("\n", "\\n")
+
+
+def encode_operation(data: Dict[str, Any]) -> str:
+    """把操作字典编码为紧凑格式（用于示例和测试）
+
+    Args:
+        data: 与模型 JSON 输出相同结构的操作字典
+
+    Returns:
+        一行或多行紧凑格式文本
+    """
+    operation_type = data.get("operation_type")
+    metadata = data.get("metadata") or {}
+    if operation_type == "add_text":
+        position = data.get("position") or ""
+        if position == "end":
+            position = ""
+        elif position == "beginning":
+            position = "^"
+        elif position.startswith("after:"):
+            position = position[len("after:"):]
+        fields = ["T", data.get("content"), position]
+    elif operation_type == "add_heading":
+        fields = ["H", metadata.get("level", 1), data.get("content")]
+    elif operation_type == "delete_text":
+        fields = ["D", data.get("content")]
+    elif operation_type == "modify_text":
+        fields = ["M", metadata.get("old_text"), data.get("content")]
+    elif operation_type == "add_list":
+        fields = ["L", 1 if metadata.get("ordered") else 0] + list(metadata.get("items") or [])
+    elif operation_type == "add_table":
+        table = data.get("table_data") or {}
+        fields = ["B", table.get("rows"), table.get("cols")] + list(table.get("headers") or [])
+    else:
+        raise ValueError(f"紧凑格式不支持的操作类型: {operation_type}")
+
+    lines = ["|".join(escape_field(field) for field in fields).rstrip("|")]
+    if operation_type == "add_table":
+        for row in (data.get("table_data") or {}).get("data") or []:
+            lines.append("|".join(["R"] + [escape_field(cell) for cell in row]))
+    style = data.get("style")
+    if style:
+        flags = "".join(flag for flag, key in (("b", "bold"), ("i", "italic"), ("u", "underline"))
+                        if style.get(key))
+        fields = ["S", flags, style.get("font_size"), style.get("font_name"), style.get("color")]
+        lines.append("|".join(escape_field(field) for field in fields).rstrip("|"))
+    return "\n".join(lines)
+
+
+class OperationDslStream:
+    """增量解码紧凑格式
+
+    操作在下一个操作行出现（或输出结束）时才算完整，因为其后可能还有 R、S 行。
+    第一行有效内容以 [ 或 { 开头时认为模型输出的是 JSON，is_json 置为 True 并停止解码。
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pending: Optional[Dict[str, Any]] = None
+        self.is_json = False
+        # 已解码出的操作数
+        self.count = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """输入一段文本
+
+        Args:
+            chunk: 模型新生成的文本
+
+        Returns:
+            已完整的操作字典
+        """
+        if self.is_json or not chunk:
+            return []
+        self._buffer += chunk
+        if "\n" not in chunk:
+            # 尚未出现完整的行，但已能看出是 JSON 时尽早切换
+            if self.count == 0 and self._pending is None and self._buffer.lstrip()[:1] in ("[", "{"):
+                self.is_json = True
+            return []
+        lines = self._buffer.split("\n")
+        self._buffer = lines.pop()
+        items: List[Dict[str, Any]] = []
+        for line in lines:
+            self._decode_line(line, items)
+            if self.is_json:
+                break
+        return items
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """输出结束，返回剩余的操作"""
+        items: List[Dict[str, Any]] = []
+        if self.is_json:
+            return items
+        if self._buffer:
+            self._decode_line(self._buffer, items)
+            self._buffer = ""
+        if self._pending is not None and not self.is_json:
+            items.append(self._pending)
+            self.count += 1
+            self._pending = None
+        return items
+
+    def take_pending(self) -> List[Dict[str, Any]]:
+        """输出中途结束（如超时）时取出最后一个已解码的操作
+
+        该操作的操作行已经完整，只是其后可能还缺少 R、S 行；尚未完整的最后一行被丢弃。
+
+        Returns:
+            剩余的操作
+        """
+        self._buffer = ""
+        if self._pending is None or self.is_json:
+            return []
+        pending, self._pending = self._pending, None
+        self.count += 1
+        return [pending]
+
+    def _decode_line(self, line: str, items: List[Dict[str, Any]]):
+        """解码一行，把因此完整的上一个操作加入 items"""
+        line = line.strip()
+        if not line or line.startswith("```"):
+            return
+        if self.count == 0 and self._pending is None and line[0] in "[{":
+            self.is_json = True
+            return
+
+        code, _, rest = line.partition("|")
+        code = code.strip().upper()
+        if code in MODIFIER_CODES:
+            if self._pending is not None:
+                self._apply_modifier(code, split_fields(rest))
+            return
+        if code not in OPCODES:
+            return
+
+        operation = self._build_operation(OPCODES[code], split_fields(rest) if rest else [])
+        if operation is None:
+            return
+        if self._pending is not None:
+            items.append(self._pending)
+            self.count += 1
+        self._pending = operation
+
+    def _build_operation(self, operation_type: str, fields: List[str]) -> Optional[Dict[str, Any]]:
+        """由操作行的字段构建操作字典，字段不足时返回 None"""
+        def field(position: int) -> Optional[str]:
+            return fields[position] if position < len(fields) and fields[position] != "" else None
+
+        if operation_type == "add_text":
+            position = field(1)
+            if position is None:
+                position = "end"
+            elif position == "^":
+                position = "beginning"
+            elif position.isdigit():
+                position = f"after:{position}"
+            return {"operation_type": operation_type, "content": field(0) or "", "position": position}
+        if operation_type == "add_heading":
+            if len(fields) < 2:
+                return None
+            return {
+                "operation_type": operation_type,
+                "content": fields[1],
+                "metadata": {"level": _to_int(field(0), 1)}
+            }
+        if operation_type == "delete_text":
+            return {"operation_type": operation_type, "content": field(0)}
+        if operation_type == "modify_text":
+            if len(fields) < 2:
+                return None
+            return {
+                "operation_type": operation_type,
+                "content": fields[1],
+                "metadata": {"old_text": fields[0]}
+            }
+        if operation_type == "add_list":
+            return {
+                "operation_type": operation_type,
+                "metadata": {"ordered": field(0) == "1", "items": fields[1:]}
+            }
+        # add_table
+        headers = fields[2:]
+        return {
+            "operation_type": operation_type,
+            "table_data": {
+                "rows": _to_int(field(0), 1),
+                "cols": _to_int(field(1), len(headers) or 1),
+                "headers": headers or None,
+                "data": []
+            }
+        }
+
+    def _apply_modifier(self, code: str, fields: List[str]):
+        """把 R、S 行应用到上一个操作"""
+        if code == "R":
+            table = self._pending.get("table_data")
+            if table is not None:
+                table["data"].append(fields)
+            return
+
+        def field(position: int) -> Optional[str]:
+            return fields[position] if position < len(fields) and fields[position] != "" else None
+
+        flags = (field(0) or "").lower()
+        size = field(1)
+        font_size = _to_int(size.split(".")[0], 0) if size else 0
+        style = {
+            "bold": True if "b" in flags else None,
+            "italic": True if "i" in flags else None,
+            "underline": True if "u" in flags else None,
+            "font_size": font_size or None,
+            "font_name": field(2),
+            "color": field(3)
+        }
+        self._pending["style"] = style
+
+
+def _to_int(value: Optional[str], default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def decode_operations(text: str) -> List[Dict[str, Any]]:
+    """解码完整的紧凑格式文本
+
+    Args:
+        text: 模型输出
+
+    Returns:
+        操作字典列表；文本是 JSON 时返回空列表
+    """
+    decoder = OperationDslStream()
+    items = decoder.feed(text + "\n")
+    items.extend(decoder.finish())
+    return items
@@ -0,0 +1,279 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from api.models import WordOperation
+
+
+class ParseCache:
+    """指令解析结果缓存
+
+    两级缓存：进程内 LRU 内存层 + SQLite 磁盘层。缓存键由指令文本、
+    提示词中文档内容窗口的哈希以及模型名称共同决定，条目在 TTL 到期后失效。
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: int = 1000, ttl: float = 86400):
+        """初始化解析缓存
+
+        Args:
+            db_path: SQLite 文件路径，为 None 时只使用内存层
+            max_entries: 内存层最大条目数
+            ttl: 条目有效期（秒），0 表示永不过期
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl or 0)
+        self.db_path = db_path
+
+        # 缓存键 -> (过期时间, 操作列表, 指令, 模型)
+        self._memory: "OrderedDict[str, Tuple[float, List[WordOperation], str, str]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if db_path:
+            self._open_db(db_path)
+
+    @staticmethod
+    def make_key(instruction: str, document_content: str, model: str) -> str:
+        """生成缓存键
+
+        Args:
+            instruction: 指令文本
+            document_content: 发送给模型的文档内容窗口
+            model: 模型名称
+
+        Returns:
+            缓存键
+        """
+        content_hash = hashlib.sha256(document_content.encode("utf-8")).hexdigest()
+        raw = "\x00".join([instruction.strip(), content_hash, model or ""])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[WordOperation]]:
+        """查询缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            操作列表的深拷贝（调用方可以修改），未命中或已过期时返回 None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, operations = entry[0], entry[1]
+                if not expires_at or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return _copy_operations(operations)
+                del self._memory[key]
+
+            stored = self._load_from_db(key, now)
+            if stored is None:
+                self.misses += 1
+                return None
+
+            operations, expires_at, instruction, model = stored
+            self.disk_hits += 1
+            self._remember(key, operations, expires_at, instruction, model)
+            return _copy_operations(operations)
+
+    def put(self, key: str, operations: List[WordOperation], instruction: str = "", model: str = ""):
+        """写入缓存
+
+        Args:
+            key: 缓存键
+            operations: 解析得到的操作列表
+            instruction: 指令文本（用于按指令失效）
+            model: 模型名称（用于按模型失效）
+        """
+        now = time.time()
+        expires_at = self._expires_at(now)
+        with self._lock:
+            self._remember(key, _copy_operations(operations), expires_at, instruction.strip(), model)
+
+            if self._conn is None:
+                return
+            try:
+                payload = json.dumps(
+                    [op.model_dump(mode="json") for op in operations],
+                    ensure_ascii=False
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO parse_cache "
+                    "(key, instruction, model, operations, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, instruction.strip(), model, payload, now, expires_at)
+                )
+                self._conn.commit()
+            except Exception as e:
+                print(f"写入解析缓存失败: {e}")
+
+    def invalidate(self, instruction: Optional[str] = None, model: Optional[str] = None,
+                   key: Optional[str] = None) -> int:
+        """按条件失效缓存条目
+
+        不指定任何条件时清空全部缓存。
+
+        Args:
+            instruction: 指令文本
+            model: 模型名称
+            key: 缓存键
+
+        Returns:
+            磁盘层删除的条目数（仅内存层时返回内存层删除数）
+        """
+        with self._lock:
+            if key is None and instruction is None and model is None:
+                removed = len(self._memory)
+                self._memory.clear()
+                if self._conn is not None:
+                    removed = self._conn.execute("DELETE FROM parse_cache").rowcount
+                    self._conn.commit()
+                return removed
+
+            conditions = []
+            params: List[Any] = []
+            if key is not None:
+                conditions.append("key = ?")
+                params.append(key)
+            if instruction is not None:
+                conditions.append("instruction = ?")
+                params.append(instruction.strip())
+            if model is not None:
+                conditions.append("model = ?")
+                params.append(model)
+
+            matched_keys = [
+                entry_key for entry_key, entry in self._memory.items()
+                if (key is None or entry_key == key)
+                and (instruction is None or entry[2] == instruction.strip())
+                and (model is None or entry[3] == model)
+            ]
+            for entry_key in matched_keys:
+                del self._memory[entry_key]
+            removed = len(matched_keys)
+
+            if self._conn is not None:
+                removed = self._conn.execute(
+                    f"DELETE FROM parse_cache WHERE {' AND '.join(conditions)}", params
+                ).rowcount
+                self._conn.commit()
+            return removed
+
+    def purge_expired(self) -> int:
+        """清理已过期的条目
+
+        Returns:
+            删除的条目数
+        """
+        now = time.time()
+        with self._lock:
+            expired_keys = [
+                key for key, entry in self._memory.items()
+                if entry[0] and entry[0] <= now
+            ]
+            for key in expired_keys:
+                del self._memory[key]
+
+            removed = len(expired_keys)
+            if self._conn is not None:
+                removed = self._conn.execute(
+                    "DELETE FROM parse_cache WHERE expires_at > 0 AND expires_at <= ?", (now,)
+                ).rowcount
+                self._conn.commit()
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息
+
+        Returns:
+            统计信息字典
+        """
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "persistent": self._conn is not None
+            }
+
+    def close(self):
+        """关闭磁盘层连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _open_db(self, db_path: str):
+        """打开（必要时创建）SQLite 数据库"""
+        try:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS parse_cache ("
+                "key TEXT PRIMARY KEY, instruction TEXT, model TEXT, "
+                "operations TEXT NOT NULL, created_at REAL, expires_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_parse_cache_instruction ON parse_cache (instruction)"
+            )
+            self._conn.commit()
+        except Exception as e:
+            print(f"打开解析缓存数据库失败，仅使用内存缓存: {e}")
+            self._conn = None
+
+    def _load_from_db(self, key: str, now: float) -> Optional[Tuple[List[WordOperation], float, str, str]]:
+        """从磁盘层读取条目（需持有锁）"""
+        if self._conn is None:
+            return None
+        try:
+            row = self._conn.execute(
+                "SELECT operations, expires_at, instruction, model FROM parse_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            payload, expires_at, instruction, model = row
+            if expires_at and expires_at <= now:
+                self._conn.execute("DELETE FROM parse_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            operations = [WordOperation.model_validate(item) for item in json.loads(payload)]
+            return operations, expires_at or 0.0, instruction or "", model or ""
+        except Exception as e:
+            print(f"读取解析缓存失败: {e}")
+            return None
+
+    def _remember(self, key: str, operations: List[WordOperation], expires_at: float,
+                  instruction: str, model: str):
+        """写入内存层并按 LRU 淘汰（需持有锁）"""
+        self._memory[key] = (expires_at, operations, instruction, model)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _expires_at(self, now: float) -> float:
+        """计算过期时间，0 表示永不过期"""
+        return now + self.ttl if self.ttl > 0 else 0.0
+
+
+def _copy_operations(operations: List[WordOperation]) -> List[WordOperation]:
+    """深拷贝操作列表，避免调用方修改缓存中的条目"""
+    return [operation.model_copy(deep=True) for operation in operations]
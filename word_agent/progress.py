@@ -0,0 +1,42 @@
+import time
+from typing import Any, Callable, Dict, Optional
+
+# 进度回调：参数为 (阶段名称, 事件数据)
+ProgressCallback = Callable[[str, Dict[str, Any]], None]
+
+
+class ProgressTracker:
+    """处理进度上报器
+
+    为每个阶段事件附加总耗时和距上一事件的耗时，未提供回调时不做任何事。
+    """
+
+    def __init__(self, callback: Optional[ProgressCallback] = None):
+        """初始化
+
+        Args:
+            callback: 进度回调
+        """
+        self.callback = callback
+        self.started_at = time.perf_counter()
+        self._last_at = self.started_at
+
+    def emit(self, stage: str, **data):
+        """上报一个阶段事件
+
+        Args:
+            stage: 阶段名称
+            **data: 事件数据
+        """
+        if not self.callback:
+            return
+
+        now = time.perf_counter()
+        data["elapsed_ms"] = round((now - self.started_at) * 1000, 2)
+        data["stage_ms"] = round((now - self._last_at) * 1000, 2)
+        self._last_at = now
+
+        try:
+            self.callback(stage, data)
+        except Exception as e:
+            print(f"进度回调失败: {e}")
@@ -0,0 +1,226 @@
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from document.word_processor import WordProcessor
+
+
+class _PendingSave:
+    """一个待保存文档的登记信息"""
+
+    def __init__(self, processor: WordProcessor, target_path: str, now: float):
+        self.processor = processor
+        self.target_path = target_path
+        self.paths: Set[str] = {target_path}
+        self.first_dirty = now
+        self.last_dirty = now
+
+
+class WriteBehindSaver:
+    """延迟合并保存（write-behind）
+
+    文档修改后只登记为脏，由后台线程在最后一次修改 debounce 秒后保存；
+    持续修改的文档最迟在首次变脏 max_delay 秒后保存。也可以随时显式 flush。
+    """
+
+    def __init__(
+        self,
+        debounce: float = 2.0,
+        max_delay: float = 300,
+        auto_flush: bool = True,
+        on_error: Optional[Callable[[str, Exception], None]] = None
+    ):
+        """初始化
+
+        Args:
+            debounce: 最后一次修改后等待的秒数
+            max_delay: 文档保持未保存状态的最长秒数
+            auto_flush: 是否由后台线程自动保存，为 False 时只在显式 flush 时保存
+            on_error: 保存失败回调，参数为 (目标路径, 异常)
+        """
+        self.debounce = max(0.0, float(debounce))
+        self.max_delay = max(self.debounce, float(max_delay))
+        self.auto_flush = auto_flush
+        self.on_error = on_error
+
+        self._pending: Dict[int, _PendingSave] = {}
+        # 处理器 -> 固定的保存路径，处理器被释放后自动清除
+        self._targets: "weakref.WeakKeyDictionary[WordProcessor, str]" = weakref.WeakKeyDictionary()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+        self.saves = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    def target_for(self, processor: WordProcessor) -> Optional[str]:
+        """获取处理器已分配的保存路径
+
+        Args:
+            processor: 文档处理器
+
+        Returns:
+            保存路径，尚未分配时返回 None
+        """
+        with self._condition:
+            return self._targets.get(processor)
+
+    def mark_dirty(self, processor: WordProcessor, target_path: str, source_path: Optional[str] = None):
+        """登记文档为待保存
+
+        Args:
+            processor: 文档处理器
+            target_path: 保存路径
+            source_path: 源文档路径（便于按源路径 flush）
+        """
+        now = time.monotonic()
+        with self._condition:
+            self._targets[processor] = target_path
+            entry = self._pending.get(id(processor))
+            if entry is None:
+                entry = _PendingSave(processor, target_path, now)
+                self._pending[id(processor)] = entry
+            else:
+                entry.last_dirty = now
+                self.coalesced += 1
+            if source_path:
+                entry.paths.add(source_path)
+
+            if self.auto_flush and not self._stopped:
+                self._ensure_thread()
+                self._condition.notify()
+
+    def flush(self, document_path: Optional[str] = None) -> int:
+        """立即保存待保存的文档
+
+        Args:
+            document_path: 只保存与该路径（源路径或保存路径）相关的文档，为 None 时保存全部
+
+        Returns:
+            成功保存的文档数
+        """
+        with self._condition:
+            entries = [
+                entry for entry in self._pending.values()
+                if document_path is None or document_path in entry.paths
+            ]
+        return self._save_entries(entries)
+
+    def flush_processor(self, processor: WordProcessor) -> bool:
+        """立即保存指定处理器（如果它有待保存的修改）
+
+        Args:
+            processor: 文档处理器
+
+        Returns:
+            是否执行了保存
+        """
+        with self._condition:
+            entry = self._pending.get(id(processor))
+        if entry is None:
+            return False
+        return self._save_entries([entry]) > 0
+
+    def pending_count(self) -> int:
+        """待保存的文档数"""
+        with self._condition:
+            return len(self._pending)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取统计信息
+
+        Returns:
+            统计信息字典
+        """
+        with self._condition:
+            return {
+                "pending": len(self._pending),
+                "saves": self.saves,
+                "coalesced": self.coalesced,
+                "failures": self.failures,
+                "debounce": self.debounce,
+                "max_delay": self.max_delay,
+                "auto_flush": self.auto_flush
+            }
+
+    def stop(self, flush: bool = True):
+        """停止后台线程
+
+        Args:
+            flush: 停止前是否保存全部待保存文档
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+            thread = self._thread
+
+        if thread is not None:
+            thread.join()
+        if flush:
+            self.flush()
+
+    def _ensure_thread(self):
+        """启动后台保存线程（需持有锁）"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="word-agent-write-behind", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        """后台线程：等待到期后保存"""
+        while True:
+            with self._condition:
+                if self._stopped:
+                    return
+
+                now = time.monotonic()
+                due: List[_PendingSave] = []
+                next_deadline: Optional[float] = None
+                for entry in self._pending.values():
+                    deadline = min(entry.last_dirty + self.debounce, entry.first_dirty + self.max_delay)
+                    if deadline <= now:
+                        due.append(entry)
+                    elif next_deadline is None or deadline < next_deadline:
+                        next_deadline = deadline
+
+                if not due:
+                    timeout = None if next_deadline is None else next_deadline - now
+                    self._condition.wait(timeout)
+                    continue
+
+            self._save_entries(due)
+
+    def _save_entries(self, entries: List[_PendingSave]) -> int:
+        """保存登记的文档（不持有本对象的锁，避免与文档锁互相等待）"""
+        saved = 0
+        for entry in entries:
+            with self._condition:
+                marked_at = entry.last_dirty
+
+            processor = entry.processor
+            try:
+                with processor.lock:
+                    needs_save = processor.dirty
+                    if needs_save and not processor.save_document(entry.target_path):
+                        raise RuntimeError("文档保存失败")
+            except Exception as e:
+                with self._condition:
+                    self.failures += 1
+                    # 推迟重试，避免后台线程对失败的文档反复保存
+                    entry.first_dirty = entry.last_dirty = time.monotonic()
+                if self.on_error:
+                    self.on_error(entry.target_path, e)
+                continue
+
+            with self._condition:
+                if needs_save:
+                    self.saves += 1
+                # 保存期间又有新修改时保留登记，等待下一轮保存
+                if entry.last_dirty == marked_at and self._pending.get(id(processor)) is entry:
+                    del self._pending[id(processor)]
+            if needs_save:
+                saved += 1
+        return saved